@@ -21,8 +21,9 @@ Database Management instance for database actions
 import logging
 from typing import Generic
 
+from pymongo import ReturnDocument
 from pymongo.errors import DuplicateKeyError
-from pymongo.results import DeleteResult, UpdateResult
+from pymongo.results import BulkWriteResult, DeleteResult, UpdateResult
 
 from cmdb.data_storage import CONNECTOR
 from cmdb.data_storage.database_connection import MongoConnector
@@ -410,10 +411,12 @@ class DatabaseManagerMongo(DatabaseManager[MongoConnector]):
             return self.connector.get_collection(collection).insert_one(data)
 
         if 'public_id' not in data:
-            data['public_id'] = self.get_highest_id(collection=collection) + 1
-        self.connector.get_collection(collection).insert_one(data)
-        # update the id counter
-        self.update_public_id_counter(collection, data['public_id'])
+            data['public_id'] = self.get_next_public_id(collection=collection)
+            self.connector.get_collection(collection).insert_one(data)
+        else:
+            self.connector.get_collection(collection).insert_one(data)
+            # update the id counter - only required for preset public ids
+            self.update_public_id_counter(collection, data['public_id'])
         return data['public_id']
 
     def update(self, collection: str, filter: dict, data: dict, *args, **kwargs):
@@ -461,6 +464,22 @@ class DatabaseManagerMongo(DatabaseManager[MongoConnector]):
             raise DocumentCouldNotBeDeleted(collection)
         return result
 
+    def bulk_write(self, collection: str, requests: list, ordered: bool = False) -> BulkWriteResult:
+        """executes multiple write operations with a single database round trip
+
+        Args:
+            collection (str): name of database collection
+            requests (list): list of pymongo write operations (InsertOne, ReplaceOne, ...)
+            ordered (bool): stop at the first error - otherwise all operations are executed
+
+        Raises:
+            BulkWriteError: if at least one operation failed - the details contain the failed indexes
+
+        Returns:
+            BulkWriteResult: result of the bulk operation
+        """
+        return self.connector.get_collection(collection).bulk_write(requests, ordered=ordered)
+
     def insert_with_internal(self, collection: str, _id: int or str, data: dict):
         formatted_id = {'_id': _id}
         formatted_data = {'$set': data}
@@ -604,50 +623,61 @@ class DatabaseManagerMongo(DatabaseManager[MongoConnector]):
         return highest
 
     def get_next_public_id(self, collection: str) -> int:
-        try:
-            founded_counter = self.connector.get_collection(IDCounter.COLLECTION).find_one(filter={
-                '_id': collection
-            })
-            new_id = founded_counter['counter'] + 1
-        except (NoDocumentFound, Exception) as err:
-            docs_count = self._init_public_id_counter(collection)
-            new_id = docs_count + 1
-        finally:
-            self.increment_public_id_counter(collection)
-        return new_id
+        """get the next free public id of a collection
+
+        Args:
+            collection (str): name of database collection
+
+        Returns:
+            int: the allocated public id - the counter is already incremented
+        """
+        return self.reserve_public_ids(collection, 1)
+
+    def reserve_public_ids(self, collection: str, count: int) -> int:
+        """reserve a block of public ids with a single atomic counter increment
+
+        Args:
+            collection (str): name of database collection
+            count (int): number of ids to reserve
+
+        Returns:
+            int: first id of the reserved block - the ids first to first + count - 1 are reserved
+        """
+        if count < 1:
+            raise ValueError(f'Can not reserve {count} public ids')
+        working_collection = self.connector.get_collection(IDCounter.COLLECTION)
+        counter_doc = working_collection.find_one_and_update(
+            {'_id': collection}, {'$inc': {'counter': count}}, return_document=ReturnDocument.AFTER)
+        if counter_doc is None:
+            # init counter, if it was not found and reserve again
+            self._init_public_id_counter(collection)
+            counter_doc = working_collection.find_one_and_update(
+                {'_id': collection}, {'$inc': {'counter': count}}, return_document=ReturnDocument.AFTER)
+        return counter_doc['counter'] - count + 1
 
     def _init_public_id_counter(self, collection: str):
         LOGGER.info(f'Counter for collection {collection} wasn´t found - setup new with data from {collection}')
         docs_count = self.get_highest_id(collection)
-        self.connector.get_collection(IDCounter.COLLECTION).insert({
-            '_id': collection,
-            'counter': docs_count
-        })
+        try:
+            # $max keeps a counter, which was created by a concurrent process in the meantime
+            self.connector.get_collection(IDCounter.COLLECTION).update_one(
+                {'_id': collection}, {'$max': {'counter': docs_count}}, upsert=True)
+        except DuplicateKeyError:
+            self.connector.get_collection(IDCounter.COLLECTION).update_one(
+                {'_id': collection}, {'$max': {'counter': docs_count}})
         return docs_count
 
     def increment_public_id_counter(self, collection: str):
-        working_collection = self.connector.get_collection(IDCounter.COLLECTION)
-        query = {
-            '_id': collection
-        }
-        counter_doc = working_collection.find_one(query)
-        counter_doc['counter'] = counter_doc['counter'] + 1
-        self.connector.get_collection(IDCounter.COLLECTION).update(query, counter_doc)
+        self.reserve_public_ids(collection, 1)
 
     def update_public_id_counter(self, collection: str, value: int):
         working_collection = self.connector.get_collection(IDCounter.COLLECTION)
-        query = {
-            '_id': collection
-        }
-        counter_doc = working_collection.find_one(query)
+        # update counter only, if value is higher than counter
+        update_result = working_collection.update_one({'_id': collection}, {'$max': {'counter': value}})
         # init counter, if it was not found
-        if counter_doc is None:
+        if update_result.matched_count == 0:
             self._init_public_id_counter(collection)
-            counter_doc = working_collection.find_one(query)
-        # update counter only, if value is higher than counter
-        if value > counter_doc['counter']:
-            counter_doc['counter'] = value
-            self.connector.get_collection(IDCounter.COLLECTION).update(query, counter_doc)
+            working_collection.update_one({'_id': collection}, {'$max': {'counter': value}})
 
 
 class DatabaseGridFS(GridFS):
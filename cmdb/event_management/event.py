@@ -83,6 +83,44 @@ class Event:
             output = self.__params[key]
         return output
 
+    def get_params(self):
+        """ Returns a copy of all parameters
+
+        Returns:
+            dict: parameters of the event
+        """
+        return dict(self.__params)
+
+    def get_object_ids(self):
+        """ Returns the ids of all objects of an object event
+
+        Single object events carry the parameter "id", aggregated
+        events (e.g. cmdb.core.objects.updated) the parameter "ids".
+
+        Returns:
+            list: public ids of the objects
+        """
+        if "ids" in self.__params:
+            return list(self.__params["ids"])
+        if self.__params.get("id") is not None:
+            return [self.__params["id"]]
+        return []
+
+    def get_type_ids(self):
+        """ Returns the ids of all object types of an object event
+
+        Single object events carry the parameter "type_id", aggregated
+        events the parameter "type_ids".
+
+        Returns:
+            list: public ids of the object types
+        """
+        if "type_ids" in self.__params:
+            return list(self.__params["type_ids"])
+        if self.__params.get("type_id") is not None:
+            return [self.__params["type_id"]]
+        return []
+
     def json_repr(self):
         """ Returns the JSON representation
 
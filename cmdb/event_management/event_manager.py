@@ -17,13 +17,28 @@
 """
 Event Management
 Module for sending/receiving events between CMDB processes
+
+The event backend is selected with the option "backend" of the config
+section MessageQueueing:
+    amqp: events are sent over a message broker (default)
+    local: events are sent over a local event bus, which is started by
+        the ProcessManager - no message broker is needed on single node
+        installations
 """
+import functools
+import json
 import logging
+import os
 import queue
 import multiprocessing
+import multiprocessing.connection
+import re
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import pika
 from cmdb.event_management.event import Event
+from cmdb.event_management.event_queue import create_send_queue
 from cmdb.utils.system_config import SystemConfigReader
 
 LOGGER = logging.getLogger(__name__)
@@ -34,13 +49,17 @@ class EventManager:
     Abstract class for event handling
     """
 
-    def __init__(self, receiver_callback):
+    def __init__(self, receiver_callback, debounce=0):
         """
         EventManager init
         Args:
             receiver_callback: function, that is called if events were
                 received
+            debounce(float): if set, object events are merged within a
+                window of this many seconds (see DebouncedEventHandler)
         """
+        if receiver_callback and debounce:
+            receiver_callback = DebouncedEventHandler(receiver_callback, debounce)
         self._receiver_callback = receiver_callback
 
     def send_event(self, event):
@@ -64,11 +83,190 @@ class EventManager:
         """
         pass
 
+    def get_metrics(self):
+        """get the runtime metrics of the EventManager
+
+        Returns:
+            dict: metrics like the number of waiting events
+        """
+        return {}
+
     def shutdown(self):
         """shutdown the EventManager"""
         pass
 
 
+class DebouncedEventHandler:
+    """Receiver callback wrapper, which merges bursts of object events
+
+    Object events (cmdb.core.object.* and cmdb.core.objects.*) are collected
+    per event type for a debounce window. After the window has passed, the
+    wrapped callback is called once per event type with a merged event,
+    which carries the ids and type ids of all collected events in the
+    parameters "ids" and "type_ids". All other events are passed through
+    immediately.
+    Receivers pass a done callback with every event (see handle()), which is
+    called after the merged event was handled - so received events are only
+    acknowledged after the wrapped callback has finished.
+    """
+
+    def __init__(self, receiver_callback, debounce):
+        """Creates an instance of DebouncedEventHandler
+
+        Args:
+            receiver_callback(func): callback function for processing
+                received events
+            debounce(float): debounce window in seconds
+        """
+        self.__receiver_callback = receiver_callback
+        self.__debounce = float(debounce)
+        self.__lock = threading.Lock()
+        # event type -> collected events
+        self.__pending = {}
+        # done callbacks of the collected events
+        self.__pending_done = []
+        self.__max_pending = None
+        self.__timer = None
+
+    def __call__(self, event):
+        self.handle(event)
+
+    def set_max_pending(self, max_pending):
+        """flush the window early, if this many events are collected
+
+        Receivers with a limit of unacknowledged events (prefetch) must set
+        it, otherwise the window blocks the delivery of further events.
+
+        Args:
+            max_pending(int): maximum number of collected events
+        """
+        self.__max_pending = max_pending
+
+    def handle(self, event, done=None):
+        """handle an event
+
+        Args:
+            event(Event): received event
+            done(func): called without arguments after the event was handled
+        """
+        if not event.get_type().startswith(("cmdb.core.object.", "cmdb.core.objects.")):
+            try:
+                self.__receiver_callback(event)
+            finally:
+                if done:
+                    done()
+            return
+        with self.__lock:
+            self.__pending.setdefault(event.get_type(), []).append(event)
+            if done:
+                self.__pending_done.append(done)
+            flush_now = self.__max_pending and len(self.__pending_done) >= self.__max_pending
+            if not self.__timer and not flush_now:
+                self.__timer = threading.Timer(self.__debounce, self.flush)
+                self.__timer.daemon = True
+                self.__timer.start()
+        if flush_now:
+            self.flush()
+
+    @staticmethod
+    def merge_events(events):
+        """merge events of the same type into one event
+
+        Args:
+            events(list): events of the same type
+
+        Returns:
+            Event: event with the parameters of the latest event and the
+                ids and type ids of all events
+        """
+        params = events[-1].get_params()
+        object_ids = []
+        type_ids = []
+        for event in events:
+            object_ids.extend(event.get_object_ids())
+            type_ids.extend(event.get_type_ids())
+        params["ids"] = list(dict.fromkeys(object_ids))
+        params["type_ids"] = list(dict.fromkeys(type_ids))
+        return Event(events[-1].get_type(), params)
+
+    def flush(self):
+        """call the receiver callback with the merged events of the current window"""
+        with self.__lock:
+            pending = self.__pending
+            pending_done = self.__pending_done
+            self.__pending = {}
+            self.__pending_done = []
+            if self.__timer:
+                self.__timer.cancel()
+            self.__timer = None
+        for events in pending.values():
+            try:
+                self.__receiver_callback(self.merge_events(events))
+            except Exception as err:
+                LOGGER.error("error while handling debounced events: {}".format(err))
+        for done in pending_done:
+            done()
+
+
+class EventDispatcher:
+    """Bounded worker pool for handling received events
+
+    Handlers run in a fixed number of worker threads. Handlers submitted
+    with the same key (e.g. the routing key of an event) run one after
+    another in the order they were submitted, handlers without a key run
+    in parallel.
+    """
+
+    def __init__(self, workers=4):
+        """Creates an instance of EventDispatcher
+
+        Args:
+            workers(int): number of worker threads
+        """
+        self.__executor = ThreadPoolExecutor(max_workers=int(workers))
+        self.__lock = threading.Lock()
+        # key -> handlers waiting for the running handler of the key
+        self.__waiting = {}
+
+    def submit(self, key, function, *args):
+        """run a handler in the worker pool
+
+        Args:
+            key: ordering key - None, if the handler does not need to be ordered
+            function(func): handler
+            args: arguments of the handler
+        """
+        if key is None:
+            self.__executor.submit(self.__run, function, *args)
+            return
+        with self.__lock:
+            if key in self.__waiting:
+                self.__waiting[key].append((function, args))
+                return
+            self.__waiting[key] = []
+        self.__executor.submit(self.__run_ordered, key, function, *args)
+
+    def shutdown(self):
+        """wait for all handlers and stop the worker pool"""
+        self.__executor.shutdown(wait=True)
+
+    @staticmethod
+    def __run(function, *args):
+        try:
+            function(*args)
+        except Exception as err:
+            LOGGER.error("error while handling event: {}".format(err))
+
+    def __run_ordered(self, key, function, *args):
+        while True:
+            self.__run(function, *args)
+            with self.__lock:
+                if not self.__waiting[key]:
+                    del self.__waiting[key]
+                    return
+                function, args = self.__waiting[key].pop(0)
+
+
 class EventManagerAmqp(EventManager):
     """EventManager using a message broker and the AMQP protocol
 
@@ -77,7 +275,8 @@ class EventManagerAmqp(EventManager):
     It starts an EventSender and an EventReceiver thread.
     """
 
-    def __init__(self, flag_shutdown, receiver_callback, process_id=None, event_types=["#"], flag_multiproc=False):
+    def __init__(self, flag_shutdown, receiver_callback, process_id=None, event_types=["#"], flag_multiproc=False,
+                 debounce=0):
         """Creates an instance of EventManagerAmqp
 
         Args:
@@ -88,19 +287,18 @@ class EventManagerAmqp(EventManager):
             event_types(list): list of event types, that will be processed
             flag_multiproc(bool): switch, if EventManager should be used
                 by multiple processes
+            debounce(float): if set, object events are merged within a
+                window of this many seconds (see DebouncedEventHandler)
         """
-        super(EventManagerAmqp, self).__init__(receiver_callback)
+        super(EventManagerAmqp, self).__init__(receiver_callback, debounce)
 
         # store variables
         self.__process_id = process_id
         self.__event_types = event_types
         self.__multiprocessing = flag_multiproc
 
-        # create queue for events to send
-        if self.__multiprocessing:
-            self.__queue_send = multiprocessing.Queue()
-        else:
-            self.__queue_send = queue.Queue()
+        # create bounded queue for events to send
+        self.__queue_send = create_send_queue(self.__process_id, self.__multiprocessing)
 
         # setup shutdown flag
         self.__flag_shutdown = flag_shutdown
@@ -120,6 +318,11 @@ class EventManagerAmqp(EventManager):
     def get_send_queue(self):
         return self.__queue_send
 
+    def get_metrics(self):
+        metrics = self.__queue_send.get_metrics()
+        metrics.update(self.__producer.get_metrics())
+        return metrics
+
     def shutdown(self):
         # set shutdown flag
         self.__flag_shutdown.set()
@@ -133,13 +336,22 @@ class EventSenderAmqp(threading.Thread):
 
     This part of the EventManagerAmqp is responsible for sending events
     to the message broker using the protocol AMQP.
+    Events are drained from the queue in batches. Each batch is published
+    within an AMQP transaction, so the whole batch is confirmed by the broker
+    with a single round trip. If the broker closes the channel, a new channel
+    is opened and the batch is published once more - if it fails again, it is
+    spilled to the journal of the send queue. If the connection is lost or
+    the broker is unreachable, the sender tries to reconnect with an
+    increasing delay (up to reconnect_max_delay seconds). Meanwhile the events
+    wait in the send queue or its journal and the unconfirmed batch is
+    published after the reconnect.
     """
 
     def __init__(self, message_queue, flag_shutdown, process_id=None):
         """Creates an instance of EventSenderAmqp
 
         Args:
-            message_queue(queue.Queue): handler of a queue for sending events
+            message_queue(EventSendQueue): handler of a queue for sending events
             flag_shutdown(threading.Event): flag for handling shutdown
             process_id(str): process identifier (process name)
         """
@@ -157,6 +369,8 @@ class EventSenderAmqp(threading.Thread):
         self.__config_exchange = self.__config_mq.get("exchange", "datagerry.eventbus")
         self.__config_retries = int(self.__config_mq.get("connection_attempts", "5"))
         self.__config_retrydelay = int(self.__config_mq.get("retry_delay", "6"))
+        self.__config_batch_size = int(self.__config_mq.get("publish_batch_size", "500"))
+        self.__config_reconnect_max_delay = int(self.__config_mq.get("reconnect_max_delay", "60"))
         self.__config_tls = False
         if self.__config_mq.get("use_tls", "False") in ("true", "True", "1", "yes"):
             self.__config_tls = True
@@ -164,9 +378,25 @@ class EventSenderAmqp(threading.Thread):
         # define variables
         self.__connection = None
         self.__channel = None
+        # events of the journal of the send queue, which are published next
+        self.__replayed = []
+        self.__metrics_lock = threading.Lock()
+        self.__metrics = {
+            "published": 0,
+            "batches": 0,
+            "failed_batches": 0,
+            "connected": False,
+            "last_batch_size": 0,
+            "last_publish_latency": 0.0,
+            "max_publish_latency": 0.0
+        }
 
     def __init_connection(self):
-        """create a connection to message broker"""
+        """create a connection to message broker
+
+        Returns:
+            bool: True, if the connection was established
+        """
         try:
             credentials = pika.credentials.PlainCredentials(self.__config_username, self.__config_password)
             self.__connection = pika.BlockingConnection(pika.ConnectionParameters(
@@ -177,36 +407,185 @@ class EventSenderAmqp(threading.Thread):
                 credentials=credentials,
                 ssl=self.__config_tls
             ))
-            self.__channel = self.__connection.channel()
-            self.__channel.exchange_declare(
-                exchange=self.__config_exchange,
-                exchange_type="topic"
-            )
-        except pika.exceptions.AMQPConnectionError:
+            self.__open_channel()
+            # events spilled while the broker was unreachable
+            self.__replayed.extend(self.__queue.replay())
+        except (pika.exceptions.AMQPConnectionError, pika.exceptions.AMQPChannelError):
             LOGGER.error("{}: EventSenderAmqp connection error".format(self.__process_id))
-            self.__flag_shutdown.set()
+            self.__set_connected(False)
+            return False
+        self.__set_connected(True)
+        return True
+
+    def __open_channel(self):
+        """open a channel on the current connection"""
+        self.__channel = self.__connection.channel()
+        self.__channel.exchange_declare(
+            exchange=self.__config_exchange,
+            exchange_type="topic"
+        )
+        # publish batches in transactions - a commit confirms all events of a batch
+        self.__channel.tx_select()
+
+    def __reopen_channel(self):
+        """open a new channel after the broker closed the current one
+
+        Events of an uncommitted transaction are discarded by the broker,
+        so the batch can be published again on the new channel.
+
+        Returns:
+            bool: True, if the sender is still connected
+        """
+        try:
+            self.__open_channel()
+            return True
+        except pika.exceptions.AMQPError as err:
+            LOGGER.warning("{}: could not reopen channel: {} - reconnect...".format(self.__process_id, err))
+        try:
+            self.__connection.close()
+        except pika.exceptions.AMQPError:
+            pass
+        return self.__init_connection()
+
+    def __set_connected(self, connected):
+        with self.__metrics_lock:
+            self.__metrics["connected"] = connected
+
+    def __wait_for_connection(self):
+        """reconnect to the message broker with an increasing delay until it is reachable or the shutdown was set
+
+        Returns:
+            bool: True, if the connection was established
+        """
+        delay = self.__config_retrydelay
+        while not self.__flag_shutdown.is_set():
+            LOGGER.warning("{}: message broker unreachable, next connection attempt in {}s".format(
+                self.__process_id, delay))
+            # events wait in the bounded send queue (or its journal) meanwhile
+            if self.__flag_shutdown.wait(delay):
+                break
+            if self.__init_connection():
+                return True
+            delay = min(delay * 2, self.__config_reconnect_max_delay)
+        return False
+
+    def get_queue_depth(self):
+        """get the number of events waiting in the send queue
+
+        Returns:
+            int: number of events or None, if the platform does not support it
+        """
+        try:
+            return self.__queue.qsize()
+        except NotImplementedError:
+            return None
+
+    def get_metrics(self):
+        """get the publishing metrics of the sender
+
+        Returns:
+            dict: counters, publish latency of the batches (in seconds) and the queue depth
+        """
+        with self.__metrics_lock:
+            metrics = dict(self.__metrics)
+        metrics["queue_depth"] = self.get_queue_depth()
+        return metrics
+
+    def __get_batch(self):
+        """wait for the next event and drain all waiting events up to the batch size
+
+        Returns:
+            list: events to send - empty, if no event arrived within the timeout
+        """
+        if self.__replayed:
+            batch = self.__replayed[:self.__config_batch_size]
+            del self.__replayed[:self.__config_batch_size]
+            return batch
+        try:
+            batch = [self.__queue.get(block=True, timeout=2)]
+        except queue.Empty:
+            # queue was drained - replay events, which were spilled while it was full
+            self.__replayed.extend(self.__queue.replay())
+            return []
+        while len(batch) < self.__config_batch_size:
+            try:
+                batch.append(self.__queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def __publish_batch(self, batch):
+        """publish a batch of events and wait for the confirmation of the broker
+
+        Args:
+            batch(list): events to send
+        """
+        start_time = time.perf_counter()
+        for event in batch:
+            self.__channel.basic_publish(exchange=self.__config_exchange,
+                                         routing_key=event.get_type(),
+                                         body=event.json_repr())
+        self.__channel.tx_commit()
+        latency = time.perf_counter() - start_time
+        with self.__metrics_lock:
+            self.__metrics["published"] += len(batch)
+            self.__metrics["batches"] += 1
+            self.__metrics["last_batch_size"] = len(batch)
+            self.__metrics["last_publish_latency"] = latency
+            self.__metrics["max_publish_latency"] = max(self.__metrics["max_publish_latency"], latency)
+        LOGGER.debug("{}: published {} events in {:.4f}s, queue depth {}".format(
+            self.__process_id, len(batch), latency, self.get_queue_depth()))
 
     def run(self):
         """run the event sender"""
         # init connection to broker
-        self.__init_connection()
+        connected = self.__init_connection()
+
+        # events, which were not confirmed by the broker yet
+        batch = []
+        # number of channel errors while publishing the current batch
+        batch_failures = 0
 
         # check queue for new events
         while not self.__flag_shutdown.is_set():
+            if not connected:
+                connected = self.__wait_for_connection()
+                continue
             try:
-                try:
-                    event = self.__queue.get(block=True, timeout=2)
-                    event_type = event.get_type()
-                    event_serialized = event.json_repr()
-                    self.__channel.basic_publish(exchange=self.__config_exchange,
-                                                 routing_key=event_type,
-                                                 body=event_serialized)
-                except queue.Empty:
+                if not batch:
+                    batch = self.__get_batch()
+                if batch:
+                    self.__publish_batch(batch)
+                    batch = []
+                    batch_failures = 0
+                else:
                     self.__connection.process_data_events()
             # handle AMQP connection errors
             except pika.exceptions.AMQPConnectionError:
+                if batch:
+                    with self.__metrics_lock:
+                        self.__metrics["failed_batches"] += 1
                 LOGGER.warning("connection to broker lost, try to reconnect...")
-                self.__init_connection()
+                connected = self.__init_connection()
+            # handle channels closed by the broker (e.g. publish or commit failed)
+            except pika.exceptions.AMQPChannelError as err:
+                LOGGER.warning("{}: channel closed by the broker: {} - reopen channel...".format(
+                    self.__process_id, err))
+                if batch:
+                    with self.__metrics_lock:
+                        self.__metrics["failed_batches"] += 1
+                    batch_failures += 1
+                    if batch_failures > 1:
+                        # failed again - keep the batch in the journal instead of blocking the queue
+                        self.__queue.spill(batch)
+                        batch = []
+                        batch_failures = 0
+                connected = self.__reopen_channel()
+
+        # keep unpublished events for the next start
+        unpublished = batch + self.__replayed
+        if unpublished:
+            self.__queue.spill(unpublished)
 
 
 class EventReceiverAmqp(threading.Thread):
@@ -215,9 +594,13 @@ class EventReceiverAmqp(threading.Thread):
     This part of the EventManagerAmqp is responsible for receiving events
     from the message broker using the protocol AMQP. Only configured event
     types were processed (e.g. cmdb.core.objects.added)
+    The broker delivers up to receiver_prefetch unacknowledged events. They
+    are handled by a pool of receiver_workers threads, so a slow handler
+    does not block the connection (heartbeats) or other events. An event is
+    acknowledged after its handler has finished.
     """
 
-    def __init__(self, receiver_callback, flag_shutdown, process_id=None, event_types=["#"]):
+    def __init__(self, receiver_callback, flag_shutdown, process_id=None, event_types=["#"], flag_ordered=True):
         """Creates an instance of EventReceiverAmqp
 
         Args:
@@ -226,12 +609,15 @@ class EventReceiverAmqp(threading.Thread):
             flag_shutdown(threading.Event): flag for handling shutdown
             process_id(str): process identifier (process name)
             event_types(list): list of event types, that will be processed
+            flag_ordered(bool): switch, if events with the same routing key
+                must be handled in the order they were received
         """
         super(EventReceiverAmqp, self).__init__()
         self.__receiver_callback = receiver_callback
         self.__flag_shutdown = flag_shutdown
         self.__process_id = process_id
         self.__event_types = event_types
+        self.__ordered = flag_ordered
 
         # get configuration
         self.__config_mq = SystemConfigReader().get_all_values_from_section('MessageQueueing')
@@ -242,6 +628,9 @@ class EventReceiverAmqp(threading.Thread):
         self.__config_exchange = self.__config_mq.get("exchange", "datagerry.eventbus")
         self.__config_retries = int(self.__config_mq.get("connection_attempts", "5"))
         self.__config_retrydelay = int(self.__config_mq.get("retry_delay", "6"))
+        self.__config_prefetch = int(self.__config_mq.get("receiver_prefetch", "50"))
+        self.__config_workers = int(self.__config_mq.get("receiver_workers", "4"))
+        self.__config_reconnect_max_delay = int(self.__config_mq.get("reconnect_max_delay", "60"))
         self.__config_tls = False
         if self.__config_mq.get("use_tls", "False") in ("true", "True", "1", "yes"):
             self.__config_tls = True
@@ -249,11 +638,16 @@ class EventReceiverAmqp(threading.Thread):
         # define variables
         self.__connection = None
         self.__channel = None
+        self.__dispatcher = EventDispatcher(self.__config_workers)
+        if isinstance(self.__receiver_callback, DebouncedEventHandler):
+            # debounced events stay unacknowledged until the window was handled
+            self.__receiver_callback.set_max_pending(self.__config_prefetch)
 
     def __process_event_cb(self, ch, method, properties, body):
         """event processing
 
-        this callback function is executed, if an event was reveived.
+        this callback function is executed on the connection thread, if an
+        event was reveived. The event is handled by the worker pool.
 
         Args:
             ch: AMQP channel
@@ -261,10 +655,32 @@ class EventReceiverAmqp(threading.Thread):
             properties: AMQP properties
             body: AMQP message body
         """
-        event = Event.create_event(body)
-        # allow None values, if event receiving should be ignored
-        if self.__receiver_callback:
-            self.__receiver_callback(event)
+        key = method.routing_key if self.__ordered else None
+        self.__dispatcher.submit(key, self.__handle_event, self.__connection, ch, method.delivery_tag, body)
+
+    def __handle_event(self, connection, channel, delivery_tag, body):
+        """handle an event in a worker thread and acknowledge it afterwards"""
+        acknowledge = functools.partial(self.__acknowledge, connection, channel, delivery_tag)
+        deferred = False
+        try:
+            event = Event.create_event(body)
+            if isinstance(self.__receiver_callback, DebouncedEventHandler):
+                # acknowledged after the merged event was handled
+                self.__receiver_callback.handle(event, acknowledge)
+                deferred = True
+            # allow None values, if event receiving should be ignored
+            elif self.__receiver_callback:
+                self.__receiver_callback(event)
+        finally:
+            if not deferred:
+                acknowledge()
+
+    def __acknowledge(self, connection, channel, delivery_tag):
+        # channels may only be used by the connection thread
+        try:
+            connection.add_callback_threadsafe(functools.partial(channel.basic_ack, delivery_tag=delivery_tag))
+        except Exception as err:
+            LOGGER.debug("{}: could not acknowledge event: {}".format(self.__process_id, err))
 
     def __check_shutdown_flag(self):
         """check, if the shutdown flag was set"""
@@ -276,7 +692,11 @@ class EventReceiverAmqp(threading.Thread):
             self.__connection.close()
 
     def __init_connection(self):
-        """create a connection to message broker"""
+        """create a connection to message broker
+
+        Returns:
+            bool: True, if the connection was established
+        """
         try:
             # init connection to broker
             credentials = pika.credentials.PlainCredentials(self.__config_username, self.__config_password)
@@ -298,17 +718,29 @@ class EventReceiverAmqp(threading.Thread):
             for event_type in self.__event_types:
                 self.__channel.queue_bind(exchange=self.__config_exchange, queue=queue_handler, routing_key=event_type)
 
-            # register callback function for event handling
-            self.__channel.basic_consume(self.__process_event_cb, queue=queue_handler, no_ack=True)
+            # register callback function for event handling - events are acknowledged by the workers
+            self.__channel.basic_qos(prefetch_count=self.__config_prefetch)
+            self.__channel.basic_consume(self.__process_event_cb, queue=queue_handler, no_ack=False)
         except pika.exceptions.AMQPConnectionError:
             LOGGER.error("{}: EventReceiverAmqp connection error".format(self.__process_id))
-            self.__flag_shutdown.set()
+            return False
+        return True
 
     def run(self):
         """run the event receiver"""
         # init connection to broker
-        self.__init_connection()
+        connected = self.__init_connection()
+        delay = self.__config_retrydelay
         while not self.__flag_shutdown.is_set():
+            if not connected:
+                # reconnect with an increasing delay - the service keeps running meanwhile
+                LOGGER.warning("{}: message broker unreachable, next connection attempt in {}s".format(
+                    self.__process_id, delay))
+                if self.__flag_shutdown.wait(delay):
+                    break
+                connected = self.__init_connection()
+                delay = self.__config_retrydelay if connected else min(delay * 2, self.__config_reconnect_max_delay)
+                continue
             try:
                 # start handling events
                 self.__connection.add_timeout(2, self.__check_shutdown_flag)
@@ -316,4 +748,339 @@ class EventReceiverAmqp(threading.Thread):
             # handle AMQP connection errors
             except pika.exceptions.AMQPConnectionError:
                 LOGGER.warning("connection to broker lost, try to reconnect...")
-                self.__init_connection()
+                connected = self.__init_connection()
+        self.__dispatcher.shutdown()
+        # handle the events of an open debounce window
+        if isinstance(self.__receiver_callback, DebouncedEventHandler):
+            self.__receiver_callback.flush()
+
+
+# environment variable with the address of the local event bus - set by the ProcessManager
+LOCAL_EVENT_BUS_ENV = "DATAGERRY_EVENT_BUS"
+
+
+def get_event_backend():
+    """get the configured event backend
+
+    Returns:
+        str: "amqp" or "local"
+    """
+    config_mq = SystemConfigReader().get_all_values_from_section('MessageQueueing')
+    return config_mq.get("backend", "amqp").lower()
+
+
+def create_event_manager(flag_shutdown, receiver_callback, process_id=None, event_types=["#"], flag_multiproc=False,
+                         debounce=0):
+    """create an EventManager of the configured event backend
+
+    Args:
+        see EventManagerAmqp
+
+    Returns:
+        EventManager: EventManagerAmqp or EventManagerLocal
+    """
+    if get_event_backend() == "local":
+        return EventManagerLocal(flag_shutdown, receiver_callback, process_id, event_types, flag_multiproc, debounce)
+    return EventManagerAmqp(flag_shutdown, receiver_callback, process_id, event_types, flag_multiproc, debounce)
+
+
+def create_event_receiver(receiver_callback, flag_shutdown, process_id=None, event_types=["#"]):
+    """create an EventReceiver thread of the configured event backend
+
+    Args:
+        see EventReceiverAmqp
+
+    Returns:
+        threading.Thread: EventReceiverAmqp or EventReceiverLocal (not started)
+    """
+    if get_event_backend() == "local":
+        return EventReceiverLocal(receiver_callback, flag_shutdown, process_id, event_types)
+    return EventReceiverAmqp(receiver_callback, flag_shutdown, process_id, event_types)
+
+
+def topic_to_regex(event_type):
+    """convert an AMQP topic pattern into a regular expression
+
+    "*" matches exactly one word, "#" matches zero or more words.
+
+    Args:
+        event_type(str): topic pattern (e.g. cmdb.core.object.#)
+
+    Returns:
+        re.Pattern: compiled regular expression
+    """
+    words = []
+    for word in event_type.split("."):
+        if word == "#":
+            words.append(r"(?:[^.]+(?:\.[^.]+)*)?")
+        elif word == "*":
+            words.append(r"[^.]+")
+        else:
+            words.append(re.escape(word))
+    pattern = r"\.".join(words)
+    # "a.#" must also match "a"
+    pattern = pattern.replace(r"\.(?:[^.]+(?:\.[^.]+)*)?", r"(?:\.[^.]+)*")
+    return re.compile("^{}$".format(pattern))
+
+
+class EventBrokerLocal(threading.Thread):
+    """Local event bus
+
+    The broker is started by the ProcessManager and accepts connections of
+    the CMDB processes on a unix socket (multiprocessing.connection).
+    A client connection is either a publisher or a subscriber. Published
+    events are forwarded to all subscribers with a matching event type.
+    """
+
+    def __init__(self, flag_shutdown, authkey=None):
+        """Creates an instance of EventBrokerLocal
+
+        Args:
+            flag_shutdown(threading.Event): flag for handling shutdown
+            authkey(bytes): key for authenticating the clients - defaults
+                to the authkey of the current process, which is inherited
+                by all child processes
+        """
+        super(EventBrokerLocal, self).__init__(daemon=True)
+        self.__flag_shutdown = flag_shutdown
+        self.__authkey = authkey or multiprocessing.current_process().authkey
+        self.__listener = multiprocessing.connection.Listener(family="AF_UNIX", authkey=self.__authkey)
+        self.__lock = threading.Lock()
+        # subscriber connection -> (lock, compiled event types)
+        self.__subscribers = {}
+
+    @property
+    def address(self):
+        """address of the event bus for the clients"""
+        return self.__listener.address
+
+    def run(self):
+        """accept client connections"""
+        while not self.__flag_shutdown.is_set():
+            try:
+                connection = self.__listener.accept()
+            except (OSError, EOFError, multiprocessing.AuthenticationError) as err:
+                if not self.__flag_shutdown.is_set():
+                    LOGGER.warning("EventBrokerLocal: connection refused: {}".format(err))
+                continue
+            threading.Thread(target=self.__handle_client, args=(connection,), daemon=True).start()
+
+    def shutdown(self):
+        """stop accepting connections"""
+        self.__flag_shutdown.set()
+        self.__listener.close()
+
+    def __handle_client(self, connection):
+        try:
+            handshake = json.loads(connection.recv_bytes())
+            if handshake.get("role") == "subscriber":
+                event_types = [topic_to_regex(event_type) for event_type in handshake.get("event_types", ["#"])]
+                with self.__lock:
+                    self.__subscribers[connection] = (threading.Lock(), event_types)
+                return
+            while True:
+                self.__publish(connection.recv_bytes())
+        except (OSError, EOFError, ValueError):
+            connection.close()
+
+    def __publish(self, event_serialized):
+        event_type = json.loads(event_serialized).get("type", "default")
+        with self.__lock:
+            subscribers = list(self.__subscribers.items())
+        for connection, (send_lock, event_types) in subscribers:
+            if not any(event_type_regex.match(event_type) for event_type_regex in event_types):
+                continue
+            try:
+                with send_lock:
+                    connection.send_bytes(event_serialized)
+            except (OSError, EOFError):
+                # subscriber process has terminated
+                with self.__lock:
+                    self.__subscribers.pop(connection, None)
+                connection.close()
+
+
+def connect_event_bus(handshake):
+    """connect to the local event bus
+
+    Args:
+        handshake(dict): role of the connection and subscribed event types
+
+    Returns:
+        multiprocessing.connection.Connection: connection to the EventBrokerLocal
+    """
+    address = os.environ.get(LOCAL_EVENT_BUS_ENV)
+    if not address:
+        raise ConnectionError("local event bus was not started - use the ProcessManager to start the services")
+    connection = multiprocessing.connection.Client(address, family="AF_UNIX",
+                                                   authkey=multiprocessing.current_process().authkey)
+    connection.send_bytes(json.dumps(handshake).encode("utf-8"))
+    return connection
+
+
+class EventManagerLocal(EventManager):
+    """EventManager using the local event bus
+
+    This EventManager implementation connects to the EventBrokerLocal of
+    the ProcessManager. It starts an EventSender and an EventReceiver thread.
+    """
+
+    def __init__(self, flag_shutdown, receiver_callback, process_id=None, event_types=["#"], flag_multiproc=False,
+                 debounce=0):
+        """Creates an instance of EventManagerLocal
+
+        Args:
+            see EventManagerAmqp
+        """
+        super(EventManagerLocal, self).__init__(receiver_callback, debounce)
+        self.__process_id = process_id
+        self.__flag_shutdown = flag_shutdown
+
+        # create bounded queue for events to send
+        self.__queue_send = create_send_queue(self.__process_id, flag_multiproc)
+
+        self.__producer = EventSenderLocal(self.__queue_send, self.__flag_shutdown, self.__process_id)
+        self.__producer.start()
+        self.__consumer = EventReceiverLocal(self._receiver_callback, self.__flag_shutdown,
+                                             self.__process_id, event_types)
+        self.__consumer.start()
+
+    def send_event(self, event):
+        self.__queue_send.put(event)
+
+    def get_send_queue(self):
+        return self.__queue_send
+
+    def get_metrics(self):
+        metrics = self.__queue_send.get_metrics()
+        metrics.update(self.__producer.get_metrics())
+        return metrics
+
+    def shutdown(self):
+        self.__flag_shutdown.set()
+        self.__producer.join()
+        self.__consumer.join()
+
+
+class EventSenderLocal(threading.Thread):
+    """EventSender part of the EventManagerLocal"""
+
+    def __init__(self, message_queue, flag_shutdown, process_id=None):
+        """Creates an instance of EventSenderLocal
+
+        Args:
+            message_queue(EventSendQueue): handler of a queue for sending events
+            flag_shutdown(threading.Event): flag for handling shutdown
+            process_id(str): process identifier (process name)
+        """
+        super(EventSenderLocal, self).__init__()
+        self.__queue = message_queue
+        self.__flag_shutdown = flag_shutdown
+        self.__process_id = process_id
+        self.__published = 0
+
+    def get_metrics(self):
+        """get the publishing metrics of the sender
+
+        Returns:
+            dict: number of published events and the queue depth
+        """
+        try:
+            queue_depth = self.__queue.qsize()
+        except NotImplementedError:
+            queue_depth = None
+        return {"published": self.__published, "queue_depth": queue_depth}
+
+    def run(self):
+        """run the event sender"""
+        try:
+            connection = connect_event_bus({"role": "publisher"})
+        except (OSError, ConnectionError) as err:
+            LOGGER.error("{}: EventSenderLocal connection error: {}".format(self.__process_id, err))
+            self.__flag_shutdown.set()
+            return
+        while not self.__flag_shutdown.is_set():
+            try:
+                events = [self.__queue.get(block=True, timeout=2)]
+            except queue.Empty:
+                # queue was drained - replay events, which were spilled while it was full
+                events = self.__queue.replay()
+            try:
+                for event in events:
+                    connection.send_bytes(event.json_repr().encode("utf-8"))
+                    self.__published += 1
+            except (OSError, EOFError):
+                LOGGER.error("{}: local event bus was closed".format(self.__process_id))
+                self.__flag_shutdown.set()
+        connection.close()
+
+
+class EventReceiverLocal(threading.Thread):
+    """EventReceiver part of the EventManagerLocal
+
+    Like the EventReceiverAmqp, events are handled by a worker pool. At most
+    receiver_prefetch events are handled at the same time, further events
+    wait in the connection to the event bus.
+    """
+
+    def __init__(self, receiver_callback, flag_shutdown, process_id=None, event_types=["#"], flag_ordered=True):
+        """Creates an instance of EventReceiverLocal
+
+        Args:
+            see EventReceiverAmqp
+        """
+        super(EventReceiverLocal, self).__init__()
+        self.__receiver_callback = receiver_callback
+        self.__flag_shutdown = flag_shutdown
+        self.__process_id = process_id
+        self.__event_types = event_types
+        self.__ordered = flag_ordered
+
+        config_mq = SystemConfigReader().get_all_values_from_section('MessageQueueing')
+        prefetch = int(config_mq.get("receiver_prefetch", "50"))
+        self.__in_flight = threading.BoundedSemaphore(prefetch)
+        self.__dispatcher = EventDispatcher(int(config_mq.get("receiver_workers", "4")))
+        if isinstance(self.__receiver_callback, DebouncedEventHandler):
+            self.__receiver_callback.set_max_pending(prefetch)
+
+    def __handle_event(self, event_serialized):
+        deferred = False
+        try:
+            event = Event.create_event(event_serialized)
+            if isinstance(self.__receiver_callback, DebouncedEventHandler):
+                # the slot is released after the merged event was handled
+                self.__receiver_callback.handle(event, self.__in_flight.release)
+                deferred = True
+            # allow None values, if event receiving should be ignored
+            elif self.__receiver_callback:
+                self.__receiver_callback(event)
+        finally:
+            if not deferred:
+                self.__in_flight.release()
+
+    def run(self):
+        """run the event receiver"""
+        try:
+            connection = connect_event_bus({"role": "subscriber", "event_types": self.__event_types})
+        except (OSError, ConnectionError) as err:
+            LOGGER.error("{}: EventReceiverLocal connection error: {}".format(self.__process_id, err))
+            self.__flag_shutdown.set()
+            return
+        while not self.__flag_shutdown.is_set():
+            try:
+                if not connection.poll(2):
+                    continue
+                event_serialized = connection.recv_bytes()
+            except (OSError, EOFError):
+                LOGGER.error("{}: local event bus was closed".format(self.__process_id))
+                self.__flag_shutdown.set()
+                break
+            # wait for a free slot - the event type is the routing key
+            self.__in_flight.acquire()
+            key = json.loads(event_serialized).get("type") if self.__ordered else None
+            self.__dispatcher.submit(key, self.__handle_event, event_serialized)
+        connection.close()
+        self.__dispatcher.shutdown()
+        # handle the events of an open debounce window
+        if isinstance(self.__receiver_callback, DebouncedEventHandler):
+            self.__receiver_callback.flush()
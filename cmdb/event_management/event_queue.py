@@ -0,0 +1,212 @@
+# DATAGERRY - OpenSource Enterprise CMDB
+# Copyright (C) 2019 NETHINKS GmbH
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Event Queue
+Bounded queue for the events, which are waiting to be sent
+"""
+import logging
+import multiprocessing
+import os
+import queue
+import tempfile
+from cmdb.event_management.event import Event
+from cmdb.utils.system_config import SystemConfigReader
+
+LOGGER = logging.getLogger(__name__)
+
+
+class EventSendQueue:
+    """Bounded queue for sending events
+
+    The producers (e.g. request threads of the webapp) put events into the
+    queue, the EventSender takes them out. If the queue is full, because the
+    event backend is slow or unreachable, the overflow policy is applied:
+        block: wait up to block_timeout seconds for a free slot, then drop
+            the event
+        drop_oldest: drop the oldest waiting event
+        spill: append the event to a local journal file - the EventSender
+            replays the journal, when the queue was drained or the
+            connection was established again
+    Producers never wait longer than block_timeout, so the request latency
+    does not depend on the health of the event backend.
+    """
+
+    OVERFLOW_POLICIES = ("block", "drop_oldest", "spill")
+
+    def __init__(self, maxsize=10000, overflow_policy="spill", block_timeout=1.0, journal_file=None,
+                 flag_multiproc=False):
+        """Creates an instance of EventSendQueue
+
+        Args:
+            maxsize(int): maximum number of waiting events
+            overflow_policy(str): policy if the queue is full (see OVERFLOW_POLICIES)
+            block_timeout(float): maximum wait time (in seconds) of the policies "block" and "drop_oldest"
+            journal_file(str): journal file of the policy "spill"
+            flag_multiproc(bool): switch, if the queue should be used
+                by multiple processes
+        """
+        if overflow_policy not in self.OVERFLOW_POLICIES:
+            raise ValueError("unknown overflow policy {} - possible values: {}".format(
+                overflow_policy, ", ".join(self.OVERFLOW_POLICIES)))
+        self.__overflow_policy = overflow_policy
+        self.__block_timeout = float(block_timeout)
+        self.__journal_file = journal_file
+        if flag_multiproc:
+            self.__queue = multiprocessing.Queue(maxsize)
+        else:
+            self.__queue = queue.Queue(maxsize)
+        # shared between the producer processes
+        self.__lock = multiprocessing.Lock()
+        self.__dropped = multiprocessing.Value("L", 0, lock=False)
+        self.__spilled = multiprocessing.Value("L", 0, lock=False)
+        # events spilled by a former run are replayed too
+        self.__journal_size = multiprocessing.Value("L", self.__count_journal(), lock=False)
+
+    def __count_journal(self):
+        if not self.__journal_file or not os.path.exists(self.__journal_file):
+            return 0
+        try:
+            with open(self.__journal_file) as journal:
+                return sum(1 for line in journal if line.strip())
+        except OSError:
+            return 0
+
+    def put(self, event, block=True, timeout=None):
+        """add an event to the queue - the overflow policy is applied, if the queue is full
+
+        Args:
+            event(Event): event to send
+            block, timeout: ignored - only for compatibility with queue.Queue
+        """
+        try:
+            self.__queue.put(event, block=False)
+            return
+        except queue.Full:
+            pass
+
+        if self.__overflow_policy == "spill":
+            self.spill([event])
+        elif self.__overflow_policy == "drop_oldest":
+            with self.__lock:
+                try:
+                    # events of a multiprocessing queue can still be in transit - wait for them shortly
+                    self.__queue.get(block=True, timeout=self.__block_timeout)
+                except queue.Empty:
+                    pass
+                else:
+                    self.__dropped.value += 1
+                try:
+                    self.__queue.put(event, block=False)
+                except queue.Full:
+                    self.__dropped.value += 1
+        else:
+            try:
+                self.__queue.put(event, block=True, timeout=self.__block_timeout)
+            except queue.Full:
+                with self.__lock:
+                    self.__dropped.value += 1
+                LOGGER.warning("event send queue is full - dropped event {}".format(event.get_type()))
+
+    def get(self, block=True, timeout=None):
+        return self.__queue.get(block=block, timeout=timeout)
+
+    def get_nowait(self):
+        return self.__queue.get_nowait()
+
+    def qsize(self):
+        return self.__queue.qsize()
+
+    def spill(self, events):
+        """append events to the journal file
+
+        Args:
+            events(list): events to store
+        """
+        with self.__lock:
+            try:
+                with open(self.__journal_file, "a") as journal:
+                    for event in events:
+                        journal.write(event.json_repr() + "\n")
+                self.__spilled.value += len(events)
+                self.__journal_size.value += len(events)
+            except OSError as err:
+                self.__dropped.value += len(events)
+                LOGGER.error("could not write event journal {}: {}".format(self.__journal_file, err))
+
+    def has_journal(self):
+        """check, if spilled events are waiting in the journal
+
+        Returns:
+            bool: True, if the journal contains events
+        """
+        return self.__journal_size.value > 0
+
+    def replay(self):
+        """take all events out of the journal
+
+        Returns:
+            list: spilled events in the order they were written
+        """
+        if not self.has_journal():
+            return []
+        with self.__lock:
+            try:
+                with open(self.__journal_file) as journal:
+                    lines = journal.readlines()
+                os.remove(self.__journal_file)
+            except OSError as err:
+                LOGGER.error("could not read event journal {}: {}".format(self.__journal_file, err))
+                return []
+            self.__journal_size.value = 0
+        return [Event.create_event(line) for line in lines if line.strip()]
+
+    def get_metrics(self):
+        """get the counters of the queue
+
+        Returns:
+            dict: waiting, dropped and spilled events
+        """
+        try:
+            queue_depth = self.__queue.qsize()
+        except NotImplementedError:
+            queue_depth = None
+        return {
+            "queue_depth": queue_depth,
+            "dropped": self.__dropped.value,
+            "spilled": self.__spilled.value,
+            "journal_size": self.__journal_size.value
+        }
+
+
+def create_send_queue(process_id=None, flag_multiproc=False):
+    """create an EventSendQueue with the settings of the config section MessageQueueing
+
+    Args:
+        process_id(str): process identifier (process name) - used for the journal file name
+        flag_multiproc(bool): switch, if the queue should be used by multiple processes
+
+    Returns:
+        EventSendQueue
+    """
+    config_mq = SystemConfigReader().get_all_values_from_section('MessageQueueing')
+    journal_dir = config_mq.get("journal_dir", tempfile.gettempdir())
+    journal_file = os.path.join(journal_dir, "datagerry-events-{}.journal".format(process_id or os.getpid()))
+    return EventSendQueue(maxsize=int(config_mq.get("send_queue_size", "10000")),
+                          overflow_policy=config_mq.get("overflow_policy", "spill"),
+                          block_timeout=float(config_mq.get("overflow_block_timeout", "1")),
+                          journal_file=journal_file,
+                          flag_multiproc=flag_multiproc)
@@ -14,6 +14,9 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import hashlib
+import json
+
 from cmdb.exportd.exportd_job.exportd_job_base import JobManagementBase
 from enum import Enum
 from cmdb.framework.cmdb_dao import CmdbDAO
@@ -42,6 +45,7 @@ class ExportdJob(JobManagementBase):
         Exportd Job
     """
     COLLECTION = 'exportd.jobs'
+    STATE_COLLECTION = 'exportd.states'
     REQUIRED_INIT_KEYS = [
         'name',
     ]
@@ -52,7 +56,8 @@ class ExportdJob(JobManagementBase):
 
     def __init__(self, name, label, description, active, author_id,
                  last_execute_date, sources, destination,
-                 variables, scheduling, exportd_type=ExportdJobType.PUSH.name, state=None, **kwargs):
+                 variables, scheduling, exportd_type=ExportdJobType.PUSH.name, state=None, incremental=False,
+                 **kwargs):
         """
         Args:
             name: name of this job
@@ -60,6 +65,7 @@ class ExportdJob(JobManagementBase):
             sources: consists of multiple objects of a specific object type and a specific status
             destination: is an external system, where you want to push the yourcmdb objects
             variables: has a name and gets its value out of fields of the objects
+            incremental: only export changed and deleted objects since the last run, if all destinations support it
             **kwargs: optional params
         """
         self.name = name
@@ -74,6 +80,7 @@ class ExportdJob(JobManagementBase):
         self.scheduling = scheduling
         self.state = state or 0
         self.exportd_type = exportd_type or ExportdJobType.PUSH.name
+        self.incremental = incremental or False
         super(ExportdJob, self).__init__(**kwargs)
 
     def get_public_id(self) -> int:
@@ -180,6 +187,26 @@ class ExportdJob(JobManagementBase):
     def get_author_id(self):
         return self.author_id
 
+    def get_incremental(self) -> bool:
+        """
+        Get incremental export mode of the job
+        Returns:
+            bool: only changes since the last run are exported
+        """
+        return self.incremental
+
+    def get_config_hash(self, type_states: list = None) -> str:
+        """
+        Get a fingerprint of the export configuration - an incremental state is only valid for the same configuration
+        Args:
+            type_states: definitions of the exported types (e.g. the source and referenced types)
+        Returns:
+            str: hash of sources, destinations, variables and types
+        """
+        config = json.dumps({'sources': self.sources, 'destination': self.destination, 'variables': self.variables,
+                             'types': type_states or []}, sort_keys=True, default=str)
+        return hashlib.sha1(config.encode('utf-8')).hexdigest()
+
 
 class NoPublicIDError(CMDBError):
     """
@@ -148,9 +148,36 @@ class ExportdJobManagement(CmdbManagerBase):
             self._event_queue.put(event)
         return ack.acknowledged
 
+    def get_job_state(self, public_id: int) -> dict:
+        """
+        Get the stored state of the last incremental capable run of a job
+        Args:
+            public_id: public id of the job
+        Returns:
+            state document or None if the job was never exported
+        """
+        try:
+            return self.dbm.find_one_by(collection=ExportdJob.STATE_COLLECTION, filter={'job_id': public_id})
+        except Exception as err:
+            raise ExportdJobManagerGetError(err)
+
+    def update_job_state(self, public_id: int, state: dict):
+        """
+        Store the state of a finished run, which is the starting point of the next incremental run
+        Args:
+            public_id: public id of the job
+            state: high water mark, exported object ids and destination keys
+        """
+        try:
+            self.dbm.update(collection=ExportdJob.STATE_COLLECTION, filter={'job_id': public_id},
+                            data={'job_id': public_id, **state}, upsert=True)
+        except Exception as err:
+            raise ExportdJobManagerUpdateError(err)
+
     def delete_job(self, public_id: int, request_user: UserModel) -> bool:
         try:
             ack = self._delete(collection=ExportdJob.COLLECTION, public_id=public_id)
+            self.dbm.delete_many(collection=ExportdJob.STATE_COLLECTION, job_id=public_id)
             if self._event_queue:
                 event = Event("cmdb.exportd.deleted", {"id": public_id, "active": False,
                                                        "user_id": request_user.get_public_id()})
@@ -15,7 +15,10 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import logging
+import threading
+import time
 from abc import abstractclassmethod
+from contextlib import contextmanager
 from datetime import datetime
 from enum import Enum
 
@@ -59,16 +62,56 @@ class ExportdJobLog(ExportdMetaLog):
                              'user_id'
                          ] + ExportdMetaLog.REQUIRED_INIT_KEYS
 
-    def __init__(self, job_id: int, state: bool, user_id: int, user_name: str = None, event: str = None, message=None, **kwargs):
+    def __init__(self, job_id: int, state: bool, user_id: int, user_name: str = None, event: str = None, message=None,
+                 destination: str = None, duration: float = None, metrics: dict = None, **kwargs):
         self.job_id = job_id
         self.state = state
         self.user_id = user_id
         self.user_name = user_name or self.UNKNOWN_USER_STRING
         self.event = event
         self.message = message
+        self.destination = destination
+        self.duration = duration
+        self.metrics = metrics
         super(ExportdJobLog, self).__init__(**kwargs)
 
 
+class ExportdJobMetrics:
+    """
+    Phase timings (in seconds) and counters of a job run.
+    Can be shared by all threads of the run - timings of concurrent work are summed up.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.timings = {}
+        self.counters = {}
+
+    def add_time(self, phase: str, seconds: float):
+        with self.__lock:
+            self.timings[phase] = self.timings.get(phase, 0.0) + seconds
+
+    def count(self, name: str, value: int = 1):
+        with self.__lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    @contextmanager
+    def measure(self, phase: str):
+        """Add the runtime of the with block to the timing of a phase"""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(phase, time.perf_counter() - start_time)
+
+    def to_dict(self) -> dict:
+        with self.__lock:
+            return {
+                'timings': {phase: round(seconds, 4) for phase, seconds in self.timings.items()},
+                'counters': dict(self.counters)
+            }
+
+
 class ExportdLog:
     REGISTERED_LOG_TYPE = {}
     DEFAULT_LOG_TYPE = ExportdJobLog
@@ -15,35 +15,56 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from operator import methodcaller
+from typing import Set
 
 from cmdb.data_storage.database_manager import DatabaseManagerMongo
-from cmdb.exportd.exportd_job.exportd_job_manager import ExportdJobManagement
+from cmdb.exportd.exportd_job.exportd_job_manager import ExportdJobManagement, ExportdJobManagerGetError, \
+    ExportdJobManagerUpdateError
 from cmdb.exportd.exportd_logs.exportd_log_manager import ExportdLogManager
-from cmdb.exportd.exportd_job.exportd_job import ExportdJob
+from cmdb.exportd.exportd_job.exportd_job import ExportdJob, ExportdJobType
 from cmdb.exportd.exportd_header.exportd_header import ExportdHeader
 from cmdb.utils.error import CMDBError
 from cmdb.utils.helpers import load_class
 from cmdb.utils.system_config import SystemConfigReader
+from cmdb.framework.cmdb_errors import ObjectManagerGetError
 from cmdb.framework.cmdb_object_manager import CmdbObjectManager
+from cmdb.framework.models.type import TypeModel
 from cmdb.exportd.exportd_logs.exportd_log_manager import LogManagerInsertError, LogAction, ExportdJobLog
-from cmdb.framework.cmdb_render import CmdbRender, RenderList
-from cmdb.templates.template_data import ObjectTemplateData
+from cmdb.exportd.exportd_logs.exportd_log import ExportdJobMetrics
+from cmdb.framework.cmdb_render import CmdbRender, RenderList, RenderTypeCache
+from cmdb.templates.template_data import ObjectTemplateData, ObjectReferenceCache
 from cmdb.templates.template_engine import TemplateEngine
 
 LOGGER = logging.getLogger(__name__)
 
+# template engine of the export variables - the jinja environment is shared by all compiled templates
+EXPORT_TEMPLATE_ENGINE = TemplateEngine()
+
+# maximum number of thread-safe destinations which are exported concurrently
+DESTINATION_WORKERS = 4
+
+# number of source objects which are rendered and passed to the destinations together
+SOURCE_BATCH_SIZE = 500
+
 
 class ExportdManagerBase(ExportdJobManagement):
 
-    def __init__(self, job: ExportdJob):
+    def __init__(self, job: ExportdJob, database_manager: DatabaseManagerMongo = None):
         self.job = job
+        # timings and counters of the run, which are shared by all destinations
+        self.metrics = ExportdJobMetrics()
         self.exportvars = self.__get_exportvars()
         self.destinations = self.__get__destinations()
 
-        scr = SystemConfigReader()
-        database_manager = DatabaseManagerMongo(
-            **scr.get_all_values_from_section('Database')
-        )
+        if database_manager is None:
+            scr = SystemConfigReader()
+            database_manager = DatabaseManagerMongo(
+                **scr.get_all_values_from_section('Database')
+            )
         self.__object_manager = CmdbObjectManager(
             database_manager=database_manager
         )
@@ -57,12 +78,13 @@ class ExportdManagerBase(ExportdJobManagement):
         exportvars = {}
         for variable in self.job.get_variables():
             exportvars.update(
-                {variable["name"]: ExportVariable(variable["name"], variable["default"], variable["templates"])})
+                {variable["name"]: ExportVariable(variable["name"], variable["default"], variable["templates"],
+                                                  metrics=self.metrics)})
         return exportvars
 
     def __get_sources(self):
         sources = []
-        sources.append(ExportSource(self.job, object_manager=self.__object_manager))
+        sources.append(ExportSource(self.job, object_manager=self.__object_manager, metrics=self.metrics))
         return sources
 
     def __get__destinations(self):
@@ -82,77 +104,345 @@ class ExportdManagerBase(ExportdJobManagement):
         return destinations
 
     def execute(self, event, user_id: int, user_name: str, log_flag: bool = True) -> ExportdHeader:
-        # get cmdb objects from all sources
-        cmdb_objects = set()
+        run_start = datetime.utcnow()
+        external_systems = [destination.get_external_system() for destination in self.destinations]
+        # definitions of the source and referenced types - part of the config hash of the incremental state
+        type_states = {}
+        job_state = self.__get_incremental_state(event, external_systems, type_states)
         exportd_header = ExportdHeader()
-        for source in self.sources:
-            cmdb_objects.update(source.get_objects())
-
-        # for every destination: do export
-        for destination in self.destinations:
-            external_system = destination.get_external_system()
-            external_system.prepare_export()
-
-            for cmdb_object in cmdb_objects:
-                # setup objectdata for use in ExportVariable templates
-                template_data = ObjectTemplateData(self.__object_manager, cmdb_object).get_template_data()
-                external_system.add_object(cmdb_object, template_data)
-            exportd_header = external_system.finish_export()
-
-            if log_flag:
-                try:
-                    log_params = {
-                        'job_id': self.job.get_public_id(),
-                        'state': True,
-                        'user_id': user_id,
-                        'user_name': user_name,
-                        'event': event.get_type(),
-                        'message': external_system.msg_string,
-                    }
-                    self.log_manager.insert_log(action=LogAction.EXECUTE, log_type=ExportdJobLog.__name__, **log_params)
-                except LogManagerInsertError as err:
-                    LOGGER.error(err)
+
+        # objects which left the sources since the last run are removed from the destinations
+        deleted_ids = set()
+        current_ids = set()
+        # ids of the objects referenced by each exported object - up to the depth of the template data
+        references = {}
+        referencing_ids = set()
+        if job_state:
+            references = {int(key): value for key, value in job_state.get('references', {}).items()}
+            with self.metrics.measure('source_query'):
+                for source in self.sources:
+                    current_ids.update(source.get_object_ids())
+                # objects whose referenced objects were changed are exported again
+                referencing_ids = self.__get_referencing_ids(references, job_state['last_run']) & current_ids
+            deleted_ids = set(job_state['object_ids']) - current_ids
+            for external_system, export_keys in zip(external_systems, job_state['export_keys']):
+                external_system.start_incremental({int(key): value for key, value in export_keys.items()})
+
+        # referenced objects are loaded once per run and shared by all batches and destinations
+        reference_cache = ObjectReferenceCache(self.__object_manager)
+        exported_ids = set()
+
+        # thread-safe destinations are running concurrently - all other destinations one after another
+        concurrent_systems = [external_system for external_system in external_systems if external_system.thread_safe]
+        with ThreadPoolExecutor(max_workers=max(min(len(concurrent_systems), DESTINATION_WORKERS), 1)) as executor:
+            self.__run_destinations(executor, external_systems, 'prepare', methodcaller("prepare_export"))
+
+            # on incremental runs the sources only stream the objects changed since the last run
+            changed_since = job_state['last_run'] if job_state else None
+            for cmdb_objects in self.__iterate_batches(changed_since, referencing_ids, exported_ids):
+                with self.metrics.measure('references'):
+                    reference_cache.prefetch(cmdb_objects)
+                # setup objectdata for use in ExportVariable templates - once per object for all destinations
+                export_objects = []
+                with self.metrics.measure('template_data'):
+                    for cmdb_object in cmdb_objects:
+                        template_data = ObjectTemplateData(self.__object_manager, cmdb_object,
+                                                           reference_cache=reference_cache).get_template_data()
+                        export_objects.append((cmdb_object, template_data))
+                        references[cmdb_object.object_information['object_id']] = \
+                            sorted(reference_cache.get_reference_ids(cmdb_object))
+                self.__run_destinations(executor, external_systems, 'add', self.__add_objects, export_objects)
+
+            self.__run_destinations(executor, external_systems, 'delete', self.__delete_objects, deleted_ids)
+            export_headers = self.__run_destinations(executor, external_systems, 'finish',
+                                                     methodcaller("finish_export"))
+
+        self.metrics.count('objects', len(exported_ids))
+        self.metrics.count('deleted_objects', len(deleted_ids))
+        if job_state:
+            LOGGER.info(f'Exportd job {self.job.get_public_id()}: incremental run with {len(exported_ids)} changed '
+                        f'({len(referencing_ids)} with changed references) and {len(deleted_ids)} deleted objects')
+        for external_system in external_systems:
+            self.__log_destination(external_system, event, user_id, user_name, log_flag)
+
+        if self.__incremental_capable(external_systems):
+            object_ids = current_ids if job_state else exported_ids
+            references = {public_id: ids for public_id, ids in references.items() if public_id in object_ids}
+            type_ids = set(type_states) | reference_cache.get_type_ids()
+            self.__update_incremental_state(run_start, object_ids, references, type_ids, type_states,
+                                            external_systems)
+
+        if len(external_systems) > 0:
+            exportd_header = export_headers[id(external_systems[-1])]
         return exportd_header
 
+    def __iterate_batches(self, changed_since, changed_ids: Set[int], exported_ids: Set[int]):
+        """Stream the rendered objects of all sources in batches - objects of multiple sources are exported once"""
+        for source in self.sources:
+            for batch in source.iterate_objects(changed_since=changed_since, changed_ids=changed_ids):
+                cmdb_objects = []
+                for cmdb_object in batch:
+                    public_id = cmdb_object.object_information['object_id']
+                    if public_id not in exported_ids:
+                        exported_ids.add(public_id)
+                        cmdb_objects.append(cmdb_object)
+                if len(cmdb_objects) > 0:
+                    yield cmdb_objects
+
+    @staticmethod
+    def __add_objects(external_system, export_objects):
+        for cmdb_object, template_data in export_objects:
+            external_system.add_object(cmdb_object, template_data)
+
+    @staticmethod
+    def __delete_objects(external_system, deleted_ids):
+        for public_id in deleted_ids:
+            external_system.delete_object(public_id)
+
+    @staticmethod
+    def __run_destinations(executor, external_systems, phase: str, action, *args) -> dict:
+        """
+        Run an export step for all destinations - thread-safe destinations in the pool, the others in order.
+        Returns after the step was finished by all destinations, the first error is raised.
+        The runtime of the step is added to the phase timing of every destination.
+        Returns:
+            dict of id(external_system) -> result of the step
+        """
+        def timed_action(external_system):
+            with external_system.metrics.measure(phase):
+                return action(external_system, *args)
+
+        futures = [(external_system, executor.submit(timed_action, external_system))
+                   for external_system in external_systems if external_system.thread_safe]
+        results = {}
+        for external_system in external_systems:
+            if not external_system.thread_safe:
+                results[id(external_system)] = timed_action(external_system)
+        for external_system, future in futures:
+            results[id(external_system)] = future.result()
+        return results
+
+    def __incremental_capable(self, external_systems) -> bool:
+        return self.job.get_incremental() and self.job.get_exportd_typ() == ExportdJobType.PUSH.name \
+            and all(external_system.delta_support for external_system in external_systems)
+
+    def __get_incremental_state(self, event, external_systems, type_states: dict):
+        """
+        Get the state of the last run if the job can be exported incrementally.
+        Manual runs, changed job configurations or types and destinations without delta support are always
+        exported in full.
+        The definitions of the source types and the types referenced in the last run are loaded into `type_states`.
+        """
+        if not self.__incremental_capable(external_systems):
+            return None
+        source_type_ids = {source['type_id'] for source in self.job.get_sources()}
+        if event.get_type() == 'cmdb.exportd.run_manual':
+            self.__load_type_states(source_type_ids, type_states)
+            return None
+        try:
+            job_state = self.get_job_state(self.job.get_public_id())
+        except ExportdJobManagerGetError as err:
+            LOGGER.error(f'Could not load the state of the last run - fallback to full export: {err}')
+            job_state = None
+        type_ids = source_type_ids | set(job_state.get('type_ids', [])) if job_state else source_type_ids
+        if not self.__load_type_states(type_ids, type_states):
+            return None
+        if not job_state or 'references' not in job_state \
+                or job_state.get('config_hash') != self.__get_config_hash(type_ids, type_states) \
+                or len(job_state.get('export_keys', [])) != len(external_systems):
+            return None
+        return job_state
+
+    def __load_type_states(self, type_ids: Set[int], type_states: dict) -> bool:
+        """Load the definitions of the types which are not in `type_states` yet - returns False on errors"""
+        missing_ids = sorted(set(type_ids) - set(type_states))
+        if len(missing_ids) == 0:
+            return True
+        try:
+            for type_instance in self.__object_manager.get_types(missing_ids):
+                type_states[type_instance.get_public_id()] = TypeModel.to_json(type_instance)
+        except CMDBError as err:
+            LOGGER.error(f'Could not load the exported types - fallback to full export: {err}')
+            return False
+        return True
+
+    def __get_config_hash(self, type_ids: Set[int], type_states: dict) -> str:
+        return self.job.get_config_hash([type_states[type_id] for type_id in sorted(type_ids)
+                                         if type_id in type_states])
+
+    def __get_referencing_ids(self, references: dict, changed_since: datetime) -> Set[int]:
+        """
+        Get the ids of the objects whose referenced objects were created, edited or deleted since the last run.
+        Args:
+            references: ids of the referenced objects of each exported object
+            changed_since: date of the last run
+        Returns:
+            ids of the referencing objects
+        """
+        referencing = {}
+        for public_id, reference_ids in references.items():
+            for reference_id in reference_ids:
+                referencing.setdefault(reference_id, set()).add(public_id)
+        if len(referencing) == 0:
+            return set()
+        reference_ids = list(referencing)
+        try:
+            changed_ids = self.__object_manager.get_object_ids_by(**{
+                'public_id': {'$in': reference_ids},
+                '$or': [{'creation_time': {'$gte': changed_since}}, {'last_edit_time': {'$gte': changed_since}}]
+            })
+            changed_ids.update(set(reference_ids) - self.__object_manager.get_existing_object_ids(reference_ids))
+        except ObjectManagerGetError as err:
+            LOGGER.error(f'Could not load the changed references - export all referencing objects: {err}')
+            changed_ids = set(reference_ids)
+        referencing_ids = set()
+        for reference_id in changed_ids:
+            referencing_ids.update(referencing[reference_id])
+        return referencing_ids
+
+    def __update_incremental_state(self, run_start: datetime, object_ids, references: dict, type_ids: Set[int],
+                                   type_states: dict, external_systems):
+        if not self.__load_type_states(type_ids, type_states):
+            return
+        job_state = {
+            'config_hash': self.__get_config_hash(type_ids, type_states),
+            'last_run': run_start,
+            'object_ids': sorted(object_ids),
+            'references': {str(public_id): reference_ids for public_id, reference_ids in references.items()},
+            'type_ids': sorted(type_ids),
+            'export_keys': [{str(key): value for key, value in external_system.export_keys.items()}
+                            for external_system in external_systems]
+        }
+        try:
+            self.update_job_state(self.job.get_public_id(), job_state)
+        except ExportdJobManagerUpdateError as err:
+            LOGGER.error(f'Could not store the state of the run - next run will be a full export: {err}')
+
+    def __log_destination(self, external_system, event, user_id: int, user_name: str, log_flag: bool):
+        destination_name = type(external_system).__name__
+        # job phases are shared by all destinations - prepare, add, delete, finish and external I/O are per destination
+        job_metrics = self.metrics.to_dict()
+        destination_metrics = external_system.metrics.to_dict()
+        metrics = {
+            'timings': {**job_metrics['timings'], **destination_metrics['timings']},
+            'counters': {**job_metrics['counters'], **destination_metrics['counters']}
+        }
+        duration = sum(destination_metrics['timings'].get(phase, 0.0)
+                       for phase in ('prepare', 'add', 'delete', 'finish'))
+        LOGGER.info(f'Exportd job {self.job.get_public_id()}: {destination_name} exported '
+                    f'{metrics["counters"].get("objects", 0)} objects in {duration:.3f}s - {metrics}')
+
+        if log_flag:
+            try:
+                log_params = {
+                    'job_id': self.job.get_public_id(),
+                    'state': True,
+                    'user_id': user_id,
+                    'user_name': user_name,
+                    'event': event.get_type(),
+                    'message': external_system.msg_string,
+                    'destination': destination_name,
+                    'duration': round(duration, 3),
+                    'metrics': metrics,
+                }
+                self.log_manager.insert_log(action=LogAction.EXECUTE, log_type=ExportdJobLog.__name__, **log_params)
+            except LogManagerInsertError as err:
+                LOGGER.error(err)
+
 
 class ExportVariable:
 
-    def __init__(self, name, value_tpl_default, value_tpl_types={}):
+    def __init__(self, name, value_tpl_default, value_tpl_types={}, metrics: ExportdJobMetrics = None):
         self.__name = name
         self.__value_tpl_default = value_tpl_default
         self.__value_tpl_types = value_tpl_types
+        self.__metrics = metrics
+        self.__compile_templates()
+
+    def __compile_template(self, template_string):
+        try:
+            return EXPORT_TEMPLATE_ENGINE.compile_template_string(template_string)
+        except Exception as ex:
+            LOGGER.warning(ex)
+            return None
+
+    def __compile_templates(self):
+        # templates are compiled once per variable - per type templates are looked up by the type id
+        self.__template_default = self.__compile_template(self.__value_tpl_default)
+        self.__templates_by_type = {}
+        for templ in self.__value_tpl_types:
+            if templ['type'] != '':
+                self.__templates_by_type[int(templ['type'])] = self.__compile_template(templ['template'])
 
     def get_value(self, cmdb_object, template_data):
         # get value template
-        value_template = self.__value_tpl_default
         object_type_id = cmdb_object.type_information['type_id']
-
-        for templ in self.__value_tpl_types:
-            if templ['type'] != '' and object_type_id == int(templ['type']):
-                value_template = templ['template']
+        template = self.__templates_by_type.get(object_type_id, self.__template_default)
+        if template is None:
+            return ''
 
         # render template
-        template_engine = TemplateEngine()
+        start_time = time.perf_counter()
         try:
-            output = template_engine.render_template_string(value_template, template_data)
+            output = template.render(template_data)
             if output == 'None':
                 output = ''
         except Exception as ex:
             LOGGER.warning(ex)
             output = ''
+        if self.__metrics:
+            self.__metrics.add_time('template', time.perf_counter() - start_time)
         return output
 
 class ExportSource:
 
-    def __init__(self, job: ExportdJob, object_manager: CmdbObjectManager = None):
+    def __init__(self, job: ExportdJob, object_manager: CmdbObjectManager = None,
+                 metrics: ExportdJobMetrics = None):
         self.__job = job
         self.__obm = object_manager
-        self.__objects = self.__fetch_objects()
-
-    def get_objects(self):
-        return self.__objects
-
-    def __fetch_objects(self):
+        self.__metrics = metrics or ExportdJobMetrics()
+        self.__query = self.__build_query()
+
+    def iterate_objects(self, changed_since: datetime = None, batch_size: int = SOURCE_BATCH_SIZE,
+                        changed_ids: Set[int] = None):
+        """
+        Stream the rendered objects of the source in batches.
+        Every batch is loaded with its own queries (paged by public_id), so no database cursor stays open
+        while the destinations work on a batch.
+        Args:
+            changed_since: only objects which were created or edited since this date
+            batch_size: number of objects which are rendered together
+            changed_ids: objects which are streamed in addition to the changed ones (e.g. changed references)
+        Returns:
+            generator of RenderResult lists
+        """
+        query = self.__query
+        if changed_since:
+            changed = [{'creation_time': {'$gte': changed_since}}, {'last_edit_time': {'$gte': changed_since}}]
+            if changed_ids:
+                changed.append({'public_id': {'$in': sorted(changed_ids)}})
+            query = {'$and': [query, {'$or': changed}]}
+        type_cache = RenderTypeCache(self.__obm)
+        last_public_id = None
+        while True:
+            with self.__metrics.measure('source_query'):
+                public_ids = self.__obm.get_object_ids_page(batch_size, last_public_id, **query)
+                if len(public_ids) == 0:
+                    break
+                last_public_id = public_ids[-1]
+                batch = self.__obm.get_objects_by(sort="public_id", public_id={'$in': public_ids})
+            if len(batch) == 0:
+                continue
+            with self.__metrics.measure('render'):
+                render_results = RenderList(batch, None, object_manager=self.__obm,
+                                            type_cache=type_cache).render_result_list()
+            yield render_results
+
+    def get_object_ids(self) -> Set[int]:
+        """Get the public ids of all objects of the source - without loading or rendering them"""
+        return self.__obm.get_object_ids_by(**self.__query)
+
+    def __build_query(self) -> dict:
         query = []
         for source in self.__job.get_sources():
             condition = []
@@ -176,10 +466,7 @@ class ExportSource:
 
             if not source["condition"]:
                 query.append({'type_id': source["type_id"], 'active': {'$eq': True}})
-
-        current_objects = self.__obm.get_objects_by(sort="public_id", **{'$or': query})
-        result = (RenderList(current_objects, None).render_result_list())
-        return result
+        return {'$or': query}
 
 
 class ExportDestination:
@@ -197,6 +484,10 @@ class ExportDestination:
 class ExternalSystem:
     parameters = {}
     variables = {}
+    # destinations without shared state can be exported concurrently to other destinations of the same job
+    thread_safe = False
+    # destinations which can apply changed and deleted objects to their existing data (incremental exports)
+    delta_support = False
 
     def __init__(self, destination_parms, export_vars):
         # Set default if value is empty
@@ -211,6 +502,51 @@ class ExternalSystem:
         self._destination_parms = destination_parms
         self._export_vars = export_vars
         self.msg_string = ""
+        # incremental runs only get changed and deleted objects - data of unchanged objects must be kept
+        self.incremental = False
+        # key of the exported data for each object id (e.g. a hostname) - stored for the next incremental run
+        self.export_keys = {}
+        # timings and counters of this destination
+        self.metrics = ExportdJobMetrics()
+        # variables which are not configured by the job - their default templates are compiled once per destination
+        self.__default_vars = {}
+
+    def get_export_variable(self, name: str, default_template: str = "") -> "ExportVariable":
+        """Get a variable of the job - a variable which is not configured renders the default template
+        Args:
+            name: name of the variable
+            default_template: template of the variable, if it is not configured by the job
+        Returns:
+            ExportVariable
+        """
+        export_variable = self._export_vars.get(name)
+        if export_variable is None:
+            export_variable = self.__default_vars.get(name)
+            if export_variable is None:
+                export_variable = ExportVariable(name, default_template)
+                self.__default_vars[name] = export_variable
+        return export_variable
+
+    def add_io_metrics(self, seconds: float, bytes_sent: int = 0, phase: str = 'external_io'):
+        """Record a request to the external system
+        Args:
+            seconds: duration of the request
+            bytes_sent: size of the sent data in bytes
+            phase: name of the timing - HTTP requests use `http_time_to_headers`, because their duration
+                   is only measured until the response headers were received
+        """
+        self.metrics.add_time(phase, seconds)
+        self.metrics.count('requests')
+        self.metrics.count('bytes_sent', bytes_sent)
+
+    def start_incremental(self, export_keys: dict):
+        """
+        Switch to an incremental export
+        Args:
+            export_keys: object id -> key of the exported data of the last run
+        """
+        self.incremental = True
+        self.export_keys = dict(export_keys)
 
     def prepare_export(self):
         pass
@@ -218,6 +554,9 @@ class ExternalSystem:
     def add_object(self, cmdb_object, template_data):
         pass
 
+    def delete_object(self, public_id: int):
+        pass
+
     def finish_export(self) -> ExportdHeader:
         pass
 
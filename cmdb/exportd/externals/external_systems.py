@@ -22,10 +22,72 @@ import re
 import os
 import pymysql
 import subprocess
-from cmdb.exportd.exporter_base import ExternalSystem, ExportVariable
+import time
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from cmdb.exportd.exporter_base import ExternalSystem
 from cmdb.exportd.exportd_header.exportd_header import ExportdHeader
 
 
+# HTTP methods without side effects on a repetition - only their overload responses are retried
+IDEMPOTENT_HTTP_METHODS = frozenset(['HEAD', 'GET', 'PUT', 'DELETE', 'OPTIONS', 'TRACE'])
+
+
+def create_http_session(retries: int = 3, pool_size: int = 10, io_callback=None,
+                        retry_methods=IDEMPOTENT_HTTP_METHODS) -> requests.Session:
+    """
+    Create a HTTP session with keep-alive connections for all requests of a destination run.
+    Failed connections are retried with an exponential backoff - the request was not sent in this case.
+    Overload responses (HTTP/429, HTTP/503) are only retried for the methods in `retry_methods`, because
+    the server may have processed the request already.
+    Args:
+        retries: number of retries of a request
+        pool_size: number of connections which are kept open - should match the number of parallel requests
+        io_callback: called with the duration, the sent bytes and the timing name of every request
+                     (e.g. ExternalSystem.add_io_metrics) - the duration (response.elapsed) only covers the time
+                     until the response headers were received, so it is recorded as `http_time_to_headers`
+        retry_methods: HTTP methods whose overload responses are retried - APIs which change data with
+                       GET requests (e.g. cPanel) must pass an empty set for these requests
+    Returns:
+        requests.Session
+    """
+    retry_options = {'total': retries, 'read': 0, 'backoff_factor': 0.5, 'status_forcelist': (429, 503),
+                     'raise_on_status': False}
+    try:
+        retry = Retry(allowed_methods=frozenset(retry_methods), **retry_options)
+    except TypeError:
+        # urllib3 < 1.26
+        retry = Retry(method_whitelist=frozenset(retry_methods), **retry_options)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if io_callback:
+        def record_response(response, *args, **kwargs):
+            body = response.request.body or b""
+            io_callback(response.elapsed.total_seconds(), len(body.encode("utf-8") if isinstance(body, str) else body),
+                        "http_time_to_headers")
+        session.hooks["response"].append(record_response)
+    return session
+
+
+def run_concurrent(function, arguments, concurrency: int):
+    """
+    Call a function for every argument tuple with at most `concurrency` parallel calls.
+    After the first error the calls which were not started yet are cancelled.
+    All started calls are finished when returning, the first error is raised.
+    """
+    with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as executor:
+        futures = [executor.submit(function, *args) for args in arguments]
+        done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+        for future in pending:
+            future.cancel()
+    for future in futures:
+        if not future.cancelled() and future.exception() is not None:
+            raise future.exception()
+
+
 class ExternalSystemDummy(ExternalSystem):
 
     parameters = []
@@ -44,7 +106,7 @@ class ExternalSystemDummy(ExternalSystem):
         row["object_id"] = str(cmdb_object.object_information['object_id'])
         row["variables"] = {}
         for key in self._export_vars:
-            row["variables"][key] = str(self._export_vars.get(key, ExportVariable(key, "")).get_value(cmdb_object, template_data))
+            row["variables"][key] = str(self.get_export_variable(key, "").get_value(cmdb_object, template_data))
         self.__rows.append(row)
 
     def finish_export(self):
@@ -56,6 +118,10 @@ class ExternalSystemDummy(ExternalSystem):
 
 class ExternalSystemOpenNMS(ExternalSystem):
 
+    thread_safe = True
+
+    delta_support = True
+
     parameters = [
         {"name": "resturl", "required": True, "description": "OpenNMS REST URL", "default": "http://127.0.0.1:8980/opennms/rest"},
         {"name": "restuser", "required": True, "description": "OpenNMS REST user", "default": "admin"},
@@ -64,7 +130,9 @@ class ExternalSystemOpenNMS(ExternalSystem):
         {"name": "services", "required": False, "description": "name of services to bind on each node sepetated by space", "default": "ICMP SNMP"},
         {"name": "exportSnmpConfig", "required": False, "description": "also export SNMP configuration for nodes", "default": "false"},
         {"name": "exportSnmpConfigRetries", "required": False, "description": "export SNMP configuration for nodes: set SNMP retries", "default": "1"},
-        {"name": "exportSnmpConfigTimeout", "required": False, "description": "export SNMP configuration for nodes: set SNMP timeout", "default": "2000"}
+        {"name": "exportSnmpConfigTimeout", "required": False, "description": "export SNMP configuration for nodes: set SNMP timeout", "default": "2000"},
+        {"name": "requestConcurrency", "required": False, "description": "number of parallel requests for node and SNMP configuration updates", "default": "4"},
+        {"name": "requestRetries", "required": False, "description": "number of retries of a failed request", "default": "3"}
     ]
 
     variables = [
@@ -149,6 +217,14 @@ class ExternalSystemOpenNMS(ExternalSystem):
         # init variables
         self.__timeout = 10
         self.__xml = None
+        self.__deleted_nodes = []
+        self.__snmp_configs = []
+        # all requests of the run share one session with keep-alive connections
+        self.__concurrency = int(self._destination_parms.get("requestConcurrency"))
+        self.__session = create_http_session(int(self._destination_parms.get("requestRetries")), self.__concurrency,
+                                             io_callback=self.add_io_metrics)
+        self.__session.auth = (self._destination_parms["restuser"], self._destination_parms["restpassword"])
+        self.__session.verify = False
 
     def prepare_export(self):
         # check connection to OpenNMS
@@ -164,13 +240,13 @@ class ExternalSystemOpenNMS(ExternalSystem):
 
         # get node variables
         node_foreignid = cmdb_object.object_information['object_id']
-        node_label = self._export_vars.get("nodelabel", ExportVariable("nodelabel", "undefined")).get_value(cmdb_object, template_data)
-        node_location = self._export_vars.get("location", ExportVariable("location", "default")).get_value(cmdb_object, template_data)
+        node_label = self.get_export_variable("nodelabel", "undefined").get_value(cmdb_object, template_data)
+        node_location = self.get_export_variable("location", "default").get_value(cmdb_object, template_data)
 
         # get interface information
         interfaces_in = []
-        interfaces_in.append(self._export_vars.get("ip", ExportVariable("ip", "127.0.0.1")).get_value(cmdb_object, template_data))
-        interfaces_in.extend(self._export_vars.get("furtherIps", ExportVariable("furtherIps", "[]")).get_value(cmdb_object, template_data).split(";"))
+        interfaces_in.append(self.get_export_variable("ip", "127.0.0.1").get_value(cmdb_object, template_data))
+        interfaces_in.extend(self.get_export_variable("furtherIps", "[]").get_value(cmdb_object, template_data).split(";"))
         # validate interfaces
         interfaces = []
         for interface in interfaces_in:
@@ -229,30 +305,45 @@ class ExternalSystemOpenNMS(ExternalSystem):
 
         # update SNMP config if option is set
         if self.__snmp_export:
-            snmp_ip = str(self._export_vars.get("ip", ExportVariable("ip", "127.0.0.1")).get_value(cmdb_object, template_data))
-            snmp_community = str(self._export_vars.get("snmp_community", ExportVariable("snmp_community", "public")).get_value(cmdb_object, template_data))
-            snmp_version = str(self._export_vars.get("snmp_version", ExportVariable("snmp_version", "v2c")).get_value(cmdb_object, template_data))
+            snmp_ip = str(self.get_export_variable("ip", "127.0.0.1").get_value(cmdb_object, template_data))
+            snmp_community = str(self.get_export_variable("snmp_community", "public").get_value(cmdb_object, template_data))
+            snmp_version = str(self.get_export_variable("snmp_version", "v2c").get_value(cmdb_object, template_data))
             if self.__check_ip(snmp_ip):
-                self.__onms_update_snmpconf_v12(snmp_ip, snmp_community, snmp_version)
+                self.__snmp_configs.append((snmp_ip, snmp_community, snmp_version))
 
         # update error counter
         self.__obj_successful.append(cmdb_object.object_information['object_id'])
         if warning:
             self.__obj_warning.append(cmdb_object.object_information['object_id'])
 
+    def delete_object(self, public_id):
+        self.__deleted_nodes.append(public_id)
+
     def finish_export(self):
-        self.__onms_update_requisition()
-        self.__onms_sync_requisition()
+        try:
+            # SNMP configuration must exist before the nodes are imported
+            run_concurrent(self.__onms_update_snmpconf_v12, self.__snmp_configs, self.__concurrency)
+            if self.incremental:
+                # only changed and deleted nodes are sent - all other nodes of the requisition are kept
+                run_concurrent(self.__onms_update_node, [(node_xml,) for node_xml in self.__xml], self.__concurrency)
+                run_concurrent(self.__onms_delete_node, [(node,) for node in self.__deleted_nodes], self.__concurrency)
+            else:
+                self.__onms_update_requisition()
+            self.__onms_sync_requisition()
+        finally:
+            self.__session.close()
         # create result message
         msg = "Export to OpenNMS finished. "
         msg += "{} objects exported. ".format(len(self.__obj_successful))
+        if self.incremental:
+            msg += "{} objects deleted. ".format(len(self.__deleted_nodes))
         msg += "The following objects were exported with warnings: {}".format(self.__obj_warning)
         self.set_msg(msg)
 
     def __onms_check_connection(self):
         url = "{}/info".format(self._destination_parms["resturl"])
         try:
-            response = requests.get(url, auth=(self._destination_parms["restuser"], self._destination_parms["restpassword"]), verify=False, timeout=self.__timeout)
+            response = self.__session.get(url, timeout=self.__timeout)
             if response.status_code > 202:
                 self.error("Error communicating to OpenNMS: HTTP/{}".format(str(response.status_code)))
         except Exception:
@@ -266,18 +357,43 @@ class ExternalSystemOpenNMS(ExternalSystem):
             "Content-Type": "application/xml"
         }
         try:
-            response = requests.post(url, data=data, headers=headers, auth=(self._destination_parms["restuser"], self._destination_parms["restpassword"]),
-                                     verify=False, timeout=self.__timeout)
+            response = self.__session.post(url, data=data, headers=headers, timeout=self.__timeout)
+            if response.status_code > 202:
+                self.error("Error communicating to OpenNMS: HTTP/{}".format(str(response.status_code)))
+        except Exception:
+            self.error("Can't connect to OpenNMS API")
+        return True
+
+    def __onms_update_node(self, node_xml):
+        url = "{}/requisitions/{}/nodes".format(self._destination_parms["resturl"], self._destination_parms["requisition"])
+        data = ET.tostring(node_xml, encoding="utf-8", method="xml")
+        headers = {
+            "Content-Type": "application/xml"
+        }
+        try:
+            response = self.__session.post(url, data=data, headers=headers, timeout=self.__timeout)
             if response.status_code > 202:
                 self.error("Error communicating to OpenNMS: HTTP/{}".format(str(response.status_code)))
         except Exception:
             self.error("Can't connect to OpenNMS API")
         return True
 
+    def __onms_delete_node(self, node_foreignid):
+        url = "{}/requisitions/{}/nodes/{}".format(self._destination_parms["resturl"],
+                                                   self._destination_parms["requisition"], node_foreignid)
+        try:
+            response = self.__session.delete(url, timeout=self.__timeout)
+            # node was already removed from the requisition
+            if response.status_code > 204 and response.status_code != 404:
+                self.error("Error communicating to OpenNMS: HTTP/{}".format(str(response.status_code)))
+        except Exception:
+            self.error("Can't connect to OpenNMS API")
+        return True
+
     def __onms_sync_requisition(self):
         url = "{}/requisitions/{}/import".format(self._destination_parms["resturl"], self._destination_parms["requisition"])
         try:
-            response = requests.put(url, data="", auth=(self._destination_parms["restuser"], self._destination_parms["restpassword"]), verify=False, timeout=self.__timeout)
+            response = self.__session.put(url, data="", timeout=self.__timeout)
             if response.status_code > 202:
                 self.error("Error communicating to OpenNMS: HTTP/{}".format(str(response.status_code)))
         except Exception:
@@ -305,8 +421,7 @@ class ExternalSystemOpenNMS(ExternalSystem):
             "Content-Type": "application/xml"
         }
         try:
-            response = requests.put(url, data=data, headers=headers, auth=(self._destination_parms["restuser"], self._destination_parms["restpassword"]),
-                                    verify=False, timeout=self.__timeout)
+            response = self.__session.put(url, data=data, headers=headers, timeout=self.__timeout)
             if response.status_code > 204:
                 self.error("Error communicating to OpenNMS: HTTP/{}".format(str(response.status_code)))
         except Exception:
@@ -332,13 +447,19 @@ class ExternalSystemOpenNMS(ExternalSystem):
 
 class ExternalSystemCpanelDns(ExternalSystem):
 
+    thread_safe = True
+
+    delta_support = True
+
     parameters = [
         {"name": "cpanelApiUrl",        "required": True,   "description": "cPanel API base URL", "default": "https://1.2.3.4:2083/json-api"},
         {"name": "cpanelApiUser",       "required": True,   "description": "cPanel username", "default": "admin"},
         {"name": "cpanelApiPassword",   "required": True,   "description": "cPanel password", "default": "admin"},
         {"name": "cpanelApiToken",      "required": True,   "description": "cPanel token", "default": ""},
         {"name": "domainName",          "required": True,   "description": "DNS Zone managed by cPanel for adding DNS A records", "default": "objects.datagerry.com"},
-        {"name": "cpanelApiSslVerify",  "required": False,  "description": "disable SSL peer verification", "default": False}
+        {"name": "cpanelApiSslVerify",  "required": False,  "description": "disable SSL peer verification", "default": False},
+        {"name": "requestConcurrency",  "required": False,  "description": "number of parallel requests for adding DNS records", "default": "4"},
+        {"name": "requestRetries",      "required": False,  "description": "number of retries of a failed request", "default": "3"}
     ]
 
     variables = [
@@ -366,42 +487,101 @@ class ExternalSystemCpanelDns(ExternalSystem):
         # SSL verify option
         self.__cpanel_api_ssl_verify = self._destination_parms.get("cpanelApiSslVerify")
 
-        # get all existing DNS records from cPanel
+        # all requests of the run share sessions with keep-alive connections - the API changes the zone
+        # with GET requests, so overload responses of these requests are not retried
+        self.__concurrency = int(self._destination_parms.get("requestConcurrency"))
+        self.__session = self.__create_session(pool_size=1)
+        self.__write_session = self.__create_session(pool_size=self.__concurrency, retry_methods=())
+
+        # get all existing DNS records from cPanel - the zone is fetched once per run
         self.__existing_records = self.get_a_records(self.__domain_name)
-        self.__created_records = {}
+        # hostname -> ip of all exported objects and hostnames whose records should be removed
+        self.__desired_records = {}
+        self.__removed_records = set()
+        self.__ignored_objects = []
+
+    def __create_session(self, pool_size: int, retry_methods=IDEMPOTENT_HTTP_METHODS) -> requests.Session:
+        session = create_http_session(int(self._destination_parms.get("requestRetries")), pool_size,
+                                      io_callback=self.add_io_metrics, retry_methods=retry_methods)
+        session.auth = (self.__cpanel_api_user, self.__cpanel_api_password)
+        session.headers.update({
+            'Authorization': 'WHM %s:%s' % (self.__cpanel_api_user, self.__cpanel_api_token),
+        })
+        return session
 
     def add_object(self, cmdb_object, template_data):
         # get variables from object
-        hostname = self.format_hostname(str(self._export_vars.get("hostname", ExportVariable("hostname", "default")).get_value(cmdb_object, template_data)))
-        ip = self.format_ip(str(self._export_vars.get("ip", ExportVariable("ip", "")).get_value(cmdb_object, template_data)))
+        hostname = self.format_hostname(str(self.get_export_variable("hostname", "default").get_value(cmdb_object, template_data)))
+        ip = self.format_ip(str(self.get_export_variable("ip", "").get_value(cmdb_object, template_data)))
+        object_id = cmdb_object.object_information['object_id']
 
         # ignore CmdbObject,
         if ip == "" or hostname == "":
-            self.set_msg('Ignore CmdbObject ID:%s. IP and/or hostname is invalid' % cmdb_object.object_information['object_id'])
-
-        # check if a DNS record exist for object
-        if hostname in self.__existing_records.keys():
-            # check if entry has changed
-            if self.__existing_records[hostname]["data"] != ip:
-                if hostname not in self.__created_records.keys():
-                    # recreate entry
-                    self.delete_a_records(self.__domain_name, hostname)
-                    self.add_a_record(self.__domain_name, hostname, ip)
-
-            # delete entry from exitsing records array
-            del self.__existing_records[hostname]
-        else:
-            # if not create a new one
-            if hostname not in self.__created_records.keys():
-                self.add_a_record(self.__domain_name, hostname, ip)
-
-        # save to created records
-        self.__created_records[hostname] = ip
+            self.__ignored_objects.append(object_id)
+            # the record of the last export is removed, if no other object uses the hostname
+            old_hostname = self.export_keys.pop(object_id, None)
+            if old_hostname:
+                self.__removed_records.add(old_hostname)
+            return
+
+        # the record of an old hostname is removed, if the hostname of the object has changed
+        old_hostname = self.export_keys.get(object_id)
+        if old_hostname and old_hostname != hostname:
+            self.__removed_records.add(old_hostname)
+        self.export_keys[object_id] = hostname
+
+        # the first object of a hostname defines the record
+        if hostname not in self.__desired_records:
+            self.__desired_records[hostname] = ip
+
+    def delete_object(self, public_id):
+        # remove the DNS A record of the last export of the object
+        hostname = self.export_keys.pop(public_id, None)
+        if hostname:
+            self.__removed_records.add(hostname)
 
     def finish_export(self):
-        # delete all DNS A records that does not exist in DATAGERRY
-        for hostname in self.__existing_records:
-            self.delete_a_records(self.__domain_name, hostname)
+        try:
+            # diff the desired records against the zone fetched at the start of the run
+            # records of unchanged objects are not part of an incremental export and must be kept
+            if self.incremental:
+                # hostnames which are still used by other (e.g. unchanged) objects are kept
+                hostnames_in_use = set(self.export_keys.values())
+                obsolete_records = {hostname for hostname in self.__removed_records
+                                    if hostname not in hostnames_in_use}
+            else:
+                obsolete_records = self.__existing_records.keys()
+            delete_records = {hostname for hostname in obsolete_records
+                              if hostname in self.__existing_records and hostname not in self.__desired_records}
+            add_records = []
+            updated_count = 0
+            for hostname, ip in self.__desired_records.items():
+                existing_record = self.__existing_records.get(hostname)
+                if existing_record and existing_record["data"] == ip:
+                    continue
+                if existing_record:
+                    # changed address - recreate entry
+                    delete_records.add(hostname)
+                    updated_count += 1
+                add_records.append((self.__domain_name, hostname, ip))
+
+            # records are addressed by their line in the zone - removing from the end keeps the other lines valid
+            delete_lines = sorted((int(self.__existing_records[hostname]["line"]) for hostname in delete_records),
+                                  reverse=True)
+            for line in delete_lines:
+                self.remove_zone_record(self.__domain_name, line)
+            run_concurrent(self.add_a_record, add_records, self.__concurrency)
+        finally:
+            self.__session.close()
+            self.__write_session.close()
+
+        # create result message
+        msg = "Export to cPanel finished. "
+        msg += "{} DNS records added, {} changed, {} deleted. ".format(len(add_records) - updated_count, updated_count,
+                                                                       len(delete_lines) - updated_count)
+        if self.__ignored_objects:
+            msg += "Ignored objects with invalid IP and/or hostname: {}".format(self.__ignored_objects)
+        self.set_msg(msg)
 
     def get_a_records(self, cur_domain: str):
         """
@@ -442,11 +622,12 @@ class ExternalSystemCpanelDns(ExternalSystem):
 
         return output
 
-    def get_data(self, url: str):
+    def get_data(self, url: str, changes_data: bool = False):
         """
         Sends an HTTP request to cPanel and returns result
         Args:
             url: part of the URL request to use.
+            changes_data: the request changes the zone - overload responses are not retried
         Returns:
             JSON data, which are returned from API
         """
@@ -454,24 +635,14 @@ class ExternalSystemCpanelDns(ExternalSystem):
         json_result = {}
 
         try:
-            # curl request
-            __session__ = requests.Session()
-            __session__.auth = (self.__cpanel_api_user, self.__cpanel_api_password)
-
-            headers = {
-                'Authorization': 'WHM %s:%s' % (self.__cpanel_api_user, self.__cpanel_api_token),
-            }
             url = self.__cpanel_api_url + url
-            response = requests.get(url,
-                                    headers=headers,
-                                    auth=(self.__cpanel_api_user, self.__cpanel_api_password),
-                                    )
+            session = self.__write_session if changes_data else self.__session
+            response = session.get(url)
 
             # If the response was successful, no Exception will be raised
             response.raise_for_status()
             # get JSON data
             json_result = response.json()
-            __session__.close()
         except HTTPError as http_err:
             self.error(f'HTTP error occurred: {http_err}')
         except Exception as err:
@@ -494,27 +665,21 @@ class ExternalSystemCpanelDns(ExternalSystem):
         url_parameters += "&domain={}".format(cur_domain)
         url_parameters += "&name={}".format(cur_hostname)
         url_parameters += "&type=A&address={}".format(cur_ip)
-        self.get_data(url_parameters)
+        self.get_data(url_parameters, changes_data=True)
 
-    def delete_a_records(self, cur_domain, cur_hostname):
+    def remove_zone_record(self, cur_domain, cur_line):
         """
-        Adds an A record to the given domain in cPanel
+        Removes a record from the given domain in cPanel
         Args:
-            cur_domain:     domain for adding the record
-            cur_hostname:   host part
+            cur_domain:     domain of the record
+            cur_line:       line of the record in the zone
 
         Returns:
 
         """
-        # get all A records in zone
-        records = self.get_a_records(cur_domain)
-        for r_name in records:
-            # check if record has the correct name
-            if r_name == cur_hostname:
-                # delete enty
-                url_parameters = "cpanel_jsonapi_module=ZoneEdit&cpanel_jsonapi_func=remove_zone_record"
-                url_parameters += "&domain={}&line={}".format(cur_domain, str(records[r_name]['line']))
-                self.get_data(url_parameters)
+        url_parameters = "cpanel_jsonapi_module=ZoneEdit&cpanel_jsonapi_func=remove_zone_record"
+        url_parameters += "&domain={}&line={}".format(cur_domain, str(cur_line))
+        self.get_data(url_parameters, changes_data=True)
 
     def format_hostname(self, value: str) -> str:
         """
@@ -547,6 +712,8 @@ class ExternalSystemCpanelDns(ExternalSystem):
 
 class ExternalSystemCsv(ExternalSystem):
 
+    thread_safe = True
+
     parameters = [
         {"name": "csv_filename", "required": False, "description": "name of the output CSV file. Default: stdout",
          "default": "/tmp/testfile.csv"},
@@ -575,16 +742,19 @@ class ExternalSystemCsv(ExternalSystem):
         for key in self.__variables:
             if key not in self.header:
                 self.header.append(key)
-            row.update({key: str(self._export_vars.get(key, ExportVariable(key, "")).get_value(cmdb_object, template_data))})
+            row.update({key: str(self.get_export_variable(key, "").get_value(cmdb_object, template_data))})
         self.rows.append(row)
 
     def finish_export(self):
         import csv
+        start_time = time.perf_counter()
         with open(self.filename, 'w', newline='') as csv_file:
             writer = csv.DictWriter(csv_file, fieldnames=self.header, delimiter=self.delimiter, quotechar=self.enclosure)
             writer.writeheader()
             for row in self.rows:
                 writer.writerow(row)
+            bytes_written = csv_file.tell()
+        self.add_io_metrics(time.perf_counter() - start_time, bytes_written)
 
 
 class ExternalSystemAnsible(ExternalSystem):
@@ -624,7 +794,7 @@ class ExternalSystemAnsible(ExternalSystem):
 
     def add_object(self, cmdb_object, template_data):
         # get hostname for ansible inventory
-        hostname = self._export_vars.get("hostname", ExportVariable("hostname", "default")).get_value(cmdb_object, template_data)
+        hostname = self.get_export_variable("hostname", "default").get_value(cmdb_object, template_data)
 
         if hostname:
             self.host_list.append(hostname)
@@ -638,7 +808,7 @@ class ExternalSystemAnsible(ExternalSystem):
             matches = re.search(r'group_(.*)$', v_name)
             if matches:
                 group_name = matches.group(1)
-                group_value = self._export_vars.get(v_name, ExportVariable(v_name, "")).get_value(cmdb_object, template_data)
+                group_value = self.get_export_variable(v_name, "").get_value(cmdb_object, template_data)
                 # check if the value is true
                 if group_name != 'all' and group_value in ['true', 'True']:
                     # write to ansible group store
@@ -648,7 +818,7 @@ class ExternalSystemAnsible(ExternalSystem):
             matches = re.search(r'hostvar_(.*)$', v_name)
             if matches:
                 host_var_name = matches.group(1)
-                host_var_value = self._export_vars.get(v_name, ExportVariable(v_name, "")).get_value(cmdb_object, template_data)
+                host_var_value = self.get_export_variable(v_name, "").get_value(cmdb_object, template_data)
                 hostvars.update({host_var_name: host_var_value})
 
         # put all hosts into ansible group all
@@ -674,6 +844,8 @@ class ExternalSystemAnsible(ExternalSystem):
 
 class ExternalSystemExecuteScript(ExternalSystem):
 
+    thread_safe = True
+
     parameters = [
         {"name": "script", "required": True, "description": "The script or binary to execute", "default": "/opt/scripts/export"},
         {"name": "timeout", "required": True, "description": "Timeout for executing the script in seconds", "default": "30"}
@@ -698,7 +870,7 @@ class ExternalSystemExecuteScript(ExternalSystem):
         row["object_id"] = str(cmdb_object.object_information['object_id'])
         row["variables"] = {}
         for key in self._export_vars:
-            row["variables"][key] = str(self._export_vars.get(key, ExportVariable(key, "")).get_value(cmdb_object, template_data))
+            row["variables"][key] = str(self.get_export_variable(key, "").get_value(cmdb_object, template_data))
         self.__rows.append(row)
 
     def finish_export(self):
@@ -722,7 +894,9 @@ class ExternalSystemExecuteScript(ExternalSystem):
 
         # execute script
         try:
+            start_time = time.perf_counter()
             result = subprocess.run(self.__script, timeout=self.__timeout, input=json_data, encoding="utf-8")
+            self.add_io_metrics(time.perf_counter() - start_time, len(json_data.encode("utf-8")))
             if result.returncode != 0:
                 self.error("executed script returned an error")
         except FileNotFoundError:
@@ -733,11 +907,14 @@ class ExternalSystemExecuteScript(ExternalSystem):
 
 class ExternalSystemGenericRestCall(ExternalSystem):
 
+    thread_safe = True
+
     parameters = [
         {"name": "url", "required": True, "description": "URL for HTTP POST", "default": "https://localhost:8443/dg_export"},
         {"name": "timeout", "required": True, "description": "Timeout for executing the REST call in seconds", "default": "30"},
         {"name": "username", "required": False, "description": "Username for a HTTP basic authentication. If empty, no authentication will be done.", "default": ""},
-        {"name": "password", "required": False, "description": "Password for a HTTP basic authentication.", "default": ""}
+        {"name": "password", "required": False, "description": "Password for a HTTP basic authentication.", "default": ""},
+        {"name": "retries", "required": False, "description": "Number of retries of a failed REST call", "default": "3"}
     ]
 
     variables = [{}]
@@ -749,6 +926,7 @@ class ExternalSystemGenericRestCall(ExternalSystem):
         self.__timeout = int(self._destination_parms.get("timeout"))
         self.__username = self._destination_parms.get("username")
         self.__password = self._destination_parms.get("password")
+        self.__retries = int(self._destination_parms.get("retries"))
         self.__rows = []
         if not (self.__url and self.__timeout):
             self.error("missing parameters")
@@ -761,7 +939,7 @@ class ExternalSystemGenericRestCall(ExternalSystem):
         row["object_id"] = str(cmdb_object.object_information['object_id'])
         row["variables"] = {}
         for key in self._export_vars:
-            row["variables"][key] = str(self._export_vars.get(key, ExportVariable(key, "")).get_value(cmdb_object, template_data))
+            row["variables"][key] = str(self.get_export_variable(key, "").get_value(cmdb_object, template_data))
         self.__rows.append(row)
 
     def finish_export(self):
@@ -775,15 +953,18 @@ class ExternalSystemGenericRestCall(ExternalSystem):
         auth = None
         if self.__username:
             auth = (self.__username, self.__password)
+        session = create_http_session(self.__retries, pool_size=1, io_callback=self.add_io_metrics)
         try:
-            response = requests.post(self.__url, data=json_data, headers=headers, auth=auth, verify=False,
-                                     timeout=self.__timeout)
+            response = session.post(self.__url, data=json_data, headers=headers, auth=auth, verify=False,
+                                    timeout=self.__timeout)
             if response.status_code > 202:
                 self.error("Error communicating to REST endpoint: HTTP/{}".format(str(response.status_code)))
         except requests.exceptions.ConnectionError:
             self.error("Can't connect to REST endpoint")
         except requests.exceptions.Timeout:
             self.error("Timeout connecting to REST endpoint")
+        finally:
+            session.close()
 
 
 class ExternalSystemGenericPullJson(ExternalSystem):
@@ -804,7 +985,7 @@ class ExternalSystemGenericPullJson(ExternalSystem):
         row["object_id"] = str(cmdb_object.object_information['object_id'])
         row["variables"] = {}
         for key in self._export_vars:
-            row["variables"][key] = str(self._export_vars.get(key, ExportVariable(key, "")).get_value(cmdb_object, template_data))
+            row["variables"][key] = str(self.get_export_variable(key, "").get_value(cmdb_object, template_data))
         self.__rows.append(row)
 
     def finish_export(self):
@@ -815,11 +996,16 @@ class ExternalSystemGenericPullJson(ExternalSystem):
 
 class ExternalSystemMySQLDB(ExternalSystem):
 
+    thread_safe = True
+
     parameters = [
         {"name": "dbserver", "required": True, "description": "database server", "default": "localhost"},
         {"name": "database", "required": True, "description": "database name", "default": "db"},
         {"name": "username", "required": False, "description": "username for database server", "default": "user"},
-        {"name": "password", "required": False, "description": "password for database server", "default": "password"}
+        {"name": "password", "required": False, "description": "password for database server", "default": "password"},
+        {"name": "idColumn", "required": False, "description": "column of all tables which contains the object ID. Needed for incremental exports", "default": ""},
+        {"name": "syncMode", "required": False, "description": "replace: delete and insert all rows. diff: only write changed rows, needs a primary key", "default": "replace"},
+        {"name": "batchSize", "required": False, "description": "number of rows per INSERT statement", "default": "1000"}
     ]
 
     variables = [
@@ -833,6 +1019,11 @@ class ExternalSystemMySQLDB(ExternalSystem):
     def __init__(self, destination_parms, export_vars):
         super(ExternalSystemMySQLDB, self).__init__(destination_parms, export_vars)
 
+        # rows can only be replaced incrementally if they contain the object ID
+        self.__id_column = self._destination_parms.get("idColumn")
+        self.delta_support = bool(self.__id_column)
+        self.__diff_mode = self._destination_parms.get("syncMode") == "diff"
+        self.__batch_size = max(int(self._destination_parms.get("batchSize")), 1)
 
         # get table names for sync
         self.__tables = []
@@ -842,15 +1033,21 @@ class ExternalSystemMySQLDB(ExternalSystem):
                 table_name = export_var.replace("table_", "", 1)
                 self.__tables.append(table_name)
                 self.__table_data[table_name] = []
+        self.__object_ids = []
+        self.__deleted_ids = []
 
     def prepare_export(self):
         pass
 
     def add_object(self, cmdb_object, template_data):
         # add data for insert statement
+        self.__object_ids.append(cmdb_object.object_information['object_id'])
         for table in self.__tables:
             varname = "table_" + table
-            self.__table_data[table].append(str(self._export_vars.get(varname, ExportVariable(varname, "")).get_value(cmdb_object, template_data)))
+            self.__table_data[table].append(str(self.get_export_variable(varname, "").get_value(cmdb_object, template_data)))
+
+    def delete_object(self, public_id):
+        self.__deleted_ids.append(public_id)
 
     def finish_export(self):
         # connect to database
@@ -867,21 +1064,72 @@ class ExternalSystemMySQLDB(ExternalSystem):
             # beginn transaction
             db_connection.begin()
 
-            # remove all data from existing tables
             for table in self.__tables:
                 with db_connection.cursor() as cursor:
-                    sql = "DELETE FROM {}".format(table)
-                    cursor.execute(sql)
-
-            # insert new data in all tables
-            for table in self.__tables:
-                for data in self.__table_data[table]:
-                    with db_connection.cursor() as cursor:
-                        sql = "INSERT INTO {} VALUES({})".format(table, data)
-                        cursor.execute(sql)
+                    if self.incremental:
+                        # remove the rows of changed and deleted objects only
+                        replaced_ids = self.__object_ids + self.__deleted_ids
+                        for i in range(0, len(replaced_ids), self.__batch_size):
+                            id_chunk = replaced_ids[i:i + self.__batch_size]
+                            sql = "DELETE FROM {} WHERE {} IN ({})".format(table, self.__id_column,
+                                                                           ", ".join(["%s"] * len(id_chunk)))
+                            self.__execute(cursor, sql, id_chunk)
+                        self.__insert_rows(cursor, table, self.__table_data[table])
+                    elif self.__diff_mode:
+                        self.__sync_table(cursor, table, self.__table_data[table])
+                    else:
+                        # remove all data from existing tables
+                        self.__execute(cursor, "DELETE FROM {}".format(table))
+                        self.__insert_rows(cursor, table, self.__table_data[table])
 
             # close transaction
             db_connection.commit()
 
         finally:
             db_connection.close()
+
+    def __execute(self, cursor, sql, args=None):
+        start_time = time.perf_counter()
+        cursor.execute(sql, args)
+        self.add_io_metrics(time.perf_counter() - start_time, len(sql.encode("utf-8")))
+
+    def __get_columns(self, cursor, table):
+        self.__execute(cursor, "SELECT * FROM {} LIMIT 0".format(table))
+        return [column[0] for column in cursor.description]
+
+    def __get_primary_key(self, cursor, table):
+        self.__execute(cursor, "SHOW KEYS FROM {} WHERE Key_name = 'PRIMARY'".format(table))
+        return [row["Column_name"] for row in cursor.fetchall()]
+
+    def __insert_rows(self, cursor, table, rows):
+        """insert the rows with multi-row INSERT statements - rows with an existing key are updated"""
+        columns = self.__get_columns(cursor, table)
+        update_sql = ", ".join(["`{0}` = VALUES(`{0}`)".format(column) for column in columns])
+        for i in range(0, len(rows), self.__batch_size):
+            values_sql = ", ".join(["({})".format(data) for data in rows[i:i + self.__batch_size]])
+            self.__execute(cursor, "INSERT INTO {} VALUES {} ON DUPLICATE KEY UPDATE {}".format(table, values_sql, update_sql))
+
+    def __sync_table(self, cursor, table, rows):
+        """
+        write only the differences to the table: the new rows are loaded into a temporary table,
+        rows with a key which does not exist anymore are deleted and new or changed rows are upserted.
+        MySQL does not write rows whose values are unchanged.
+        """
+        primary_key = self.__get_primary_key(cursor, table)
+        if not primary_key:
+            self.error("syncMode diff needs a primary key in table {}".format(table))
+        columns = self.__get_columns(cursor, table)
+        update_columns = [column for column in columns if column not in primary_key] or primary_key
+        temp_table = "{}_datagerry_sync".format(table)
+        self.__execute(cursor, "DROP TEMPORARY TABLE IF EXISTS {}".format(temp_table))
+        self.__execute(cursor, "CREATE TEMPORARY TABLE {} LIKE {}".format(temp_table, table))
+        try:
+            self.__insert_rows(cursor, temp_table, rows)
+            join_sql = " AND ".join(["{0}.`{2}` = {1}.`{2}`".format(table, temp_table, column) for column in primary_key])
+            self.__execute(cursor, "DELETE {0} FROM {0} LEFT JOIN {1} ON {2} WHERE {1}.`{3}` IS NULL"
+                           .format(table, temp_table, join_sql, primary_key[0]))
+            update_sql = ", ".join(["`{0}` = VALUES(`{0}`)".format(column) for column in update_columns])
+            self.__execute(cursor, "INSERT INTO {0} SELECT * FROM {1} ON DUPLICATE KEY UPDATE {2}"
+                           .format(table, temp_table, update_sql))
+        finally:
+            self.__execute(cursor, "DROP TEMPORARY TABLE IF EXISTS {}".format(temp_table))
@@ -15,24 +15,25 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import logging
+import threading
+import time
 import cmdb.process_management.service
 import cmdb.exportd.exporter_base
-import time
-import sched
 
-from threading import Thread
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from cmdb.exportd.exportd_job.exportd_job_manager import ExportdJobManagement
 from cmdb.exportd.exportd_job.exportd_job import ExecuteState
 from cmdb.data_storage.database_manager import DatabaseManagerMongo
+from cmdb.utils.error import CMDBError
 from cmdb.utils.system_config import SystemConfigReader
 from cmdb.exportd.exportd_logs.exportd_log_manager import ExportdLogManager
 from cmdb.exportd.exportd_logs.exportd_log_manager import LogManagerInsertError, LogAction, ExportdJobLog
 from cmdb.user_management.managers.user_manager import UserManager
+from cmdb.framework.managers.type_cache import type_cache
 
 
 LOGGER = logging.getLogger(__name__)
-scheduler = sched.scheduler(time.time, time.sleep)
 
 
 class ExportdService(cmdb.process_management.service.AbstractCmdbService):
@@ -44,127 +45,211 @@ class ExportdService(cmdb.process_management.service.AbstractCmdbService):
                             "cmdb.core.objecttype.#",
                             "cmdb.core.objecttypes.#",
                             "cmdb.exportd.#"]
+        self._scheduler = None
+
+    def start(self):
+        # all job runs share one database connection pool
+        scr = SystemConfigReader()
+        database_manager = DatabaseManagerMongo(
+            **scr.get_all_values_from_section('Database')
+        )
+        self._scheduler = ExportdScheduler(database_manager,
+                                           debounce=self.__get_option(scr, 'debounce', 5),
+                                           workers=self.__get_option(scr, 'workers', 4),
+                                           max_delay=self.__get_option(scr, 'max_delay', 60))
+        self._event_debounce = float(self.__get_option(scr, 'event_debounce', 1))
+        super(ExportdService, self).start()
+
+    @staticmethod
+    def __get_option(scr, name, default):
+        try:
+            return scr.get_value(name, 'Exportd', default)
+        except (KeyError, CMDBError):
+            return default
 
     def _run(self):
         LOGGER.info("{}: start run".format(self._name))
         while not self._event_shutdown.is_set():
-            scheduler.run()
+            self._scheduler.run_pending()
             time.sleep(1)
+        self._scheduler.shutdown()
         LOGGER.info("{}: end run".format(self._name))
 
     def _handle_event(self, event):
         LOGGER.debug("event received: {}".format(event.get_type()))
+        type_cache.handle_event(event)
         self.handler(event)
 
-    def __schedule_job(self, event):
-        pass
-
     def handler(self, event):
         # get type of Event
         event_type = event.get_type()
 
-        # get public_id from Event
-        event_param_id = event.get_param("id")
-
-        # get type_id public_id from Event
-        event_param_type_id = event.get_param("type_id")
-
-        # get Exportd Job state
-        event_param_state = event.get_param("active")
-
-        for q in scheduler.queue:
-            if "cmdb.core.object" in event_type and event_param_type_id == q.argument[0].get_param("type_id"):
-                scheduler.cancel(q)
-
-            elif "cmdb.exportd" in event.get_type() and event_param_id == q.argument[0].get_param("id"):
-                scheduler.cancel(q)
-
-        if event_param_state:
-            scheduler.enter(10, 1, self.start_thread, argument=(event,))
-        elif "cmdb.exportd.deleted" != event_type and "cmdb.core.object.deleted" != event_type:
-            scheduler.enter(5, 1, self.start_thread, argument=(event, ))
-
-    @staticmethod
-    def start_thread(event):
-        event_type = event.get_type()
-        # start new threads
-
-        if "cmdb.exportd.run_manual" == event_type:
-            new_thread = ExportdThread(event=event, state=True)
-            new_thread.start()
+        # type changes are only relevant for the type cache
+        if "cmdb.core.objecttype" in event_type:
+            return
 
+        if "cmdb.exportd.deleted" == event_type:
+            self._scheduler.cancel(event)
+        elif "cmdb.exportd.run_manual" == event_type or event.get_param("active"):
+            self._scheduler.schedule(event)
         elif "cmdb.core.object" in event_type:
-            new_thread = ExportdThread(event=event, state=False)
-            new_thread.start()
-
+            # object events (including deletions) are scheduled per affected type - aggregated events carry
+            # several types
+            self._scheduler.schedule(event)
         elif "cmdb.exportd" in event_type:
-            new_thread = ExportdThread(event=event, state=event.get_param("active"))
-            new_thread.start()
+            # job was deactivated - drop an outstanding run
+            self._scheduler.cancel(event)
+
+
+class ExportdScheduler:
+    """
+    Scheduler of the exportd job runs triggered by events.
+    Events are coalesced per job (object events per object type) within a debounce window - every new event
+    restarts the window, but a run is delayed at most max_delay seconds after the first event of the window.
+    Object types which are due together start every job at most once, even if it exports several of them.
+    Every job runs at most once at the same time, events which are received during a run trigger exactly one
+    follow-up run. All runs are executed by a fixed size worker pool.
+    """
+
+    def __init__(self, database_manager: DatabaseManagerMongo, debounce: float = 5, workers: int = 4,
+                 max_delay: float = 60):
+        self.__dbm = database_manager
+        self.__debounce = float(debounce)
+        self.__max_delay = max(float(max_delay), self.__debounce)
+        self.__executor = ThreadPoolExecutor(max_workers=int(workers))
+        self.__lock = threading.Lock()
+        # schedule key -> (due time, latest event, time of the first event)
+        self.__pending = {}
+        # ids of the running jobs and the latest event received for them while running
+        self.__running = set()
+        self.__rerun = {}
+
+        self.log_manager = ExportdLogManager(database_manager=self.__dbm)
+        self.exportd_job_manager = ExportdJobManagement(database_manager=self.__dbm)
+        self.user_manager = UserManager(database_manager=self.__dbm)
 
+    @staticmethod
+    def __coalesce(current_event, event):
+        """Select the event of a coalesced run - a requested manual run is never replaced by other events,
+        because only manual runs force a full export of incremental jobs"""
+        if current_event and current_event.get_type() == "cmdb.exportd.run_manual":
+            if event.get_type() != "cmdb.exportd.run_manual":
+                return current_event
+        return event
 
-class ExportdThread(Thread):
+    @staticmethod
+    def __get_keys(event):
+        if "cmdb.core.object" in event.get_type():
+            return [('type', type_id) for type_id in event.get_type_ids()]
+        return [('job', event.get_param("id"))]
+
+    def schedule(self, event):
+        """Schedule the run of an event - an already pending run of the same job or type is replaced,
+        but not delayed beyond max_delay after its first event"""
+        now = time.time()
+        with self.__lock:
+            for key in self.__get_keys(event):
+                pending_event, first_time = None, now
+                if key in self.__pending:
+                    _, pending_event, first_time = self.__pending[key]
+                due_time = min(now + self.__debounce, first_time + self.__max_delay)
+                self.__pending[key] = (due_time, self.__coalesce(pending_event, event), first_time)
+
+    def cancel(self, event):
+        """Drop the pending run of the job of the event"""
+        with self.__lock:
+            for key in self.__get_keys(event):
+                self.__pending.pop(key, None)
+
+    def run_pending(self):
+        """Start all runs whose debounce window has passed - called periodically by the service"""
+        now = time.time()
+        with self.__lock:
+            due_keys = [key for key, (due_time, _, _) in self.__pending.items() if due_time <= now]
+            due_runs = [(key, self.__pending.pop(key)[1]) for key in due_keys]
+        # the jobs of all due types are resolved together - a job with several of these types runs once
+        due_types = {key_id: event for (key_type, key_id), event in due_runs if key_type == 'type'}
+        if due_types:
+            self.__executor.submit(self.__dispatch_types, due_types)
+        for (key_type, key_id), event in due_runs:
+            if key_type != 'type':
+                self.__executor.submit(self.__dispatch_job, key_id, event)
+
+    def shutdown(self):
+        self.__executor.shutdown(wait=True)
+
+    def __dispatch_types(self, type_events: dict):
+        """Start the event based jobs which export one of the types
+        Args:
+            type_events: type id -> latest event of the type
+        """
+        try:
+            for job in self.exportd_job_manager.get_job_by_event_based(True):
+                if not (job.get_active() and job.scheduling["event"]["active"]):
+                    continue
+                job_event = None
+                for item in job.get_sources():
+                    if item["type_id"] in type_events:
+                        job_event = self.__coalesce(job_event, type_events[item["type_id"]])
+                if job_event:
+                    self.__start_job(job.get_public_id(), job_event)
+        except Exception as err:
+            LOGGER.error(err)
 
-    def __init__(self, event, state=False):
-        super(ExportdThread, self).__init__()
-        self.job = None
-        self.job_id = event.get_param("id")
-        self.type_id = event.get_param("type_id")
-        self.user_id = event.get_param("user_id")
-        self.event = event
-        self.is_active = state
-        self.exception_handling = None
+    def __dispatch_job(self, job_id: int, event):
+        try:
+            self.__start_job(job_id, event)
+        except Exception as err:
+            LOGGER.error(err)
 
-        scr = SystemConfigReader()
-        database_options = scr.get_all_values_from_section('Database')
-        self.__dbm = DatabaseManagerMongo(
-            **database_options
-        )
-        self.log_manager = ExportdLogManager(
-            database_manager=self.__dbm)
-        self.exportd_job_manager = ExportdJobManagement(database_manager=self.__dbm)
-        self.user_manager = UserManager(database_manager=self.__dbm)
+    def __start_job(self, job_id: int, event):
+        with self.__lock:
+            if job_id in self.__running:
+                self.__rerun[job_id] = self.__coalesce(self.__rerun.get(job_id), event)
+                return
+            self.__running.add(job_id)
+        self.__executor.submit(self.__run_job, job_id, event)
 
-    def run(self):
+    def __run_job(self, job_id: int, event):
         try:
-            if self.type_id:
-                for obj in self.exportd_job_manager.get_job_by_event_based(True):
-                    if next((item for item in obj.get_sources() if item["type_id"] == self.type_id), None):
-                        if obj.get_active() and obj.scheduling["event"]["active"]:
-                            self.job = obj
-                            self.worker()
-            elif self.is_active:
-                self.job = self.exportd_job_manager.get_job(self.job_id)
-                self.worker()
-        except Exception as ex:
-            LOGGER.error(ex)
-            return ex
-
-    def worker(self):
+            self.worker(self.exportd_job_manager.get_job(job_id), event)
+        except Exception as err:
+            LOGGER.error(err)
+        finally:
+            with self.__lock:
+                self.__running.discard(job_id)
+                rerun_event = self.__rerun.pop(job_id, None)
+            if rerun_event:
+                self.__start_job(job_id, rerun_event)
+
+    def worker(self, job, event):
         cur_user = None
+        exception_handling = None
+        user_id = event.get_param("user_id")
         try:
             # update job for UI
-            self.job.state = ExecuteState.RUNNING.name
-            self.job.last_execute_date = datetime.utcnow()
+            job.state = ExecuteState.RUNNING.name
+            job.last_execute_date = datetime.utcnow()
 
             # get current user
-            cur_user = self.user_manager.get(self.user_id)
+            cur_user = self.user_manager.get(user_id)
 
-            self.exportd_job_manager.update_job(self.job, self.user_manager.get(self.user_id), event_start=False)
+            self.exportd_job_manager.update_job(job, cur_user, event_start=False)
             # execute Exportd job
-            job = cmdb.exportd.exporter_base.ExportdManagerBase(self.job)
-            job.execute(self.event, cur_user.get_public_id(), cur_user.get_display_name())
+            manager = cmdb.exportd.exporter_base.ExportdManagerBase(job, database_manager=self.__dbm)
+            manager.execute(event, cur_user.get_public_id(), cur_user.get_display_name())
 
         except Exception as err:
             LOGGER.error(err)
-            self.exception_handling = err
+            exception_handling = err
             # Generate Error log
             try:
                 log_params = {
-                    'job_id': self.job.get_public_id(),
+                    'job_id': job.get_public_id(),
                     'state': False,
                     'user_id': cur_user.get_public_id(),
                     'user_name': cur_user.get_display_name(),
-                    'event': self.event.get_type(),
+                    'event': event.get_type(),
                     'message': ['Successful'] if not err else err.args,
                 }
                 self.log_manager.insert_log(action=LogAction.EXECUTE, log_type=ExportdJobLog.__name__, **log_params)
@@ -172,8 +257,5 @@ class ExportdThread(Thread):
                 LOGGER.error(err)
         finally:
             # update job for UI
-            self.job.state = ExecuteState.SUCCESSFUL.name if not self.exception_handling else ExecuteState.FAILED.name
-            self.exportd_job_manager.update_job(self.job, self.user_manager.get(self.user_id), event_start=False)
-
-
-
+            job.state = ExecuteState.SUCCESSFUL.name if not exception_handling else ExecuteState.FAILED.name
+            self.exportd_job_manager.update_job(job, self.user_manager.get(user_id), event_start=False)
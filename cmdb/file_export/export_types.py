@@ -19,6 +19,7 @@ import io
 import json
 import re
 import tempfile
+import textwrap
 import xml.dom.minidom
 import xml.etree.ElementTree as ET
 import zipfile
@@ -44,12 +45,32 @@ class ExportType:
     DESCRIPTION = None
     ACTIVE = None
 
+    # size in bytes/characters of the chunks, which are passed to the client while streaming
+    STREAM_CHUNK_SIZE = 64 * 1024
+
     def __init__(self):
         pass
 
     def export(self, object_list, *args):
         pass
 
+    def stream(self, object_list, *args):
+        """Generator based export - yields the export output in chunks while the objects are consumed.
+        The default implementation yields the complete output of `export`.
+
+        Args:
+            object_list: list or iterator of the objects to be exported
+            args: additional export arguments
+
+        Returns:
+            Iterator over the export output
+        """
+        export = self.export(list(object_list), *args)
+        if isinstance(export, (str, bytes)):
+            yield export
+        else:
+            yield export.getvalue()
+
 
 class ZipExportType(ExportType):
 
@@ -72,41 +93,105 @@ class ZipExportType(ExportType):
         Returns:
             zip file containing object files separated by types
         """
+        return io.BytesIO(b''.join(self.stream(object_list, *args)))
+
+    def stream(self, object_list, *args):
+
+        """
+        Streams a zip file, containing the object list sorted by type in several files.
+        The objects are grouped by type in a single pass, every type file is compressed and passed
+        to the client while its export is generated.
+
+        Args:
+            object_list: List or iterator of objects to be exported
+            args: the filetype with which the objects are stored
+
+        Returns:
+            Iterator over the zip file content
+        """
 
-        # check what export type is requested and intitializes a new zip file in memory
-        export_type = load_class("cmdb.file_export.export_types." + args[0])()
-        zipped_file = io.BytesIO()
+        # group the objects by their type
+        type_groups = {}
+        for obj in object_list:
+            type_groups.setdefault(obj.type_id, []).append(obj)
 
-        # Build .zip file
-        with zipfile.ZipFile(zipped_file, "a", zipfile.ZIP_DEFLATED, False) as f:
+        yield from self.__stream_type_groups(type_groups.items(), args[0])
 
-            # Enters loop until the object list is empty
-            while len(object_list) > 0:
+    def stream_query(self, query: dict, *args):
 
-                # Set what type the loop filters to and makes an empty list
-                type_id = object_list[len(object_list) - 1].type_id
-                type_name = object_manager.get_type(type_id).get_name()
-                type_list = []
+        """
+        Streams a zip file, containing the objects of a database query sorted by type in several files.
+        The distinct type ids are loaded first, then every type file is exported from its own database cursor,
+        so the objects are not held in memory.
+        The type ids are loaded when the method is called - query errors are raised before the stream is started.
 
-                # Filters object list to the current type_id and inserts it into type_list
-                # When an object is inserted into type_list it gets deleted from object_list
-                for i in range(len(object_list) - 1, -1, -1):
-                    if object_list[i].type_id == type_id:
-                        type_list.append(object_list[i])
-                        del object_list[i]
+        Args:
+            query: database query of the objects to be exported
+            args: the filetype with which the objects are stored
 
-                # Runs the requested export function and returns the output in the export variable
-                export = export_type.export(type_list)
+        Returns:
+            Iterator over the zip file content
+        """
 
-                # check if export output is a string, bytes or a file and inserts it into the zip file
-                if isinstance(export, str) or isinstance(export, bytes):
-                    f.writestr((type_name + "_ID_" + str(type_id) + "." + export_type.FILE_EXTENSION).format(i), export)
-                else:
-                    f.writestr((type_name + "_ID_" + str(type_id) + "." + export_type.FILE_EXTENSION).format(i), export.getvalue())
+        type_ids = sorted(object_manager.get_object_type_ids_by(**query))
+        type_groups = ((type_id, object_manager.iterate_objects_by(sort="public_id",
+                                                                   **{'$and': [query, {'type_id': type_id}]}))
+                       for type_id in type_ids)
+        return self.__stream_type_groups(type_groups, args[0])
 
-        # returns zipped file
-        zipped_file.seek(0)
-        return zipped_file
+    @staticmethod
+    def __stream_type_groups(type_groups, export_class):
+        """
+        Streams the zip file of the grouped objects.
+
+        Args:
+            type_groups: iterable of (type id, objects of the type)
+            export_class: the filetype with which the objects are stored
+
+        Returns:
+            Iterator over the zip file content
+        """
+
+        # check what export type is requested
+        export_type = load_class("cmdb.file_export.export_types." + export_class)()
+
+        # Build .zip file - the archive is written into a buffer, which is drained after every write
+        zip_stream = _ZipStream()
+        with zipfile.ZipFile(zip_stream, "w", zipfile.ZIP_DEFLATED, False) as f:
+            for type_id, type_list in type_groups:
+                type_name = type_manager.get(type_id).get_name()
+                file_name = type_name + "_ID_" + str(type_id) + "." + export_type.FILE_EXTENSION
+
+                # Runs the requested export and writes the output into the zip file while it is generated
+                with f.open(file_name, mode="w") as zipped_type_file:
+                    for chunk in export_type.stream(type_list):
+                        zipped_type_file.write(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+                        yield from zip_stream.drain()
+                yield from zip_stream.drain()
+
+        # central directory of the zip file
+        yield from zip_stream.drain()
+
+
+class _ZipStream:
+    """Write-only buffer for the zip file stream - written data can be drained for sending"""
+
+    def __init__(self):
+        self.__buffer = []
+
+    def write(self, data: bytes) -> int:
+        self.__buffer.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        """Yields the written data since the last drain - nothing if the compressor did not output data yet"""
+        if len(self.__buffer) > 0:
+            data = b''.join(self.__buffer)
+            self.__buffer = []
+            yield data
 
 
 class CsvExportType(ExportType):
@@ -130,9 +215,25 @@ class CsvExportType(ExportType):
             Csv file containing the object_list
         """
 
+        return io.StringIO(''.join(self.stream(object_list)))
+
+    def stream(self, object_list, *args):
+
+        """ Streams object_list as .csv file
+
+        Args:
+            object_list: The objects to be exported - list or iterator
+            args:
+
+        Returns:
+            Iterator over the csv content chunks
+        """
+
+        csv_file = io.StringIO()
+        writer = csv.writer(csv_file, dialect=csv.excel)
+
         # init values
         header = ['public_id', 'active']
-        rows = []
         current_type_id = None
         current_type_fields = []
 
@@ -143,6 +244,7 @@ class CsvExportType(ExportType):
                 current_type_fields = type_manager.get(obj.type_id).get_fields()
                 for type_field in current_type_fields:
                     header.append(type_field.get('name'))
+                writer.writerow(header)
 
             # throw Exception if objects of different type are detected
             if current_type_id != obj.type_id:
@@ -160,19 +262,17 @@ class CsvExportType(ExportType):
             row.append(str(obj.active))
             for type_field in current_type_fields:
                 row.append(str(obj_fields_dict.get(type_field.get('name'), None)))
-            rows.append(row)
-
-        return self.csv_writer(header, rows)
+            writer.writerow(row)
 
-    def csv_writer(self, header, rows, dialect=csv.excel):
+            # pass the written rows to the client
+            if csv_file.tell() >= self.STREAM_CHUNK_SIZE:
+                yield csv_file.getvalue()
+                csv_file.seek(0)
+                csv_file.truncate(0)
 
-        csv_file = io.StringIO()
-        writer = csv.writer(csv_file, dialect=dialect)
-        writer.writerow(header)
-        for row in rows:
-            writer.writerow(row)
-        csv_file.seek(0)
-        return csv_file
+        if current_type_id is None:
+            writer.writerow(header)
+        yield csv_file.getvalue()
 
 
 class JsonExportType(ExportType):
@@ -196,14 +296,34 @@ class JsonExportType(ExportType):
             Json file containing the object_list
         """
 
-        output = []
+        return ''.join(self.stream(object_list))
+
+    def stream(self, object_list, *args):
+
+        """Streams object_list as .json file
+
+        Args:
+            object_list: The objects to be exported - list or iterator
+            args:
+
+        Returns:
+            Iterator over the json content - one chunk per object
+        """
+
+        types = {}
+        first = True
+        yield '['
 
         for obj in object_list:
+            if obj.type_id not in types:
+                types[obj.type_id] = type_manager.get(obj.type_id)
+            current_type = types[obj.type_id]
+
             # init output element
             output_element = {}
             output_element['public_id'] = obj.public_id
             output_element['active'] = obj.active
-            output_element['type'] = type_manager.get(obj.type_id).get_label()
+            output_element['type'] = current_type.get_label()
             output_element['fields'] = []
 
             # get object fields as dict:
@@ -213,15 +333,18 @@ class JsonExportType(ExportType):
                 obj_fields_dict[obj_field_name] = obj_field.get('value')
 
             # walk over all type fields and add object field values
-            for type_field in type_manager.get(obj.type_id).get_fields():
+            for type_field in current_type.get_fields():
                 output_element['fields'].append({
                     'name': type_field.get('name'),
                     'value': obj_fields_dict.get(type_field.get('name'), None)
                 })
 
-            output.append(output_element)
+            # same layout as a json dump of the complete list with indent 2
+            element = json.dumps(output_element, default=json_encoding.default, ensure_ascii=False, indent=2)
+            yield ('\n' if first else ',\n') + textwrap.indent(element, '  ')
+            first = False
 
-        return json.dumps(output, default=json_encoding.default, ensure_ascii=False, indent=2)
+        yield ']' if first else '\n]'
 
 
 class XlsxExportType(ExportType):
@@ -245,80 +368,73 @@ class XlsxExportType(ExportType):
             Xlsx file containing the object_list
         """
 
+        return b''.join(self.stream(object_list))
+
+    def stream(self, object_list, *args):
+
+        """Streams object_list as .xlsx file
+        The rows are written into a write-only workbook, the saved file is passed to the client in chunks.
+
+        Args:
+            object_list: The objects to be exported - list or iterator
+            args:
+
+        Returns:
+            Iterator over the xlsx file content
+        """
+
         workbook = self.create_xls_object(object_list)
 
         # save workbook
         with tempfile.NamedTemporaryFile() as tmp:
             workbook.save(tmp.name)
             tmp.seek(0)
-            return tmp.read()
+            while True:
+                chunk = tmp.read(self.STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
 
     def create_xls_object(self, object_list):
 
-        # create workbook
-        workbook = openpyxl.Workbook()
+        # create workbook - write-only workbooks do not keep the rows in memory
+        workbook = openpyxl.Workbook(write_only=True)
 
-        # delete default sheet
-        workbook.remove(workbook.active)
+        # one sheet and field list for every object type
+        sheets = {}
+        type_fields = {}
 
-        # sorts data_list by type_id
-        type_id = "type_id"
-        decorated = [(dict_.__dict__[type_id], dict_.__dict__) for dict_ in object_list]
-        decorated = sorted(decorated, key=lambda x: x[0], reverse=False)
-        sorted_list = [dict_ for (key, dict_) in decorated]
-
-        # init values
-        current_type_id = None
-        current_type_fields = []
-        i = 0
-        for obj in sorted_list:
+        for obj in object_list:
 
             # check, if starting a new object type
-            if current_type_id != obj[type_id]:
-                # set current type id and fields
-                current_type_id = obj[type_id]
-                current_type_fields = type_manager.get(obj[type_id]).get_fields()
-                i = 1
+            if obj.type_id not in sheets:
+                # set current type fields
+                current_type = type_manager.get(obj.type_id)
+                type_fields[obj.type_id] = current_type.get_fields()
 
                 # start a new worksheet and rename it
-                title = self.__normalize_sheet_title(object_manager.get_type(obj[type_id]).label)
+                title = self.__normalize_sheet_title(current_type.label)
                 sheet = workbook.create_sheet(title)
+                sheets[obj.type_id] = sheet
 
-                # insert header: public_id, active
-                cell = sheet.cell(row=i, column=1)
-                cell.value = 'public_id'
-                cell = sheet.cell(row=i, column=2)
-                cell.value = 'active'
-
-                # insert header: get fields from type definition
-                c = 3
-                for type_field in current_type_fields:
-                    cell = sheet.cell(row=i, column=c)
-                    cell.value = type_field.get('name')
-                    c = c + 1
-                i = i + 1
-
-            # insert row values: public_id, active
-            cell = sheet.cell(row=i, column=1)
-            cell.value = str(obj["public_id"])
-            cell = sheet.cell(row=i, column=2)
-            cell.value = str(obj["active"])
+                # insert header: public_id, active and the fields from type definition
+                sheet.append(['public_id', 'active'] +
+                             [type_field.get('name') for type_field in type_fields[obj.type_id]])
 
             # get object fields as dict:
             obj_fields_dict = {}
-            for obj_field in obj['fields']:
+            for obj_field in obj.fields:
                 obj_field_name = obj_field.get('name')
                 obj_fields_dict[obj_field_name] = obj_field.get('value')
 
-            # insert row values: fields
-            c = 3
-            for type_field in current_type_fields:
-                cell = sheet.cell(row=i, column=c)
-                cell.value = str(obj_fields_dict.get(type_field.get('name'), None))
-                c = c + 1
+            # insert row values: public_id, active and fields
+            sheets[obj.type_id].append(
+                [str(obj.public_id), str(obj.active)] +
+                [str(obj_fields_dict.get(type_field.get('name'), None)) for type_field in type_fields[obj.type_id]])
 
-            # increase row number
-            i = i + 1
+        # a workbook needs at least one sheet
+        if len(sheets) == 0:
+            workbook.create_sheet()
 
         return workbook
 
@@ -347,10 +463,28 @@ class XmlExportType(ExportType):
             Xml file containing the object_list
         """
 
-        # object list
-        cmdb_object_list = ET.Element('objects')
+        return ''.join(self.stream(object_list))
+
+    def stream(self, object_list, *args):
+
+        """Streams object_list as .xml file
+
+        Args:
+            object_list: The objects to be exported - list or iterator
+            args:
+
+        Returns:
+            Iterator over the xml content - one chunk per object
+        """
+
+        types = {}
+        first = True
 
         for obj in object_list:
+            if obj.type_id not in types:
+                types[obj.type_id] = type_manager.get(obj.type_id)
+            current_type = types[obj.type_id]
+
             # get object fields as dict:
             obj_fields_dict = {}
             for obj_field in obj.fields:
@@ -358,7 +492,7 @@ class XmlExportType(ExportType):
                 obj_fields_dict[obj_field_name] = obj_field.get('value')
 
             # xml output: object
-            cmdb_object = ET.SubElement(cmdb_object_list, 'object')
+            cmdb_object = ET.Element('object')
             cmdb_object_meta = ET.SubElement(cmdb_object, 'meta')
             # xml output meta: public
             cmdb_object_meta_id = ET.SubElement(cmdb_object_meta, 'public_id')
@@ -368,16 +502,28 @@ class XmlExportType(ExportType):
             cmdb_object_meta_active.text = str(obj.active)
             # xml output meta: type
             cmdb_object_meta_type = ET.SubElement(cmdb_object_meta, 'type')
-            cmdb_object_meta_type.text = object_manager.get_type(obj.type_id).label
+            cmdb_object_meta_type.text = current_type.label
             # xml output: fields
             cmdb_object_fields = ET.SubElement(cmdb_object, 'fields')
             # walk over all type fields and add object field values
-            for type_field in type_manager.get(obj.type_id).get_fields():
+            for type_field in current_type.get_fields():
                 field_attribs = {}
                 field_attribs["name"] = str(type_field.get('name'))
                 field_attribs["value"] = str(obj_fields_dict.get(type_field.get('name'), None))
                 ET.SubElement(cmdb_object_fields, "field", field_attribs)
 
-        # return xml as string (pretty printed)
-        return xml.dom.minidom.parseString(
-            ET.tostring(cmdb_object_list, encoding='unicode', method='xml')).toprettyxml()
+            if first:
+                yield '<?xml version="1.0" ?>\n<objects>\n'
+                first = False
+            # xml of the single object - pretty printed inside an objects element, so the object is written at
+            # the same depth as in the complete list (indenting the output would change multi-line attribute values)
+            cmdb_object_list = ET.Element('objects')
+            cmdb_object_list.append(cmdb_object)
+            pretty_list = xml.dom.minidom.parseString(
+                ET.tostring(cmdb_object_list, encoding='unicode', method='xml')).documentElement.toprettyxml(indent='\t')
+            yield pretty_list[len('<objects>\n'):-len('</objects>\n')]
+
+        if first:
+            yield '<?xml version="1.0" ?>\n<objects/>\n'
+        else:
+            yield '</objects>\n'
@@ -14,6 +14,8 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+from itertools import chain
+
 from flask import abort, Response
 
 from cmdb.data_storage.database_manager import DatabaseManagerMongo
@@ -76,7 +78,7 @@ class FileExporter:
         """
 
         Returns:
-            list of objects e.g CmdbObject or TypeModel
+            list or iterator of objects e.g CmdbObject or TypeModel
 
         """
         file_type = self.get_object_type()
@@ -106,7 +108,10 @@ class FileExporter:
         """
         try:
             query = self._build_query({'public_id': self.public_id})
-            return object_manager.get_objects_by(sort="public_id", **query)
+            # the export is streamed - errors must be detected before the response is started
+            if not self.export_type.MULTITYPE_SUPPORT and len(object_manager.get_object_type_ids_by(**query)) > 1:
+                return abort(400, '{} can export only object of the same type'.format(self.export_type.LABEL))
+            return self._start_iteration(object_manager.iterate_objects_by(sort="public_id", **query))
         except ObjectNotFoundError as e:
             return abort(400, e)
         except CMDBError:
@@ -114,12 +119,41 @@ class FileExporter:
 
     def get_all_objects_by_type_id(self):
         try:
-            return object_manager.get_objects_by_type(int(self.public_id))
+            return self._start_iteration(object_manager.iterate_objects_by(type_id=int(self.public_id)))
+        except ObjectNotFoundError as e:
+            return abort(400, e)
+        except CMDBError:
+            return abort(404)
+
+    def get_zip_export(self):
+        """ Stream the zip export of the requested objects - every type is loaded from its own database cursor
+
+            Returns:
+                Iterator over the zip file content
+        """
+        try:
+            query = self._build_query({'public_id': self.public_id})
+            return self.export_type.stream_query(query, self.zip_class)
         except ObjectNotFoundError as e:
             return abort(400, e)
         except CMDBError:
             return abort(404)
 
+    @staticmethod
+    def _start_iteration(objects):
+        """ Load the first object, so query errors are raised before the export response is started
+
+        Args:
+            objects: object iterator
+
+        Returns:
+            iterator over all objects
+        """
+        first_object = next(objects, None)
+        if first_object is None:
+            return iter([])
+        return chain([first_object], objects)
+
     def get_type_by_id(self):
         try:
             query = self._build_query({'public_id': self.public_id})
@@ -160,10 +194,11 @@ class FileExporter:
         import time
 
         timestamp = datetime.datetime.fromtimestamp(time.time()).strftime('%Y_%m_%d-%H_%M_%S')
+        # the export is generated while the response is send - objects are loaded from the database cursor
         if self.zip_class:
-            export = self.export_type.export(self.get_object_list(), self.zip_class)
+            export = self.get_zip_export()
         else:
-            export = self.export_type.export(self.get_object_list())
+            export = self.export_type.stream(self.get_object_list())
         return Response(
             export,
             mimetype="text/" + self.export_type.__class__.FILE_EXTENSION,
@@ -26,11 +26,15 @@ import json
 from cmdb.data_storage.database_utils import object_hook
 from bson import json_util
 from datetime import datetime
-from typing import List
+from typing import List, Dict, Set, Iterator
+
+from pymongo import InsertOne, ReplaceOne
+from pymongo.errors import BulkWriteError
 
 from cmdb.data_storage.database_manager import InsertError, PublicIDAlreadyExists
 from cmdb.event_management.event import Event
 from cmdb.framework.cmdb_base import CmdbManagerBase
+from cmdb.framework.managers.type_cache import type_cache
 from cmdb.framework.managers.type_manager import TypeManager
 from cmdb.framework.models.category import CategoryModel, CategoryTree
 from cmdb.framework.cmdb_dao import RequiredInitKeyNotFoundError
@@ -82,6 +86,54 @@ class CmdbObjectManager(CmdbManagerBase):
     def get_new_id(self, collection: str) -> int:
         return self.dbm.get_next_public_id(collection)
 
+    def reserve_object_ids(self, count: int) -> List[int]:
+        """Reserve a block of new object public ids with a single counter update"""
+        if count < 1:
+            return []
+        first_id = self.dbm.reserve_public_ids(CmdbObject.COLLECTION, count)
+        return list(range(first_id, first_id + count))
+
+    def get_existing_object_ids(self, public_ids: list) -> Set[int]:
+        """Get the subset of the passed public ids which already exist - with a single `$in` query"""
+        if not public_ids:
+            return set()
+        try:
+            raw_objects = self.dbm.find_all(collection=CmdbObject.COLLECTION,
+                                            filter={'public_id': {'$in': list(public_ids)}},
+                                            projection={'_id': 0, 'public_id': 1})
+        except Exception as err:
+            raise ObjectManagerGetError(err)
+        return {raw_object['public_id'] for raw_object in raw_objects}
+
+    def get_object_ids_by(self, **requirements) -> Set[int]:
+        """Get the public ids of all objects matching the requirements - without loading the objects"""
+        try:
+            raw_objects = self.dbm.find_all(collection=CmdbObject.COLLECTION, filter=requirements,
+                                            projection={'_id': 0, 'public_id': 1})
+        except Exception as err:
+            raise ObjectManagerGetError(err)
+        return {raw_object['public_id'] for raw_object in raw_objects}
+
+    def get_object_ids_page(self, limit: int, before_id: int = None, **requirements) -> List[int]:
+        """Get the public ids of the next page of objects matching the requirements - in descending order,
+        starting below `before_id`. The query is complete when the method returns, no cursor is kept open."""
+        if before_id is not None:
+            requirements = {'$and': [requirements, {'public_id': {'$lt': before_id}}]}
+        try:
+            raw_objects = self.dbm.find(CmdbObject.COLLECTION, filter=requirements,
+                                        projection={'_id': 0, 'public_id': 1},
+                                        sort=[('public_id', -1)], limit=limit)
+            return [raw_object['public_id'] for raw_object in raw_objects]
+        except Exception as err:
+            raise ObjectManagerGetError(err)
+
+    def get_object_type_ids_by(self, **requirements) -> List[int]:
+        """Get the distinct type ids of all objects matching the requirements - without loading the objects"""
+        try:
+            return self.dbm.find(CmdbObject.COLLECTION, filter=requirements).distinct('type_id')
+        except Exception as err:
+            raise ObjectManagerGetError(err)
+
     def aggregate(self, collection, pipeline: Pipeline, **kwargs):
         try:
             return self._aggregate(collection=collection, pipeline=pipeline, **kwargs)
@@ -107,11 +159,28 @@ class CmdbObjectManager(CmdbManagerBase):
         verify_access(type_, user, permission)
         return resource
 
-    def get_objects(self, public_ids: list):
+    def get_objects(self, public_ids: list) -> List[CmdbObject]:
+        """Get multiple objects with a single `$in` query.
+
+        Args:
+            public_ids: list of object public ids
+
+        Notes:
+            Ids which do not exist are skipped, no access control will be checked.
+
+        Returns:
+            list of found CmdbObjects
+        """
+        if not public_ids:
+            return []
         object_list = []
-        for public_id in public_ids:
+        try:
+            raw_objects = self._get_many(collection=CmdbObject.COLLECTION, public_id={'$in': list(public_ids)})
+        except Exception as err:
+            raise ObjectManagerGetError(err)
+        for raw_object in raw_objects:
             try:
-                object_list.append(self.get_object(public_id))
+                object_list.append(CmdbObject(**raw_object))
             except CMDBError as err:
                 LOGGER.error(err)
                 continue
@@ -119,17 +188,31 @@ class CmdbObjectManager(CmdbManagerBase):
 
     def get_objects_by(self, sort='public_id', direction=-1, user: UserModel = None,
                        permission: AccessControlPermission = None, **requirements):
-        ack = []
-        objects = self._get_many(collection=CmdbObject.COLLECTION, sort=sort, direction=direction, **requirements)
+        return list(self.iterate_objects_by(sort=sort, direction=direction, user=user, permission=permission,
+                                            **requirements))
+
+    def iterate_objects_by(self, sort='public_id', direction=-1, user: UserModel = None,
+                           permission: AccessControlPermission = None, **requirements) -> Iterator[CmdbObject]:
+        """Streaming variant of get_objects_by - the objects are loaded from the database cursor while iterating"""
+        objects = self.dbm.find(CmdbObject.COLLECTION, filter=requirements, projection={'_id': 0},
+                                sort=[(sort, direction)])
+        # types are loaded only once per call - None marks a type which could not be loaded
+        type_cache = {}
         for obj in objects:
             object_ = CmdbObject(**obj)
+            if object_.type_id not in type_cache:
+                try:
+                    type_cache[object_.type_id] = self._type_manager.get(object_.type_id)
+                except CMDBError:
+                    type_cache[object_.type_id] = None
+            type_ = type_cache[object_.type_id]
+            if type_ is None:
+                continue
             try:
-                type_ = self._type_manager.get(object_.type_id)
                 verify_access(type_, user, permission)
             except CMDBError:
                 continue
-            ack.append(CmdbObject(**obj))
-        return ack
+            yield object_
 
     def get_objects_by_type(self, type_id: int):
         return self.get_objects_by(type_id=type_id)
@@ -259,7 +342,63 @@ class CmdbObjectManager(CmdbManagerBase):
             raise ObjectInsertError(e)
         return ack
 
-    def update_object(self, data: (dict, CmdbObject), user: UserModel = None, permission: AccessControlPermission = None) -> str:
+    def bulk_write_objects(self, objects: List[CmdbObject], replace_ids: Set[int] = None,
+                           user: UserModel = None) -> Dict[int, str]:
+        """Write multiple objects with a single bulk operation.
+
+        Args:
+            objects: objects with already assigned public ids
+            replace_ids: public ids of existing objects - these documents will be replaced, all others are inserted
+            user: user which started the write - used for the events
+
+        Notes:
+            No access control will be checked. For every type one `cmdb.core.objects.added` event
+            with all inserted ids and one `cmdb.core.objects.updated` event for all replaced objects will be send.
+
+        Returns:
+            error messages of the failed writes by their index in the passed object list
+        """
+        replace_ids = replace_ids or set()
+        requests = []
+        for object_ in objects:
+            if object_.get_public_id() in replace_ids:
+                requests.append(ReplaceOne({'public_id': object_.get_public_id()}, object_.__dict__, upsert=True))
+            else:
+                requests.append(InsertOne(object_.__dict__))
+        if len(requests) == 0:
+            return {}
+
+        errors: Dict[int, str] = {}
+        try:
+            # preset public ids can be higher than the id counter
+            self.dbm.update_public_id_counter(CmdbObject.COLLECTION,
+                                              max(object_.get_public_id() for object_ in objects))
+            self.dbm.bulk_write(collection=CmdbObject.COLLECTION, requests=requests, ordered=False)
+        except BulkWriteError as err:
+            for write_error in err.details.get('writeErrors', []):
+                errors[write_error['index']] = write_error.get('errmsg', 'Object could not be written')
+        except Exception as err:
+            raise ObjectManagerInsertError(err)
+
+        if self._event_queue:
+            inserted_ids: Dict[int, List[int]] = {}
+            replaced_objects: List[CmdbObject] = []
+            for index, object_ in enumerate(objects):
+                if index in errors:
+                    continue
+                if object_.get_public_id() in replace_ids:
+                    replaced_objects.append(object_)
+                else:
+                    inserted_ids.setdefault(object_.get_type_id(), []).append(object_.get_public_id())
+            for type_id, public_ids in inserted_ids.items():
+                event = Event("cmdb.core.objects.added", {"ids": public_ids, "type_id": type_id,
+                                                          "user_id": user.get_public_id() if user else None})
+                self._event_queue.put(event)
+            self.send_objects_event('updated', replaced_objects, user)
+        return errors
+
+    def update_object(self, data: (dict, CmdbObject), user: UserModel = None, permission: AccessControlPermission = None,
+                      send_event: bool = True) -> str:
         if isinstance(data, dict):
             update_object = CmdbObject(**data)
         elif isinstance(data, CmdbObject):
@@ -277,7 +416,7 @@ class CmdbObjectManager(CmdbManagerBase):
             data=update_object.__dict__
         )
         # create cmdb.core.object.updated event
-        if self._event_queue and user:
+        if self._event_queue and user and send_event:
             event = Event("cmdb.core.object.updated", {"id": update_object.get_public_id(),
                                                        "type_id": update_object.get_type_id(),
                                                        "user_id": user.get_public_id()})
@@ -336,18 +475,20 @@ class CmdbObjectManager(CmdbManagerBase):
 
         return referenced_by_objects
 
-    def delete_object(self, public_id: int, user: UserModel, permission: AccessControlPermission):
+    def delete_object(self, public_id: int, user: UserModel, permission: AccessControlPermission,
+                      send_event: bool = True):
         type_id = self.get_object(public_id=public_id).type_id
         type_ = self._type_manager.get(type_id)
         verify_access(type_, user, permission)
         try:
-            if self._event_queue:
+            ack = self._delete(CmdbObject.COLLECTION, public_id)
+            # send the event after the deletion - consumers (e.g. exportd) read the current objects
+            if self._event_queue and send_event:
                 event = Event("cmdb.core.object.deleted",
                               {"id": public_id,
-                               "type_id": self.get_object(public_id).get_type_id(),
+                               "type_id": type_id,
                                "user_id": user.get_public_id()})
                 self._event_queue.put(event)
-            ack = self._delete(CmdbObject.COLLECTION, public_id)
             return ack
         except (CMDBError, Exception):
             raise ObjectDeleteError(msg=public_id)
@@ -356,10 +497,30 @@ class CmdbObjectManager(CmdbManagerBase):
         ack = self._delete_many(CmdbObject.COLLECTION, filter_query)
         if self._event_queue:
             event = Event("cmdb.core.objects.deleted", {"ids": public_ids,
-                                                        "user_id": request_user.get_public_id()})
+                                                        "user_id": user.get_public_id() if user else None})
             self._event_queue.put(event)
         return ack
 
+    def send_objects_event(self, action: str, objects: List[CmdbObject], user: UserModel = None):
+        """Send one aggregated `cmdb.core.objects.<action>` event for multiple objects.
+
+        Bulk operations pass `send_event=False` to the single object methods and
+        call this method once after all objects were processed.
+
+        Args:
+            action: event action - e.g. updated or deleted
+            objects: all changed objects
+            user: user which started the change
+        """
+        if not self._event_queue or len(objects) == 0:
+            return
+        event = Event(f"cmdb.core.objects.{action}", {
+            "ids": [object_.get_public_id() for object_ in objects],
+            "type_ids": list(dict.fromkeys(object_.get_type_id() for object_ in objects)),
+            "user_id": user.get_public_id() if user else None
+        })
+        self._event_queue.put(event)
+
     @deprecated
     def get_all_types(self) -> List[TypeModel]:
         try:
@@ -374,10 +535,16 @@ class CmdbObjectManager(CmdbManagerBase):
     @deprecated
     def get_type(self, public_id: int):
         try:
-            return TypeModel.from_data(self.dbm.find_one(
-                collection=TypeModel.COLLECTION,
-                public_id=public_id)
-            )
+            return self._type_manager.get(public_id)
+        except RequiredInitKeyNotFoundError as err:
+            raise ObjectManagerInitError(err=err.message)
+        except Exception as err:
+            raise ObjectManagerGetError(err=err)
+
+    def get_types(self, public_ids: List[int]) -> List[TypeModel]:
+        """Get multiple types by their public ids - cached types are not loaded again"""
+        try:
+            return self._type_manager.get_many(public_ids)
         except RequiredInitKeyNotFoundError as err:
             raise ObjectManagerInitError(err=err.message)
         except Exception as err:
@@ -424,6 +591,7 @@ class CmdbObjectManager(CmdbManagerBase):
             public_id=update_type.get_public_id(),
             data=TypeModel.to_json(update_type)
         )
+        type_cache.invalidate(update_type.get_public_id())
         if self._event_queue:
             event = Event("cmdb.core.objecttype.updated", {"id": update_type.get_public_id()})
             self._event_queue.put(event)
@@ -432,6 +600,10 @@ class CmdbObjectManager(CmdbManagerBase):
     @deprecated
     def update_many_types(self, filter: dict, update: dict):
         ack = self._update_many(TypeModel.COLLECTION, filter, update)
+        type_cache.invalidate()
+        # clears the type caches of the other processes
+        if self._event_queue:
+            self._event_queue.put(Event("cmdb.core.objecttypes.updated"))
         return ack
 
     @deprecated
@@ -17,7 +17,7 @@
 """
 Object/Type render
 """
-from typing import List, Union
+from typing import List, Union, Dict, Tuple
 
 from cmdb.data_storage.database_manager import DatabaseManagerMongo
 from cmdb.framework.cmdb_errors import ObjectManagerGetError
@@ -71,7 +71,8 @@ class CmdbRender:
     def __init__(self, object_instance: CmdbObject,
                  type_instance: TypeModel,
                  render_user: UserModel, user_list: List[UserModel] = None,
-                 object_manager: CmdbObjectManager = None, dt_render=False, ref_render=False):
+                 object_manager: CmdbObjectManager = None, dt_render=False, ref_render=False,
+                 references: Dict[int, Tuple[CmdbObject, TypeModel]] = None):
         self.object_instance: CmdbObject = object_instance
         self.type_instance: TypeModel = type_instance
         self.user_list: List[UserModel] = user_list
@@ -79,6 +80,8 @@ class CmdbRender:
         self.object_manager = object_manager
         self.dt_render = dt_render
         self.ref_render = ref_render
+        # pre-fetched referenced objects with their types - if None the references are loaded on demand
+        self.references: Dict[int, Tuple[CmdbObject, TypeModel]] = references
 
     def _render_username_by_id(self, user_id: int) -> str:
         user: UserModel = None
@@ -202,8 +205,10 @@ class CmdbRender:
 
     def __merge_fields_value(self) -> list:
         field_map = []
-        html_parser = DtHtmlParser(self.object_manager)
-        for field in self.type_instance.fields:
+        html_parser = DtHtmlParser(self.object_manager, references=self.references)
+        for type_field in self.type_instance.fields:
+            # work on a copy - the type instance can be shared between multiple renders
+            field = dict(type_field)
             html_parser.current_field = field
             try:
                 curr_field = [x for x in self.object_instance.fields if x['name'] == field['name']][0]
@@ -232,12 +237,11 @@ class CmdbRender:
         }
         if current_field['value']:
             try:
-                ref_object = self.object_manager.get_object(int(current_field['value']))
-            except ObjectManagerGetError:
+                ref_object, ref_type = self._get_reference(current_field['value'])
+            except (ObjectManagerGetError, ValueError, TypeError):
                 return reference
 
             try:
-                ref_type = self.object_manager.get_type(ref_object.get_type_id())
                 reference['type_label'] = ref_type.label
                 reference['icon'] = ref_type.get_icon()
 
@@ -253,6 +257,28 @@ class CmdbRender:
 
         return reference
 
+    def _get_reference(self, public_id) -> Tuple[CmdbObject, TypeModel]:
+        """
+        Get a referenced object and its type.
+        Uses the pre-fetched references if they were passed, otherwise the object managers.
+        Args:
+            public_id: public id of the referenced object
+
+        Raises:
+            ObjectManagerGetError: if the object or its type could not be loaded
+
+        Returns:
+            tuple of referenced object and type
+        """
+        public_id = int(public_id)
+        if self.references is not None:
+            try:
+                return self.references[public_id]
+            except KeyError:
+                raise ObjectManagerGetError(f'Referenced object {public_id} not found')
+        ref_object = self.object_manager.get_object(public_id)
+        return ref_object, self.object_manager.get_type(ref_object.get_type_id())
+
     def __set_summaries(self, render_result: RenderResult) -> RenderResult:
         # global summary list
         summary_list = []
@@ -261,7 +287,9 @@ class CmdbRender:
             render_result.summaries = summary_list
             render_result.summary_line = f'{self.type_instance.get_label()} #{self.object_instance.public_id}  '
             return render_result
-        summary_list = self.type_instance.get_summary().fields
+        rendered_fields = {field['name']: field for field in render_result.fields}
+        summary_list = [rendered_fields[name] for name in self.type_instance.render_meta.summary.fields
+                        if name in rendered_fields]
         render_result.summaries = summary_list
         first = True
         for line in summary_list:
@@ -291,8 +319,9 @@ class CmdbRender:
             # if data are missing or empty append here
             missing_list = []
             try:
-                # get TypeExternalLink definitions from type
-                ext_link_instance = self.type_instance.get_external(ext_link.name)
+                # get a copy of the TypeExternalLink definitions from type - the href will be filled
+                ext_link_instance = TypeExternalLink.from_data(
+                    TypeExternalLink.to_json(self.type_instance.get_external(ext_link.name)))
                 # check if link requires data - regex check for {}
                 if ext_link_instance.link_requires_fields():
                     # check if has fields
@@ -326,32 +355,129 @@ class CmdbRender:
         return render_result
 
 
+class RenderTypeCache:
+    """
+    Type resolution cache for a single render pass.
+    Every type is loaded and parsed at most once, missing types are loaded in bulk with a single query.
+    """
+
+    def __init__(self, object_manager: CmdbObjectManager):
+        self.object_manager: CmdbObjectManager = object_manager
+        self.__types: Dict[int, TypeModel] = {}
+
+    def __contains__(self, public_id: int) -> bool:
+        return public_id in self.__types
+
+    def load(self, public_ids: List[int]):
+        """
+        Load all not cached types of the passed ids with one query.
+        Args:
+            public_ids: list of type public ids
+        """
+        missing_ids = list({public_id for public_id in public_ids if public_id not in self.__types})
+        if len(missing_ids) == 0:
+            return
+        for type_instance in self.object_manager.get_types(missing_ids):
+            self.__types[type_instance.get_public_id()] = type_instance
+
+    def get(self, public_id: int) -> TypeModel:
+        """
+        Get a type from the cache or load it from the database.
+        Args:
+            public_id: public id of the type
+
+        Raises:
+            ObjectManagerGetError: if the type could not be loaded
+
+        Returns:
+            TypeModel
+        """
+        try:
+            return self.__types[public_id]
+        except KeyError:
+            type_instance = self.object_manager.get_type(public_id)
+            if type_instance is None:
+                raise ObjectManagerGetError(f'Type with ID: {public_id} not found!')
+            self.__types[public_id] = type_instance
+            return type_instance
+
+
 class RenderList:
 
     def __init__(self, object_list: List[CmdbObject], request_user: UserModel, dt_render=False, ref_render=False,
-                 object_manager: CmdbObjectManager = None):
+                 object_manager: CmdbObjectManager = None, type_cache: RenderTypeCache = None):
         self.object_list: List[CmdbObject] = object_list
         self.request_user = request_user
         self.dt_render = dt_render
         self.ref_render = ref_render
-        from cmdb.utils.system_config import SystemConfigReader
-        database_manager = DatabaseManagerMongo(
-            **SystemConfigReader().get_all_values_from_section('Database')
-        )
+        if object_manager:
+            # reuse the connection pool of the passed manager
+            database_manager = object_manager.dbm
+        else:
+            from cmdb.utils.system_config import SystemConfigReader
+            database_manager = DatabaseManagerMongo(
+                **SystemConfigReader().get_all_values_from_section('Database')
+            )
         self.object_manager = object_manager or CmdbObjectManager(database_manager=database_manager)
         self.user_manager = UserManager(database_manager=database_manager)
+        self.type_cache: RenderTypeCache = type_cache or RenderTypeCache(self.object_manager)
+
+    def _fetch_references(self) -> Dict[int, Tuple[CmdbObject, TypeModel]]:
+        """
+        Collect all referenced public ids of the object list and load them up front.
+        Needs one query for the referenced objects and one query for their types.
+
+        Returns:
+            dict of referenced public id -> (CmdbObject, TypeModel)
+        """
+        ref_field_names: Dict[int, List[str]] = {}
+        ref_ids = set()
+        for passed_object in self.object_list:
+            if passed_object.type_id not in ref_field_names:
+                try:
+                    type_fields = self.type_cache.get(passed_object.type_id).get_fields()
+                except CMDBError:
+                    type_fields = []
+                ref_field_names[passed_object.type_id] = [field['name'] for field in type_fields
+                                                          if field.get('type') == 'ref']
+            for field in passed_object.fields:
+                if field.get('name') in ref_field_names[passed_object.type_id] and field.get('value'):
+                    try:
+                        ref_ids.add(int(field['value']))
+                    except (ValueError, TypeError):
+                        continue
+
+        if len(ref_ids) == 0:
+            return {}
+        ref_objects: List[CmdbObject] = self.object_manager.get_objects(list(ref_ids))
+        self.type_cache.load([ref_object.type_id for ref_object in ref_objects])
+        return {ref_object.get_public_id(): (ref_object, self.type_cache.get(ref_object.type_id))
+                for ref_object in ref_objects if ref_object.type_id in self.type_cache}
 
     @timing('RenderList')
     def render_result_list(self, raw: bool = False) -> List[Union[RenderResult, dict]]:
-        complete_user_list: List[UserModel] = self.user_manager.get_users()
+        self.type_cache.load([passed_object.type_id for passed_object in self.object_list])
+        # only the authors of the rendered objects and their types are required for the display names
+        author_ids = [passed_object.author_id for passed_object in self.object_list]
+        author_ids += [self.type_cache.get(type_id).author_id for type_id in
+                       {passed_object.type_id for passed_object in self.object_list} if type_id in self.type_cache]
+        render_user_list: List[UserModel] = self.user_manager.get_users_by_ids(author_ids)
+
+        references = None
+        if self.ref_render or self.dt_render:
+            try:
+                references = self._fetch_references()
+            except CMDBError as err:
+                LOGGER.error(f'Could not pre-fetch references - fallback to single loads: {err}')
 
         preparation_objects: List[RenderResult] = []
         for passed_object in self.object_list:
             tmp_render = CmdbRender(
-                type_instance=self.object_manager.get_type(passed_object.type_id),
+                type_instance=self.type_cache.get(passed_object.type_id),
                 object_instance=passed_object,
-                render_user=self.request_user, user_list=complete_user_list,
-                object_manager=self.object_manager, dt_render=self.dt_render, ref_render=self.ref_render)
+                render_user=self.request_user, user_list=render_user_list,
+                object_manager=self.object_manager, dt_render=self.dt_render, ref_render=self.ref_render,
+                references=references)
             if raw:
                 current_render_result = tmp_render.result().__dict__
             else:
@@ -0,0 +1,140 @@
+# DATAGERRY - OpenSource Enterprise CMDB
+# Copyright (C) 2019 NETHINKS GmbH
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+Process wide cache for type documents.
+Types are read on almost every request but change rarely, so the raw type documents are kept in a bounded
+LRU cache. Entries are invalidated by the `cmdb.core.objecttype.*` events, the time to live only acts as
+safety net for lost events.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from copy import deepcopy
+from typing import List, Optional, Union
+
+from cmdb.event_management.event import Event
+from cmdb.framework.models.type import TypeModel
+from cmdb.framework.utils import PublicID
+
+LOGGER = logging.getLogger(__name__)
+
+
+class TypeModelCache:
+    """
+    Thread-safe bounded LRU cache of raw type documents.
+    Every access returns a new TypeModel instance, so callers can not modify the cached state.
+    """
+
+    EVENT_TYPES = ['cmdb.core.objecttype.#', 'cmdb.core.objecttypes.#']
+
+    def __init__(self, max_size: int = 512, ttl: int = 300):
+        """
+        Constructor of `TypeModelCache`
+
+        Args:
+            max_size: max number of cached types, the least recently used type is removed first
+            ttl: seconds until a cached type will be reloaded, even if no event was received
+        """
+        self.max_size: int = max_size
+        self.ttl: int = ttl
+        self.__entries: OrderedDict = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def get(self, public_id: Union[PublicID, int]) -> Optional[TypeModel]:
+        """
+        Get a type from the cache.
+
+        Args:
+            public_id: PublicID of the type
+
+        Returns:
+            TypeModel or None if the type is not cached or expired
+        """
+        with self.__lock:
+            try:
+                expires, document = self.__entries[public_id]
+            except KeyError:
+                return None
+            if expires < time.monotonic():
+                del self.__entries[public_id]
+                return None
+            self.__entries.move_to_end(public_id)
+        return TypeModel.from_data(deepcopy(document))
+
+    def get_many(self, public_ids: List[Union[PublicID, int]]) -> List[TypeModel]:
+        """
+        Get all cached types of the passed ids. Not cached ids are skipped.
+
+        Args:
+            public_ids: list of type ids
+
+        Returns:
+            list of the cached types
+        """
+        types = (self.get(public_id) for public_id in public_ids)
+        return [type_ for type_ in types if type_ is not None]
+
+    def put(self, document: dict):
+        """
+        Store a raw type document.
+
+        Args:
+            document: type document as stored in the database
+        """
+        with self.__lock:
+            public_id = document['public_id']
+            self.__entries[public_id] = (time.monotonic() + self.ttl, deepcopy(document))
+            self.__entries.move_to_end(public_id)
+            while len(self.__entries) > self.max_size:
+                self.__entries.popitem(last=False)
+
+    def invalidate(self, public_id: Union[PublicID, int] = None):
+        """
+        Remove a type from the cache.
+
+        Args:
+            public_id: PublicID of the type - if None the complete cache will be cleared
+        """
+        with self.__lock:
+            if public_id is None:
+                self.__entries.clear()
+            else:
+                self.__entries.pop(public_id, None)
+
+    def handle_event(self, event: Event):
+        """
+        Invalidate the cache based on a received type event.
+        Events without a type id (e.g. `cmdb.core.objecttypes.*`) clear the complete cache.
+
+        Args:
+            event: received event
+        """
+        event_type = event.get_type()
+        if not event_type.startswith('cmdb.core.objecttype'):
+            return
+        public_id = event.get_param('id')
+        if event_type.startswith('cmdb.core.objecttypes.') or public_id is None:
+            self.invalidate()
+        else:
+            self.invalidate(int(public_id))
+        LOGGER.debug(f'Type cache invalidated by event {event_type}')
+
+
+type_cache = TypeModelCache()
@@ -16,8 +16,10 @@
 from typing import Union, List
 
 from cmdb.data_storage.database_manager import DatabaseManagerMongo
+from cmdb.event_management.event import Event
 from cmdb.framework import TypeModel
 from cmdb.framework.managers.framework_manager import FrameworkManager
+from cmdb.framework.managers.type_cache import type_cache
 from cmdb.framework.results.iteration import IterationResult
 from cmdb.framework.results.list import ListResult
 from cmdb.framework.utils import PublicID
@@ -30,15 +32,23 @@ class TypeManager(FrameworkManager):
     Manager for the type module. Manages the CRUD functions of the types and the iteration over the collection.
     """
 
-    def __init__(self, database_manager: DatabaseManagerMongo):
+    def __init__(self, database_manager: DatabaseManagerMongo, event_queue=None):
         """
         Constructor of `TypeManager`
 
         Args:
             database_manager: Connection to the database class.
+            event_queue: Queue for the type change events, which invalidate the type caches of the other processes.
         """
+        self._event_queue = event_queue
         super(TypeManager, self).__init__(TypeModel.COLLECTION, database_manager=database_manager)
 
+    def _type_changed(self, public_id: Union[PublicID, int], action: str):
+        """Invalidate the cached type and inform the other processes"""
+        type_cache.invalidate(public_id)
+        if self._event_queue:
+            self._event_queue.put(Event(f'cmdb.core.objecttype.{action}', {'id': public_id}))
+
     def iterate(self, filter: dict, limit: int, skip: int, sort: str, order: int, *args, **kwargs) \
             -> IterationResult[TypeModel]:
         """
@@ -86,12 +96,40 @@ class TypeManager(FrameworkManager):
 
         Returns:
             TypeModel: Instance of TypeModel with data.
+
+        Notes:
+            The type will be served from the process wide type cache if possible.
         """
+        cached_type = type_cache.get(public_id)
+        if cached_type is not None:
+            return cached_type
         cursor_result = self._get(self.collection, filter={'public_id': public_id}, limit=1)
         for resource_result in cursor_result.limit(-1):
-            return TypeModel.from_data(resource_result)
+            type_ = TypeModel.from_data(resource_result)
+            type_cache.put(resource_result)
+            return type_
         raise ManagerGetError(f'Type with ID: {public_id} not found!')
 
+    def get_many(self, public_ids: List[Union[PublicID, int]]) -> List[TypeModel]:
+        """
+        Get multiple types by their ids. Types which are not cached are loaded with a single query.
+
+        Args:
+            public_ids: List of type ids.
+
+        Returns:
+            List[TypeModel]: List of the found types, not existing ids are skipped.
+        """
+        public_ids = list(dict.fromkeys(public_ids))
+        types: List[TypeModel] = type_cache.get_many(public_ids)
+        cached_ids = {type_.get_public_id() for type_ in types}
+        missing_ids = [public_id for public_id in public_ids if public_id not in cached_ids]
+        if len(missing_ids) > 0:
+            for resource_result in self._get(self.collection, filter={'public_id': {'$in': missing_ids}}):
+                types.append(TypeModel.from_data(resource_result))
+                type_cache.put(resource_result)
+        return types
+
     def insert(self, type: dict) -> PublicID:
         """
         Insert a single type into the system.
@@ -107,7 +145,9 @@ class TypeManager(FrameworkManager):
         """
         if isinstance(type, TypeModel):
             type = TypeModel.to_json(type)
-        return self._insert(self.collection, resource=type)
+        public_id = self._insert(self.collection, resource=type)
+        self._type_changed(public_id, 'added')
+        return public_id
 
     def update(self, public_id: Union[PublicID, int], type: Union[TypeModel, dict]):
         """
@@ -125,6 +165,7 @@ class TypeManager(FrameworkManager):
         update_result = self._update(self.collection, filter={'public_id': public_id}, resource=type)
         if update_result.matched_count != 1:
             raise ManagerUpdateError(f'Something happened during the update!')
+        self._type_changed(public_id, 'updated')
         return update_result
 
     def delete(self, public_id: Union[PublicID, int]) -> TypeModel:
@@ -141,4 +182,5 @@ class TypeManager(FrameworkManager):
         delete_result = self._delete(self.collection, filter={'public_id': public_id})
         if delete_result.deleted_count == 0:
             raise ManagerDeleteError(err='No type matched this public id')
+        self._type_changed(public_id, 'deleted')
         return raw_type
@@ -54,6 +54,6 @@ class IterationResult(Generic[C]):
         Returns:
             A IterationResult instance.
         """
-        if len(aggregation['results']) == 0:
+        if len(aggregation['meta']) == 0:
             return cls(aggregation['results'], total=0)
         return cls(aggregation['results'], total=aggregation['meta'][0]['total'])
\ No newline at end of file
@@ -22,9 +22,11 @@ from flask import abort
 
 class DtHtmlParser:
 
-    def __init__(self, object_manager: CmdbObjectManager, current_field=None):
+    def __init__(self, object_manager: CmdbObjectManager, current_field=None, references: dict = None):
         self.object_manager: CmdbObjectManager = object_manager
         self.current_field = current_field
+        # optional pre-fetched map of public_id -> (referenced object, referenced type)
+        self.references: dict = references
 
     def field_to_html(self, field_type):
         """Dispatch method"""
@@ -57,12 +59,17 @@ class DtHtmlParser:
         html_content = 'No reference set'
         if self.current_field['value']:
             try:
-                ref_object = self.object_manager.get_object(int(self.current_field['value']))
-            except ObjectManagerGetError as err:
+                ref_id = int(self.current_field['value'])
+                if self.references is not None:
+                    ref_object, ref_type = self.references[ref_id]
+                else:
+                    ref_object = self.object_manager.get_object(ref_id)
+                    ref_type = None
+            except (ObjectManagerGetError, KeyError, ValueError, TypeError):
                 return '<span>%s</span>' % html_content
 
             try:
-                ref_type = self.object_manager.get_type(ref_object.get_type_id())
+                ref_type = ref_type or self.object_manager.get_type(ref_object.get_type_id())
                 html_content = '<i class="%s"></i> %s #%s' % (ref_type.get_icon(), ref_type.label, ref_object.public_id)
                 html_content += ' - '
 
@@ -17,18 +17,19 @@
 Module of basic importers
 """
 import logging
-from typing import Optional
+from itertools import islice
+from typing import Optional, List, Tuple, Iterable, Iterator
 
 from cmdb.framework import CmdbObject
-from cmdb.framework.cmdb_errors import ObjectManagerGetError, ObjectManagerInsertError, \
-    ObjectManagerDeleteError
 from cmdb.framework.cmdb_object_manager import CmdbObjectManager
 from cmdb.importer.importer_config import ObjectImporterConfig, BaseImporterConfig
+from cmdb.importer.importer_errors import ParserRuntimeError
 from cmdb.importer.importer_response import BaseImporterResponse, ImporterObjectResponse, ImportFailedMessage, \
     ImportSuccessMessage
 from cmdb.importer.parser_base import BaseObjectParser
 from cmdb.importer.parser_response import ObjectParserResponse
 from cmdb.user_management import UserModel
+from cmdb.utils.error import CMDBError
 
 LOGGER = logging.getLogger(__name__)
 
@@ -72,6 +73,8 @@ class BaseImporter:
 class ObjectImporter(BaseImporter):
     """Superclass for object importers"""
 
+    IMPORT_CHUNK_SIZE = 1000
+
     def __init__(self, file, file_type, config: ObjectImporterConfig = None,
                  parser: BaseObjectParser = None, object_manager: CmdbObjectManager = None, request_user: UserModel = None):
         """
@@ -106,92 +109,133 @@ class ObjectImporter(BaseImporter):
             object_instance_list.append(self.generate_object(entry, *args, **kwargs))
         return object_instance_list
 
+    def _generate_object_stream(self, entries: Iterable[dict], *args, **kwargs) -> Iterator[dict]:
+        """Lazy variant of _generate_objects - the objects are generated while the import consumes them.
+        Args:
+            entries: parsed entries - normally the output of the parser `iterate` method
+        """
+        for entry in entries:
+            yield self.generate_object(entry, *args, **kwargs)
+
     def generate_object(self, entry, *args, **kwargs) -> dict:
         """Generation of the CMDB-Objects based on the parser response
         and the imported fields"""
         raise NotImplementedError
 
-    def _import(self, import_objects: list) -> ImporterObjectResponse:
+    def _import(self, import_objects: Iterable[dict]) -> ImporterObjectResponse:
         """Basic import wrapper - starting the import process
+        The objects are written in chunks: new ids are reserved as block, existing objects are detected
+        with a single query and every chunk is written with one bulk operation.
         Args:
-            import_objects: list of all objects for import - or output of _generate_objects()
+            import_objects: list or iterator of all objects for import - output of _generate_objects()
+                            or _generate_object_stream()
+        Notes:
+            Iterators are consumed chunk by chunk, so only a single chunk of objects is held in memory
+            and the first chunks are written before the complete file was parsed.
+            If the parser fails, the objects parsed before are still imported and the parser error
+            is added to the failed imports.
         """
         run_config = self.get_config()
 
         success_imports: [ImportSuccessMessage] = []
         failed_imports: [ImportFailedMessage] = []
 
-        current_import_index = run_config.start_element
-        importer_counter = 0
-        import_objects_length: int = len(import_objects)
+        end_index = None
+        if run_config.max_elements > 0:
+            end_index = max(run_config.max_elements, run_config.start_element + 1)
+        selected_objects = islice(import_objects, run_config.start_element, end_index)
 
-        LOGGER.info(f'Starting import of {import_objects_length} objects')
-        while current_import_index < import_objects_length:
+        LOGGER.info(f'Starting import of objects in chunks of {self.IMPORT_CHUNK_SIZE}')
+        parser_error: Optional[ParserRuntimeError] = None
+        while parser_error is None:
+            chunk = []
+            try:
+                for import_object in islice(selected_objects, self.IMPORT_CHUNK_SIZE):
+                    chunk.append(import_object)
+            except ParserRuntimeError as err:
+                # the remaining rows can not be read - earlier chunks are already written
+                LOGGER.error(f'Import stopped after a parser error: {err.message}')
+                parser_error = err
+            if len(chunk) == 0:
+                break
+            chunk_success, chunk_failed = self._import_chunk(chunk, run_config)
+            success_imports += chunk_success
+            failed_imports += chunk_failed
+            LOGGER.debug(f'Imported chunk of {len(chunk)} objects - {len(chunk_failed)} failed')
 
-            current_import_object: dict = import_objects[current_import_index]
-            LOGGER.debug(f'Current working object: {current_import_object}')
+        message = f'Import of {len(success_imports)} objects'
+        if parser_error is not None:
+            failed_imports.append(ImportFailedMessage(error_message=parser_error.message))
+            message += ' - stopped by a parser error'
+        return ImporterObjectResponse(
+            message=message,
+            success_imports=success_imports,
+            failed_imports=failed_imports
+        )
 
-            current_public_id: (int, None) = current_import_object.get('public_id')
-            LOGGER.debug(f'Current working public id: {current_public_id}')
+    def _import_chunk(self, chunk: list, run_config: ObjectImporterConfig) -> \
+            Tuple[List[ImportSuccessMessage], List[ImportFailedMessage]]:
+        """Import a chunk of objects with a constant number of database operations
+        Args:
+            chunk: list of generated objects
+            run_config: importer configuration
+
+        Returns:
+            the success and failed messages of every object in the chunk
+        """
+        success_imports: [ImportSuccessMessage] = []
+        failed_imports: [ImportFailedMessage] = []
 
+        importable_objects: [dict] = []
+        for current_import_object in chunk:
+            current_public_id: (int, None) = current_import_object.get('public_id')
             # Object has PublicID and can not overwrite
             if current_public_id is not None and not run_config.overwrite_public:
                 failed_imports.append(ImportFailedMessage(
                     error_message='Object import for object - has PublicID but not overwrite setting',
                     obj=current_import_object))
-                current_import_index += 1
                 continue
+            importable_objects.append(current_import_object)
 
-            # Object has no PublicID <- assign new
-            elif not current_public_id:
-                current_public_id = self.object_manager.get_new_id(CmdbObject.COLLECTION)
-                LOGGER.debug(f'Assign new PublicID: {current_public_id}')
-                current_import_object.update({'public_id': current_public_id})
-            # else assign given PublicID
-            else:
-                current_public_id = current_import_object.get('public_id')
-                LOGGER.debug(f'Assign given PublicID: {current_public_id}')
+        # Objects without PublicID <- assign new ones from a reserved block
+        new_id_objects = [import_object for import_object in importable_objects if not import_object.get('public_id')]
+        given_ids = [import_object['public_id'] for import_object in importable_objects
+                     if import_object.get('public_id')]
+        try:
+            for import_object, new_public_id in zip(new_id_objects,
+                                                    self.object_manager.reserve_object_ids(len(new_id_objects))):
+                import_object.update({'public_id': new_public_id})
+            existing_ids = self.object_manager.get_existing_object_ids(given_ids)
+        except CMDBError as err:
+            for import_object in importable_objects:
+                failed_imports.append(ImportFailedMessage(error_message=err.message, obj=import_object))
+            return success_imports, failed_imports
 
-            # Insert data
+        write_objects: [CmdbObject] = []
+        write_import_objects: [dict] = []
+        for import_object in importable_objects:
             try:
-                self.object_manager.get_object(current_public_id)
-            except ObjectManagerGetError:
-                try:
-                    self.object_manager.insert_object(current_import_object)
-                except ObjectManagerInsertError as err:
-                    failed_imports.append(ImportFailedMessage(error_message=err.message, obj=current_import_object))
-                    current_import_index += 1
-                    continue
-                else:
-                    success_imports.append(ImportSuccessMessage(public_id=current_public_id, obj=current_import_object))
-            else:
-                try:
-                    self.object_manager.delete_object(current_public_id, self.request_user)
-                except ObjectManagerDeleteError as err:
-                    failed_imports.append(ImportFailedMessage(error_message=err.message, obj=current_import_object))
-                    current_import_index += 1
-                    continue
-                else:
-                    try:
-                        self.object_manager.insert_object(current_import_object)
-                    except ObjectManagerInsertError as err:
-                        failed_imports.append(ImportFailedMessage(error_message=err.message, obj=current_import_object))
-                        current_import_index += 1
-                        continue
-                    else:
-                        success_imports.append(
-                            ImportSuccessMessage(public_id=current_public_id, obj=current_import_object))
-
-            # check if still import valid
-            current_import_index += 1
-            if run_config.max_elements > 0 and (current_import_index >= run_config.max_elements):
-                break
+                write_object = CmdbObject(**import_object)
+                # type must exist - the types are cached by the object manager
+                self.object_manager.get_type(write_object.get_type_id())
+                write_objects.append(write_object)
+            except CMDBError as err:
+                failed_imports.append(ImportFailedMessage(error_message=err.message, obj=import_object))
+                continue
+            write_import_objects.append(import_object)
 
-        return ImporterObjectResponse(
-            message=f'Import of {importer_counter} objects',
-            success_imports=success_imports,
-            failed_imports=failed_imports
-        )
+        # Insert data
+        try:
+            write_errors = self.object_manager.bulk_write_objects(write_objects, replace_ids=existing_ids,
+                                                                  user=self.request_user)
+        except CMDBError as err:
+            write_errors = {index: err.message for index in range(len(write_objects))}
+        for index, import_object in enumerate(write_import_objects):
+            if index in write_errors:
+                failed_imports.append(ImportFailedMessage(error_message=write_errors[index], obj=import_object))
+            else:
+                success_imports.append(ImportSuccessMessage(public_id=import_object['public_id'], obj=import_object))
+        return success_imports, failed_imports
 
     def start_import(self) -> ImporterObjectResponse:
         """Starting the import process.
@@ -22,13 +22,13 @@ from cmdb.framework import CmdbObject
 from cmdb.framework.cmdb_errors import ObjectManagerGetError
 from cmdb.framework.cmdb_object_manager import CmdbObjectManager
 from cmdb.importer import JsonObjectParser
-from cmdb.importer.importer_errors import ImportRuntimeError, ParserRuntimeError
+from cmdb.importer.importer_errors import ImportRuntimeError
 from cmdb.importer.content_types import JSONContent, CSVContent, XLSXContent
 from cmdb.importer.importer_base import ObjectImporter
 from cmdb.importer.importer_config import ObjectImporterConfig
 from cmdb.importer.importer_response import ImporterObjectResponse
 from cmdb.importer.mapper import Mapping, MapEntry
-from cmdb.importer.parser_object import JsonObjectParserResponse, CsvObjectParserResponse, ExcelObjectParserResponse
+from cmdb.importer.parser_object import JsonObjectParserResponse
 from cmdb.importer.improve_object import ImproveObject
 from cmdb.user_management import UserModel
 
@@ -197,17 +197,11 @@ class CsvObjectImporter(ObjectImporter, CSVContent):
         return working_object
 
     def start_import(self) -> ImporterObjectResponse:
-        try:
-            parsed_response: CsvObjectParserResponse = self.parser.parse(self.file)
-        except ParserRuntimeError as pre:
-            raise ImportRuntimeError(self.__class__.__name__, pre)
-
         type_instance_fields: List[dict] = self.object_manager.get_type(self.config.get_type_id()).get_fields()
 
-        import_objects: [dict] = self._generate_objects(parsed_response, fields=type_instance_fields)
-        import_result: ImporterObjectResponse = self._import(import_objects)
-
-        return import_result
+        # rows are parsed, generated and written chunk by chunk - parser errors are part of the response
+        import_objects = self._generate_object_stream(self.parser.iterate(self.file), fields=type_instance_fields)
+        return self._import(import_objects)
 
 
 class ExcelObjectImporterConfig(ObjectImporterConfig, XLSXContent):
@@ -249,12 +243,12 @@ class ExcelObjectImporter(ObjectImporter, XLSXContent):
             working_object.update({property_entry.get_name(): entry.get(property_entry.get_value())})
 
         # Improve insert object
-        improve_object = ImproveObject(entry, field_entries, possible_fields)
+        improve_object = ImproveObject(entry, property_entries, field_entries, possible_fields)
         entry = improve_object.improve_entry()
 
         # Validate insert fields
         for field_entry in field_entries:
-            if field_entry.get_name() not in possible_fields:
+            if not next((item for item in possible_fields if item['name'] == field_entry.get_name()), None):
                 continue
             working_object['fields'].append(
                 {'name': field_entry.get_name(),
@@ -264,11 +258,8 @@ class ExcelObjectImporter(ObjectImporter, XLSXContent):
         return working_object
 
     def start_import(self) -> ImporterObjectResponse:
-        try:
-            parsed_response: ExcelObjectParserResponse = self.parser.parse(self.file)
-        except ParserRuntimeError as pre:
-            raise ImportRuntimeError(self.__class__.__name__, pre)
-
-        LOGGER.debug(parsed_response)
+        type_instance_fields: List[dict] = self.object_manager.get_type(self.config.get_type_id()).get_fields()
 
-        return ImporterObjectResponse('Nope')
+        # rows are parsed, generated and written chunk by chunk - parser errors are part of the response
+        import_objects = self._generate_object_stream(self.parser.iterate(self.file), fields=type_instance_fields)
+        return self._import(import_objects)
@@ -15,6 +15,7 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import logging
+from typing import Iterator
 
 from cmdb.importer.parser_response import ParserResponse, ObjectParserResponse
 
@@ -51,6 +52,12 @@ class BaseObjectParser(BaseParser):
     def parse(self, file) -> ObjectParserResponse:
         raise NotImplementedError
 
+    def iterate(self, file) -> Iterator[dict]:
+        """Streaming mode of the parser - yields the parsed entries one by one instead of loading the complete file.
+        The default implementation falls back to the entries of `parse`."""
+        for entry in self.parse(file).entries:
+            yield entry
+
 
 class BaseTypeParser(BaseParser):
     DEFAULT_CONFIG = {}
@@ -17,6 +17,7 @@
 import csv
 import json
 import logging
+from typing import Iterator
 
 from openpyxl.worksheet.worksheet import Worksheet
 
@@ -101,18 +102,11 @@ class CsvObjectParser(BaseObjectParser, CSVContent):
         }
         try:
             with open(f'{file}', 'r', newline=run_config.get('newline')) as csv_file:
-                csv_reader = csv.reader(csv_file,
-                                        delimiter=run_config.get('delimiter'),
-                                        quotechar=run_config.get('quoteChar'),
-                                        escapechar=run_config.get('escapeChar'),
-                                        skipinitialspace=True)
+                csv_reader = self.__get_reader(csv_file)
                 if run_config.get('header'):
                     parsed['header'] = next(csv_reader)
                 for row in csv_reader:
-                    row_list = []
-                    for entry in row:
-                        row_list.append(auto_cast(entry))
-                    parsed.get('entries').append(self.__generate_index_pair(row_list))
+                    parsed.get('entries').append(self.__generate_entry(row))
                     parsed['count'] = parsed['count'] + 1
 
                 if len(parsed.get('entries')) > 0:
@@ -124,6 +118,34 @@ class CsvObjectParser(BaseObjectParser, CSVContent):
             raise ParserRuntimeError(self.__class__.__name__, err)
         return CsvObjectParserResponse(**parsed)
 
+    def iterate(self, file) -> Iterator[dict]:
+        """Yields the csv rows one by one - only the current row is held in memory"""
+        run_config = self.get_config()
+        try:
+            with open(f'{file}', 'r', newline=run_config.get('newline')) as csv_file:
+                csv_reader = self.__get_reader(csv_file)
+                if run_config.get('header'):
+                    next(csv_reader)
+                for row in csv_reader:
+                    yield self.__generate_entry(row)
+        except Exception as err:
+            LOGGER.error(err)
+            raise ParserRuntimeError(self.__class__.__name__, err)
+
+    def __get_reader(self, csv_file):
+        run_config = self.get_config()
+        return csv.reader(csv_file,
+                          delimiter=run_config.get('delimiter'),
+                          quotechar=run_config.get('quoteChar'),
+                          escapechar=run_config.get('escapeChar'),
+                          skipinitialspace=True)
+
+    def __generate_entry(self, row: list) -> dict:
+        row_list = []
+        for entry in row:
+            row_list.append(auto_cast(entry))
+        return self.__generate_index_pair(row_list)
+
 
 class ExcelObjectParserResponse(ObjectParserResponse):
 
@@ -160,8 +182,6 @@ class ExcelObjectParser(BaseObjectParser, XLSXContent):
         return line
 
     def parse(self, file) -> ExcelObjectParserResponse:
-        from openpyxl import load_workbook
-
         parsed = {
             'count': 0,
             'header': None,
@@ -169,16 +189,54 @@ class ExcelObjectParser(BaseObjectParser, XLSXContent):
             'entry_length': 0
         }
 
+        for row in self.__iterate_rows(file):
+            if parsed['header'] is None and self.get_config().get('header'):
+                parsed['header'] = list(row)
+                continue
+            parsed.get('entries').append(self.__generate_index_pair(list(row)))
+            parsed['count'] = parsed['count'] + 1
+
+        if len(parsed.get('entries')) > 0:
+            parsed['entry_length'] = len(parsed.get('entries')[0])
+        return ExcelObjectParserResponse(**parsed)
+
+    def iterate(self, file) -> Iterator[dict]:
+        """Yields the sheet rows one by one - the workbook is opened in read-only mode"""
+        rows = self.__iterate_rows(file)
+        if self.get_config().get('header'):
+            next(rows, None)
+        for row in rows:
+            yield self.__generate_index_pair(list(row))
+
+    def __iterate_rows(self, file) -> Iterator[tuple]:
+        from openpyxl import load_workbook
+
         run_config = self.get_config()
         try:
             working_sheet = run_config['sheet_name']
         except (IndexError, ValueError, KeyError) as err:
             raise ParserRuntimeError(ExcelObjectParser, err)
 
-        wb = load_workbook(file)
+        # read-only workbooks load the rows lazily while iterating
         try:
-            sheet: Worksheet = wb[working_sheet]
-        except KeyError as err:
+            wb = load_workbook(file, read_only=True, data_only=True)
+        except Exception as err:
+            LOGGER.error(err)
             raise ParserRuntimeError(ExcelObjectParser, err)
-
-        return ExcelObjectParserResponse(0, [], 0)
+        try:
+            try:
+                sheet: Worksheet = wb[working_sheet]
+            except KeyError as err:
+                raise ParserRuntimeError(ExcelObjectParser, err)
+            rows = sheet.iter_rows(values_only=True)
+            while True:
+                try:
+                    row = next(rows)
+                except StopIteration:
+                    break
+                except Exception as err:
+                    LOGGER.error(err)
+                    raise ParserRuntimeError(ExcelObjectParser, err)
+                yield row
+        finally:
+            wb.close()
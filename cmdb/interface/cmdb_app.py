@@ -41,7 +41,8 @@ class BaseCmdbApp(Flask):
                  media_file_manager: MediaFileManagement = None,
                  log_manager: CmdbLogManager = None,
                  user_manager: UserManager = None,
-                 security_manager: SecurityManager = None):
+                 security_manager: SecurityManager = None,
+                 event_queue=None):
         self.database_manager: DatabaseManagerMongo = database_manager
         self.docapi_tpl_manager: DocapiTemplateManager = docapi_tpl_manager
         self.object_manager: CmdbObjectManager = object_manager
@@ -51,6 +52,7 @@ class BaseCmdbApp(Flask):
         self.log_manager: CmdbLogManager = log_manager
         self.user_manager: UserManager = user_manager
         self.security_manager: SecurityManager = security_manager
+        self.event_queue = event_queue
         self.temp_folder: str = '/tmp/'
         super(BaseCmdbApp, self).__init__(import_name)
 
@@ -19,8 +19,11 @@ Server module for web-based services
 """
 import logging
 import multiprocessing
+import threading
 from cmdb import __MODE__
 import cmdb.process_management.service
+from cmdb.event_management.event_manager import create_event_receiver
+from cmdb.framework.managers.type_cache import type_cache
 from cmdb.interface.net_app import create_app
 from cmdb.interface.docs import create_docs_server
 from cmdb.interface.rest_api import create_rest_api
@@ -87,6 +90,7 @@ class HTTPServer(BaseApplication):
         self.options['logconfig_dict'] = get_logging_conf()
         self.options['timeout'] = 120
         self.options['daemon'] = True
+        self.options['post_fork'] = HTTPServer.post_fork
         if __MODE__ == 'DEBUG' or 'TESTING':
             self.options['reload'] = True
             self.options['check_config'] = True
@@ -108,6 +112,13 @@ class HTTPServer(BaseApplication):
     def number_of_workers() -> int:
         return (multiprocessing.cpu_count() * 2) + 1
 
+    @staticmethod
+    def post_fork(server, worker):
+        """start a type event receiver in every worker, to keep the process wide type cache consistent"""
+        receiver = create_event_receiver(type_cache.handle_event, threading.Event(), event_types=type_cache.EVENT_TYPES)
+        receiver.daemon = True
+        receiver.start()
+
 
 class DispatcherMiddleware:
 
@@ -87,7 +87,7 @@ def create_rest_api(event_queue):
                       media_file_manager=media_file_manager, exportd_manager=exportd_job_manager,
                       exportd_log_manager=exportd_log_manager, object_manager=object_manager,
                       log_manager=log_manager, user_manager=user_manager,
-                      security_manager=security_manager)
+                      security_manager=security_manager, event_queue=event_queue)
 
     app.url_map.strict_slashes = True
 
@@ -90,6 +90,38 @@ def get_logs_by_jobs(public_id: int, request_user: UserModel):
     return make_response(object_logs)
 
 
+@exportd_log_blueprint.route('/job/<int:public_id>/metrics/', methods=['GET'])
+@exportd_log_blueprint.route('/job/<int:public_id>/metrics', methods=['GET'])
+@login_required
+@insert_request_user
+@right_required('base.exportd.log.view')
+def get_metrics_by_job(public_id: int, request_user: UserModel):
+    """
+    get the timings and counters of all logged runs of a job
+    Args:
+        public_id: public id of the job
+    Returns:
+        list of run metrics per destination
+    """
+    try:
+        job_logs = log_manager.get_exportd_job_logs(public_id=public_id)
+    except ObjectManagerGetError as err:
+        LOGGER.error(f'Error in get_metrics_by_job: {err}')
+        return abort(404)
+    metrics_list = [{
+        'public_id': log.public_id,
+        'log_time': log.log_time,
+        'event': log.event,
+        'state': log.state,
+        'destination': log.destination,
+        'duration': log.duration,
+        'metrics': log.metrics
+    } for log in job_logs if getattr(log, 'metrics', None)]
+    if len(metrics_list) < 1:
+        return make_response(metrics_list, 204)
+    return make_response(metrics_list)
+
+
 # FIND routes
 @exportd_log_blueprint.route('/job/exists/', methods=['GET'])
 @exportd_log_blueprint.route('/job/exists', methods=['GET'])
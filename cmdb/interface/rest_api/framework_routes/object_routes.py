@@ -90,8 +90,8 @@ def get_objects(params: CollectionParameters, request_user: UserModel):
             api_response = GetMultiResponse(object_list, total=iteration_result.total, params=params,
                                             url=request.url, model=CmdbObject.MODEL, body=request.method == 'HEAD')
         elif view == 'render':
-            rendered_list = RenderList(iteration_result.results, object_manager, ref_render=True).render_result_list(
-                raw=True)
+            rendered_list = RenderList(iteration_result.results, request_user, ref_render=True,
+                                       object_manager=object_manager).render_result_list(raw=True)
             api_response = GetMultiResponse(rendered_list, total=iteration_result.total, params=params,
                                             url=request.url, model=Model('RenderResult'), body=request.method == 'HEAD')
         else:
@@ -125,8 +125,9 @@ def get_object(public_id, request_user: UserModel):
         return abort(404, err.message)
 
     try:
+        render_users = user_manager.get_users_by_ids([object_instance.author_id, type_instance.author_id])
         render = CmdbRender(object_instance=object_instance, type_instance=type_instance, render_user=request_user,
-                            user_list=user_manager.get_users(), object_manager=object_manager, ref_render=True)
+                            user_list=render_users, object_manager=object_manager, ref_render=True)
         render_result = render.result()
     except RenderError as err:
         LOGGER.error(err)
@@ -181,6 +182,30 @@ def get_objects_by_type(public_id, request_user: UserModel):
     return resp
 
 
+def _iterate_dt_objects(filter_state: dict, start_at: int, site_length: int, order_column: str,
+                        order_direction: int) -> IterationResult[CmdbObject]:
+    """
+    Load a single datatable page - skip, limit and the total count are executed inside the database.
+    Args:
+        filter_state: match query of the objects
+        start_at: number of objects to skip
+        site_length: number of objects of the page - a negative length returns all objects
+        order_column: object attribute or field name for sorting
+        order_direction: sort order
+
+    Returns:
+        IterationResult with the objects of the page and the total number of matching objects
+    """
+    from cmdb.framework.managers.object_manager import ObjectManager
+    manager = ObjectManager(database_manager=current_app.database_manager)
+    if order_column in ['active', 'public_id', 'type_id', 'author_id', 'creation_time']:
+        sort = order_column
+    else:
+        sort = f'fields.{order_column}'
+    return manager.iterate(filter=filter_state, limit=max(site_length, 0), skip=max(start_at, 0), sort=sort,
+                           order=order_direction)
+
+
 @object_blueprint.route('/dt/type/<int:type_id>', methods=['GET'])
 @login_required
 @insert_request_user
@@ -199,18 +224,15 @@ def get_dt_objects_by_type(type_id, request_user: UserModel):
         order_column = table_config.get('order') if table_config.get('order') else 'type_id'
         order_direction = 1 if table_config.get('direction') == 'asc' else -1
 
-        if order_column in ['active', 'public_id', 'type_id', 'author_id', 'creation_time']:
-            object_list = object_manager.get_objects_by(sort=order_column, direction=order_direction, **filter_state)
-        else:
-            object_list = object_manager.sort_objects_by_field_value(value=order_column, order=order_direction,
-                                                                     match=filter_state)
-        totals = len(object_list)
-        object_list = object_list[start_at:start_at + site_length]
+        iteration_result = _iterate_dt_objects(filter_state, start_at, site_length, order_column, order_direction)
+        totals = iteration_result.total
+        object_list = iteration_result.results
 
     except CMDBError:
         return abort(400)
 
-    rendered_list = RenderList(object_list, request_user, dt_render=True).render_result_list()
+    rendered_list = RenderList(object_list, request_user, dt_render=True,
+                               object_manager=object_manager).render_result_list()
 
     table_response = {
         'data': rendered_list,
@@ -278,18 +300,15 @@ def get_dt_filter_objects_by_type(type_id, request_user: UserModel):
         filter_arg.append({'$or': or_conditions})
         filter_state = {'$and': filter_arg}
 
-        if order_column in ['active', 'public_id', 'type_id', 'author_id', 'creation_time']:
-            object_list = object_manager.get_objects_by(sort=order_column, direction=order_direction, **filter_state)
-        else:
-            object_list = object_manager.sort_objects_by_field_value(value=order_column, order=order_direction,
-                                                                     match=filter_state)
-        totals = len(object_list)
-        object_list = object_list[start_at:start_at + site_length]
+        iteration_result = _iterate_dt_objects(filter_state, start_at, site_length, order_column, order_direction)
+        totals = iteration_result.total
+        object_list = iteration_result.results
 
     except CMDBError:
         return abort(400)
 
-    rendered_list = RenderList(object_list, request_user, dt_render=dt_render).render_result_list()
+    rendered_list = RenderList(object_list, request_user, dt_render=dt_render,
+                               object_manager=object_manager).render_result_list()
 
     table_response = {
         'data': rendered_list,
@@ -528,10 +547,11 @@ def insert_object(request_user: UserModel):
     try:
         current_type_instance = object_manager.get_type(new_object_data['type_id'])
         current_object = object_manager.get_object(new_object_id)
+        render_users = user_manager.get_users_by_ids([current_object.author_id, current_type_instance.author_id])
         current_object_render_result = CmdbRender(object_instance=current_object,
                                                   type_instance=current_type_instance,
                                                   render_user=request_user,
-                                                  user_list=user_manager.get_users()).result()
+                                                  user_list=render_users).result()
     except ObjectManagerGetError as err:
         LOGGER.error(err)
         return abort(404)
@@ -571,108 +591,119 @@ def update_object(public_id: int, request_user: UserModel):
         object_ids = [public_id]
 
     update_ack = None
+    # bulk updates send one aggregated event instead of one event per object
+    aggregate_events = len(object_ids) > 1
+    updated_objects = []
 
-    for obj_id in object_ids:
-        # get current object state
-        try:
-            current_object_instance = object_manager.get_object(obj_id)
-            current_type_instance = object_manager.get_type(current_object_instance.get_type_id())
-            current_object_render_result = CmdbRender(object_instance=current_object_instance,
-                                                      type_instance=current_type_instance,
-                                                      render_user=request_user,
-                                                      user_list=user_manager.get_users()).result()
-        except ObjectManagerGetError as err:
-            LOGGER.error(err)
-            return abort(404)
-        except RenderError as err:
-            LOGGER.error(err)
-            return abort(500)
-
-        update_comment = ''
-        # load put data
-        try:
-            # get data as str
-            add_data_dump = json.dumps(request.json)
-
-            # convert into python dict
-            put_data = json.loads(add_data_dump, object_hook=object_hook)
-            # check for comment
+    try:
+        for obj_id in object_ids:
+            # get current object state
             try:
-                put_data['public_id'] = obj_id
-                put_data['creation_time'] = current_object_instance.creation_time
-                put_data['author_id'] = current_object_instance.author_id
-
-                old_fields = list(map(lambda x: {k: v for k, v in x.items() if k in ['name', 'value']},
-                                      current_type_instance.get_fields()))
-                new_fields = put_data['fields']
-                for item in new_fields:
-                    for old in old_fields:
-                        if item['name'] == old['name']:
-                            old['value'] = item['value']
-                put_data['fields'] = old_fields
-
-                if 'active' not in put_data:
-                    put_data['active'] = current_object_instance.active
-                if 'version' not in put_data:
-                    put_data['version'] = current_object_instance.version
-
-                update_comment = put_data['comment']
-                del put_data['comment']
-            except (KeyError, IndexError, ValueError):
-                update_comment = ''
-        except TypeError as e:
-            LOGGER.warning(e)
-            return abort(400)
-
-        # update edit time
-        put_data['last_edit_time'] = datetime.utcnow()
-
-        try:
-            update_object_instance = CmdbObject(**put_data)
-        except ObjectManagerUpdateError as err:
-            LOGGER.error(err)
-            return abort(400)
-
-        # calc version
-
-        changes = current_object_instance / update_object_instance
-
-        if len(changes['new']) == 1:
-            update_object_instance.update_version(update_object_instance.VERSIONING_PATCH)
-        elif len(changes['new']) == len(update_object_instance.fields):
-            update_object_instance.update_version(update_object_instance.VERSIONING_MAJOR)
-        elif len(changes['new']) > (len(update_object_instance.fields) / 2):
-            update_object_instance.update_version(update_object_instance.VERSIONING_MINOR)
-        else:
-            update_object_instance.update_version(update_object_instance.VERSIONING_PATCH)
-
-        # insert object
-        try:
-            update_ack = object_manager.update_object(update_object_instance, request_user,
-                                                      AccessControlPermission.UPDATE)
-
-        except ManagerGetError as err:
-            return abort(404, err.message)
-        except AccessDeniedError as err:
-            return abort(403, err.message)
-        except CMDBError as e:
-            LOGGER.warning(e)
-            return abort(500)
-
-        try:
-            # generate log
-            log_data = {
-                'object_id': obj_id,
-                'version': current_object_render_result.object_information['version'],
-                'user_id': request_user.get_public_id(),
-                'user_name': request_user.get_display_name(),
-                'comment': update_comment,
-                'changes': changes,
-                'render_state': json.dumps(current_object_render_result, default=default).encode('UTF-8')
-            }
-            log_manager.insert_log(action=LogAction.EDIT, log_type=CmdbObjectLog.__name__, **log_data)
-        except (CMDBError, LogManagerInsertError) as err:
-            LOGGER.error(err)
+                current_object_instance = object_manager.get_object(obj_id)
+                current_type_instance = object_manager.get_type(current_object_instance.get_type_id())
+                render_users = user_manager.get_users_by_ids(
+                    [current_object_instance.author_id, current_type_instance.author_id])
+                current_object_render_result = CmdbRender(object_instance=current_object_instance,
+                                                          type_instance=current_type_instance,
+                                                          render_user=request_user,
+                                                          user_list=render_users).result()
+            except ObjectManagerGetError as err:
+                LOGGER.error(err)
+                return abort(404)
+            except RenderError as err:
+                LOGGER.error(err)
+                return abort(500)
+
+            update_comment = ''
+            # load put data
+            try:
+                # get data as str
+                add_data_dump = json.dumps(request.json)
+
+                # convert into python dict
+                put_data = json.loads(add_data_dump, object_hook=object_hook)
+                # check for comment
+                try:
+                    put_data['public_id'] = obj_id
+                    put_data['creation_time'] = current_object_instance.creation_time
+                    put_data['author_id'] = current_object_instance.author_id
+
+                    old_fields = list(map(lambda x: {k: v for k, v in x.items() if k in ['name', 'value']},
+                                          current_object_render_result.fields))
+                    new_fields = put_data['fields']
+                    for item in new_fields:
+                        for old in old_fields:
+                            if item['name'] == old['name']:
+                                old['value'] = item['value']
+                    put_data['fields'] = old_fields
+
+                    if 'active' not in put_data:
+                        put_data['active'] = current_object_instance.active
+                    if 'version' not in put_data:
+                        put_data['version'] = current_object_instance.version
+
+                    update_comment = put_data['comment']
+                    del put_data['comment']
+                except (KeyError, IndexError, ValueError):
+                    update_comment = ''
+            except TypeError as e:
+                LOGGER.warning(e)
+                return abort(400)
+
+            # update edit time
+            put_data['last_edit_time'] = datetime.utcnow()
+
+            try:
+                update_object_instance = CmdbObject(**put_data)
+            except ObjectManagerUpdateError as err:
+                LOGGER.error(err)
+                return abort(400)
+
+            # calc version
+
+            changes = current_object_instance / update_object_instance
+
+            if len(changes['new']) == 1:
+                update_object_instance.update_version(update_object_instance.VERSIONING_PATCH)
+            elif len(changes['new']) == len(update_object_instance.fields):
+                update_object_instance.update_version(update_object_instance.VERSIONING_MAJOR)
+            elif len(changes['new']) > (len(update_object_instance.fields) / 2):
+                update_object_instance.update_version(update_object_instance.VERSIONING_MINOR)
+            else:
+                update_object_instance.update_version(update_object_instance.VERSIONING_PATCH)
+
+            # insert object
+            try:
+                update_ack = object_manager.update_object(update_object_instance, request_user,
+                                                          AccessControlPermission.UPDATE,
+                                                          send_event=not aggregate_events)
+                updated_objects.append(update_object_instance)
+
+            except ManagerGetError as err:
+                return abort(404, err.message)
+            except AccessDeniedError as err:
+                return abort(403, err.message)
+            except CMDBError as e:
+                LOGGER.warning(e)
+                return abort(500)
+
+            try:
+                # generate log
+                log_data = {
+                    'object_id': obj_id,
+                    'version': current_object_render_result.object_information['version'],
+                    'user_id': request_user.get_public_id(),
+                    'user_name': request_user.get_display_name(),
+                    'comment': update_comment,
+                    'changes': changes,
+                    'render_state': json.dumps(current_object_render_result, default=default).encode('UTF-8')
+                }
+                log_manager.insert_log(action=LogAction.EDIT, log_type=CmdbObjectLog.__name__, **log_data)
+            except (CMDBError, LogManagerInsertError) as err:
+                LOGGER.error(err)
+    finally:
+        if aggregate_events:
+            object_manager.send_objects_event('updated', updated_objects, request_user)
 
     return make_response(update_ack)
 
@@ -685,10 +716,12 @@ def delete_object(public_id: int, request_user: UserModel):
     try:
         current_object_instance = object_manager.get_object(public_id)
         current_type_instance = object_manager.get_type(current_object_instance.get_type_id())
+        render_users = user_manager.get_users_by_ids(
+            [current_object_instance.author_id, current_type_instance.author_id])
         current_object_render_result = CmdbRender(object_instance=current_object_instance,
                                                   type_instance=current_type_instance,
                                                   render_user=request_user,
-                                                  user_list=user_manager.get_users()).result()
+                                                  user_list=render_users).result()
     except ObjectManagerGetError as err:
         LOGGER.error(err)
         return abort(404)
@@ -731,6 +764,8 @@ def delete_object(public_id: int, request_user: UserModel):
 @insert_request_user
 @right_required('base.framework.object.delete')
 def delete_many_objects(public_ids, request_user: UserModel):
+    # one aggregated event is sent for all deleted objects
+    deleted_objects = []
     try:
         ids = []
         operator_in = {'$in': []}
@@ -749,10 +784,12 @@ def delete_many_objects(public_ids, request_user: UserModel):
         for current_object_instance in objects:
             try:
                 current_type_instance = object_manager.get_type(current_object_instance.get_type_id())
+                render_users = user_manager.get_users_by_ids(
+                    [current_object_instance.author_id, current_type_instance.author_id])
                 current_object_render_result = CmdbRender(object_instance=current_object_instance,
                                                           type_instance=current_type_instance,
                                                           render_user=request_user,
-                                                          user_list=user_manager.get_users()).result()
+                                                          user_list=render_users).result()
             except ObjectManagerGetError as err:
                 LOGGER.error(err)
                 return abort(404)
@@ -762,7 +799,9 @@ def delete_many_objects(public_ids, request_user: UserModel):
 
             try:
                 ack.append(object_manager.delete_object(public_id=current_object_instance.get_public_id(),
-                                                        user=request_user, permission=AccessControlPermission.DELETE))
+                                                        user=request_user, permission=AccessControlPermission.DELETE,
+                                                        send_event=False))
+                deleted_objects.append(current_object_instance)
             except ObjectDeleteError:
                 return abort(400)
             except AccessDeniedError as err:
@@ -791,6 +830,8 @@ def delete_many_objects(public_ids, request_user: UserModel):
         return jsonify(message='Delete Error', error=e.message)
     except CMDBError:
         return abort(500)
+    finally:
+        object_manager.send_objects_event('deleted', deleted_objects, request_user)
 
 
 # Special routes
@@ -837,10 +878,11 @@ def update_object_state(public_id: int, request_user: UserModel):
         # get current object state
     try:
         current_type_instance = object_manager.get_type(founded_object.get_type_id())
+        render_users = user_manager.get_users_by_ids([founded_object.author_id, current_type_instance.author_id])
         current_object_render_result = CmdbRender(object_instance=founded_object,
                                                   type_instance=current_type_instance,
                                                   render_user=request_user,
-                                                  user_list=user_manager.get_users()).result()
+                                                  user_list=render_users).result()
     except ObjectManagerGetError as err:
         LOGGER.error(err)
         return abort(404)
@@ -116,7 +116,7 @@ def insert_type(data: dict):
     Returns:
         InsertSingleResponse: Insert response with the new type and its public_id.
     """
-    type_manager = TypeManager(database_manager=current_app.database_manager)
+    type_manager = TypeManager(database_manager=current_app.database_manager, event_queue=current_app.event_queue)
     data.setdefault('creation_time', datetime.utcnow())
     try:
         result_id: PublicID = type_manager.insert(data)
@@ -148,7 +148,7 @@ def update_type(public_id: int, data: dict):
     Returns:
         UpdateSingleResponse: With update result of the new updated type.
     """
-    type_manager = TypeManager(database_manager=current_app.database_manager)
+    type_manager = TypeManager(database_manager=current_app.database_manager, event_queue=current_app.event_queue)
     try:
         type_ = TypeModel.from_data(data=data)
 
@@ -181,7 +181,7 @@ def delete_type(public_id: int):
     Returns:
         DeleteSingleResponse: Delete result with the deleted type as data.
     """
-    type_manager = TypeManager(database_manager=current_app.database_manager)
+    type_manager = TypeManager(database_manager=current_app.database_manager, event_queue=current_app.event_queue)
     from cmdb.framework.cmdb_object_manager import CmdbObjectManager
     deprecated_object_manager = CmdbObjectManager(database_manager=current_app.database_manager)
 
@@ -21,6 +21,7 @@ from werkzeug.datastructures import FileStorage
 from werkzeug.utils import secure_filename
 
 from cmdb.data_storage.database_utils import default
+from cmdb.framework import CmdbObject
 from cmdb.framework.cmdb_errors import ObjectManagerGetError
 from cmdb.framework.cmdb_log import LogAction, CmdbObjectLog
 from cmdb.framework.cmdb_log_manager import LogManagerInsertError
@@ -189,16 +190,23 @@ def import_objects(request_user: UserModel):
     request_file.close()
 
     # log all successful imports
+    try:
+        current_type_instance = object_manager.get_type(importer_config_request.get('type_id'))
+        render_users = user_manager.get_users_by_ids(
+            [message.obj.get('author_id') for message in import_response.success_imports] +
+            [current_type_instance.author_id])
+    except ObjectManagerGetError as err:
+        LOGGER.error(err)
+        return abort(404)
     for message in import_response.success_imports:
         try:
 
-            # get object state of every imported object
-            current_type_instance = object_manager.get_type(importer_config_request.get('type_id'))
-            current_object = object_manager.get_object(message.public_id)
+            # object state of every imported object - the written data is part of the import message
+            current_object = CmdbObject(**message.obj)
             current_object_render_result = CmdbRender(object_instance=current_object,
                                                       type_instance=current_type_instance,
                                                       render_user=request_user,
-                                                      user_list=user_manager.get_users()).result()
+                                                      user_list=render_users).result()
 
             # insert object create log
             log_params = {
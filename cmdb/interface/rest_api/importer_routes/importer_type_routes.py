@@ -39,7 +39,7 @@ def add_type():
     from bson import json_util
     from datetime import datetime
 
-    type_manager = TypeManager(database_manager=current_app.database_manager)
+    type_manager = TypeManager(database_manager=current_app.database_manager, event_queue=current_app.event_queue)
 
     error_collection = {}
     upload = request.form.get('uploadFile')
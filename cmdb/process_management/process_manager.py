@@ -20,7 +20,9 @@ Manager for handling CMDB processes
 """
 import logging
 import multiprocessing
+import os
 import threading
+from cmdb.event_management.event_manager import EventBrokerLocal, LOCAL_EVENT_BUS_ENV, get_event_backend
 from cmdb.utils.helpers import load_class
 
 LOGGER = logging.getLogger(__name__)
@@ -51,8 +53,17 @@ class ProcessManager:
         self.__flag_shutdown = threading.Event()
         self._loaded = False
 
+        # local event bus - only used by the event backend "local"
+        self.__event_broker = None
+
     def start_app(self) -> bool:
         """start all services from service definitions"""
+        if get_event_backend() == "local":
+            # the services find the event bus by the inherited environment
+            self.__event_broker = EventBrokerLocal(threading.Event())
+            self.__event_broker.start()
+            os.environ[LOCAL_EVENT_BUS_ENV] = self.__event_broker.address
+            LOGGER.info("local event bus started @ {}".format(self.__event_broker.address))
         for service_def in self.__service_defs:
             service_name = service_def.get_name()
             service_class = load_class(service_def.get_class())
@@ -71,6 +82,8 @@ class ProcessManager:
         # go through processes in different order
         for process in reversed(self.__process_list):
             process.terminate()
+        if self.__event_broker:
+            self.__event_broker.shutdown()
 
     def get_loading_status(self):
         return self._loaded
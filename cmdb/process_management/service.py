@@ -45,6 +45,8 @@ class AbstractCmdbService:
         self._threaded_service = True
         # boolean: multiprocessing service
         self._multiprocessing = False
+        # seconds: merge bursts of object events before _handle_event() is called (0 = disabled)
+        self._event_debounce = 0
 
         # init variables
         self._event_shutdown = None
@@ -64,11 +66,12 @@ class AbstractCmdbService:
         signal.signal(signal.SIGTERM, self._shutdown)
 
         # start event managers
-        self._event_manager = cmdb.event_management.event_manager.EventManagerAmqp(self._event_shutdown,
-                                                                                   self._handle_event,
-                                                                                   self._name,
-                                                                                   self._eventtypes,
-                                                                                   self._multiprocessing)
+        self._event_manager = cmdb.event_management.event_manager.create_event_manager(self._event_shutdown,
+                                                                                       self._handle_event,
+                                                                                       self._name,
+                                                                                       self._eventtypes,
+                                                                                       self._multiprocessing,
+                                                                                       self._event_debounce)
 
         if self._threaded_service:
             # start daemon logic in own thread
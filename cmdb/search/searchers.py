@@ -19,7 +19,7 @@ from typing import List
 from cmdb.framework.cmdb_object import CmdbObject
 from cmdb.framework.models.type import TypeModel
 from cmdb.framework.cmdb_object_manager import CmdbObjectManager
-from cmdb.framework.cmdb_render import RenderResult, RenderList
+from cmdb.framework.cmdb_render import RenderResult, RenderList, RenderTypeCache
 from cmdb.search import Search
 from cmdb.search.params import SearchParam
 from cmdb.search.query import Query, Pipeline
@@ -222,7 +222,8 @@ class SearcherFramework(Search[CmdbObjectManager]):
             # parse result list
             pre_rendered_result_list = [CmdbObject(**raw_result) for raw_result in raw_search_result_list_entry['data']]
             rendered_result_list = RenderList(pre_rendered_result_list, request_user,
-                                              object_manager=self.manager).render_result_list()
+                                              object_manager=self.manager,
+                                              type_cache=RenderTypeCache(self.manager)).render_result_list()
 
             total_results = raw_search_result_list_entry['metadata'][0].get('total', 0)
             group_result_list = raw_search_result_list[0]['group']
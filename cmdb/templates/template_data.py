@@ -15,12 +15,137 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import logging
+from typing import Dict, Iterable, List, Set, Tuple
 
-from cmdb.framework.cmdb_render import CmdbRender
+from cmdb.framework.cmdb_errors import ObjectManagerGetError
+from cmdb.framework.cmdb_render import CmdbRender, RenderResult, RenderTypeCache
+from cmdb.utils.error import CMDBError
 
 
 LOGGER = logging.getLogger(__name__)
 
+# number of reference hops which are resolved into the template data
+REFERENCE_DEPTH = 3
+
+
+def _get_reference_ids(render_result: RenderResult) -> Set[int]:
+    reference_ids = set()
+    for field in render_result.fields:
+        if field.get("type") == "ref" and field.get("value"):
+            try:
+                reference_ids.add(int(field["value"]))
+            except (ValueError, TypeError):
+                continue
+    return reference_ids
+
+
+class ObjectReferenceCache:
+    """
+    Memo of the referenced objects for template data of a single run (e.g. an exportd job execution).
+    Every referenced object is fetched and rendered at most once and every expanded reference subtree
+    is built once - independent of the number of objects and destinations which are referring to it.
+    The cached template data is shared, so it must be handled read-only.
+    """
+
+    def __init__(self, object_manager):
+        self.__object_manager = object_manager
+        self.__type_cache = RenderTypeCache(object_manager)
+        self.__render_results: Dict[int, RenderResult] = {}
+        self.__missing_ids: Set[int] = set()
+        self.__template_data: Dict[Tuple[int, int], dict] = {}
+
+    def prefetch(self, render_results: Iterable[RenderResult], depth: int = REFERENCE_DEPTH):
+        """
+        Load the references of the passed objects level by level.
+        Every level needs one query for the referenced objects and at most one for their types.
+        Args:
+            render_results: rendered objects whose references should be loaded
+            depth: number of reference levels
+        """
+        current_level = list(render_results)
+        for _ in range(depth):
+            reference_ids = set()
+            for render_result in current_level:
+                reference_ids.update(_get_reference_ids(render_result))
+            reference_ids = reference_ids - self.__missing_ids - set(self.__render_results)
+            if len(reference_ids) == 0:
+                break
+            current_level = self.__load(reference_ids)
+
+    def __load(self, public_ids: Set[int]) -> List[RenderResult]:
+        loaded_results = []
+        try:
+            ref_objects = self.__object_manager.get_objects(list(public_ids))
+            self.__type_cache.load([ref_object.type_id for ref_object in ref_objects])
+        except CMDBError as err:
+            LOGGER.error(err)
+            ref_objects = []
+        for ref_object in ref_objects:
+            try:
+                render_result = CmdbRender(object_instance=ref_object,
+                                           type_instance=self.__type_cache.get(ref_object.type_id),
+                                           render_user=None).result()
+            except CMDBError as err:
+                LOGGER.error(err)
+                continue
+            self.__render_results[ref_object.get_public_id()] = render_result
+            loaded_results.append(render_result)
+        self.__missing_ids.update(public_id for public_id in public_ids if public_id not in self.__render_results)
+        return loaded_results
+
+    def get_render_result(self, public_id: int) -> RenderResult:
+        """
+        Get a rendered referenced object - not prefetched objects are loaded on demand.
+        Args:
+            public_id: public id of the referenced object
+
+        Raises:
+            ObjectManagerGetError: if the object could not be loaded or rendered
+
+        Returns:
+            RenderResult
+        """
+        if public_id not in self.__render_results and public_id not in self.__missing_ids:
+            self.__load({public_id})
+        try:
+            return self.__render_results[public_id]
+        except KeyError:
+            raise ObjectManagerGetError(f'Referenced object with ID: {public_id} not found!')
+
+    def get_reference_ids(self, render_result: RenderResult, depth: int = REFERENCE_DEPTH) -> Set[int]:
+        """
+        Get the ids of all objects which are referenced by an object - directly or over the loaded references.
+        Args:
+            render_result: rendered object
+            depth: number of reference levels
+        Returns:
+            ids of the referenced objects (including missing ones)
+        """
+        reference_ids = set()
+        current_ids = _get_reference_ids(render_result)
+        for _ in range(depth):
+            current_ids = current_ids - reference_ids
+            if len(current_ids) == 0:
+                break
+            reference_ids.update(current_ids)
+            next_ids = set()
+            for public_id in current_ids:
+                if public_id in self.__render_results:
+                    next_ids.update(_get_reference_ids(self.__render_results[public_id]))
+            current_ids = next_ids
+        return reference_ids
+
+    def get_type_ids(self) -> Set[int]:
+        """Get the type ids of all loaded referenced objects"""
+        return {render_result.type_information['type_id'] for render_result in self.__render_results.values()}
+
+    def get_template_data(self, public_id: int, iteration: int) -> dict:
+        return self.__template_data.get((public_id, iteration))
+
+    def set_template_data(self, public_id: int, iteration: int, template_data: dict):
+        self.__template_data[(public_id, iteration)] = template_data
+
+
 class AbstractTemplateData:
 
     def __init__(self):
@@ -32,10 +157,14 @@ class AbstractTemplateData:
 
 class ObjectTemplateData(AbstractTemplateData):
 
-    def __init__(self, object_manager, cmdb_object):
+    def __init__(self, object_manager, cmdb_object, reference_cache: ObjectReferenceCache = None):
         super(ObjectTemplateData, self).__init__()
         self.__object_manager = object_manager
-        self._template_data = self.__get_objectdata(cmdb_object, 3)
+        if reference_cache is None:
+            reference_cache = ObjectReferenceCache(object_manager)
+            reference_cache.prefetch([cmdb_object], REFERENCE_DEPTH)
+        self.__reference_cache = reference_cache
+        self._template_data = self.__get_objectdata(cmdb_object, REFERENCE_DEPTH)
 
     def __get_objectdata(self, cmdb_object, iteration):
         data = {}
@@ -45,14 +174,17 @@ class ObjectTemplateData(AbstractTemplateData):
             try:
                 field_name = field["name"]
                 if field["type"] == "ref" and field["value"] and iteration > 0:
-                    # resolve type
-                    current_object = self.__object_manager.get_object(field["value"])
-                    type_instance = self.__object_manager.get_type(current_object.get_type_id())
-                    cmdb_render_object = CmdbRender(object_instance=current_object, type_instance=type_instance,
-                                                    render_user=None)
-                    data["fields"][field_name] = self.__get_objectdata(cmdb_render_object.result(), iteration - 1)
+                    data["fields"][field_name] = self.__get_referencedata(int(field["value"]), iteration - 1)
                 else:
                     data["fields"][field_name] = field["value"]
             except Exception as err:
                 LOGGER.error(err)
         return data
+
+    def __get_referencedata(self, public_id, iteration):
+        data = self.__reference_cache.get_template_data(public_id, iteration)
+        if data is None:
+            render_result = self.__reference_cache.get_render_result(public_id)
+            data = self.__get_objectdata(render_result, iteration)
+            self.__reference_cache.set_template_data(public_id, iteration, data)
+        return data
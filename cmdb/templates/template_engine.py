@@ -22,9 +22,12 @@ LOGGER = logging.getLogger(__name__)
 class TemplateEngine:
 
     def __init__(self):
-        pass
+        self.__environment = jinja2.Environment(undefined=jinja2.ChainableUndefined)
+
+    def compile_template_string(self, template_string) -> jinja2.Template:
+        """Parse and compile a template string once - the returned template can be rendered multiple times"""
+        return self.__environment.from_string(template_string)
 
     def render_template_string(self, template_string, template_data):
-        environment = jinja2.Environment(undefined=jinja2.ChainableUndefined)
-        template = environment.from_string(template_string)
+        template = self.compile_template_string(template_string)
         return template.render(template_data)
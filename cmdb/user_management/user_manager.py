@@ -62,6 +62,13 @@ class UserManager(CmdbManagerBase):
             user_list.append(user_)
         return user_list
 
+    def get_users_by_ids(self, public_ids: List[int]) -> List[UserModel]:
+        """Get only the users with the passed ids - not existing ids are skipped"""
+        public_ids = list({public_id for public_id in public_ids if public_id is not None})
+        if len(public_ids) == 0:
+            return []
+        return self.get_users_by(public_id={'$in': public_ids})
+
     def get_user_by(self, **requirements) -> UserModel:
         """Get user by requirement"""
         try: